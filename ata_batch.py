@@ -0,0 +1,147 @@
+import asyncio
+import os
+import sys
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from dotenv import load_dotenv
+from solders.compute_budget import set_compute_unit_limit
+from solders.hash import Hash
+from solders.instruction import Instruction
+from solders.keypair import Keypair
+from solders.message import MessageV0
+from solders.pubkey import Pubkey
+from solders.signature import Signature
+from solders.transaction import VersionedTransaction
+from spl.token.instructions import create_idempotent_associated_token_account
+
+from ata_resolver import get_ata_resolver
+from blockhash_cache import get_blockhash_provider
+from broadcaster import run_and_close
+from confirmation import get_signature_tracker
+from rpc_client import get_rpc_client
+
+# Solana transaction limits
+PACKET_DATA_SIZE = 1232  # bytes
+MAX_COMPUTE_UNITS = 1_400_000
+# Idempotent ATA creation measures ~25k CU; leave headroom
+ATA_CREATE_COMPUTE_UNITS = 30_000
+
+OwnerMint = Tuple[Pubkey, Pubkey]
+
+
+def _compile(payer: Pubkey, instructions: List[Instruction], blockhash: Hash) -> MessageV0:
+    compute_limit = set_compute_unit_limit(len(instructions) * ATA_CREATE_COMPUTE_UNITS)
+    return MessageV0.try_compile(payer, [compute_limit, *instructions], [], blockhash)
+
+
+def _fits(payer: Pubkey, instructions: List[Instruction], blockhash: Hash) -> bool:
+    if len(instructions) * ATA_CREATE_COMPUTE_UNITS > MAX_COMPUTE_UNITS:
+        return False
+    message = _compile(payer, instructions, blockhash)
+    placeholder = VersionedTransaction.populate(message, [Signature.default()])
+    return len(bytes(placeholder)) <= PACKET_DATA_SIZE
+
+
+def pack_ata_instructions(payer: Pubkey, pairs: Iterable[OwnerMint], blockhash: Hash) -> List[List[Instruction]]:
+    """
+    Group idempotent create-ATA instructions into as few transactions as
+    the packet size and compute limits allow.
+
+    Args:
+        payer (Pubkey): Fee and rent payer
+        pairs (Iterable[Tuple[Pubkey, Pubkey]]): (owner, mint) pairs
+        blockhash (Hash): Blockhash used for sizing (the size doesn't depend on it)
+
+    Returns:
+        List[List[Instruction]]: Instruction groups, one per transaction
+    """
+    groups: List[List[Instruction]] = []
+    current: List[Instruction] = []
+    for owner, mint in pairs:
+        instruction = create_idempotent_associated_token_account(payer, owner, mint)
+        if current and not _fits(payer, current + [instruction], blockhash):
+            groups.append(current)
+            current = []
+        current.append(instruction)
+    if current:
+        groups.append(current)
+    return groups
+
+
+async def create_atas(
+    payer: Keypair,
+    pairs: Iterable[OwnerMint],
+    commitment: str = "confirmed",
+    timeout: float = 60.0,
+) -> Dict[Pubkey, Optional[str]]:
+    """
+    Create every missing ATA for the given (owner, mint) pairs, packing many
+    creations per transaction, sending the transactions concurrently and
+    confirming them together.
+
+    Args:
+        payer (Keypair): Pays fees and rent
+        pairs (Iterable[Tuple[Pubkey, Pubkey]]): (owner, mint) pairs
+        commitment (str): Commitment to wait for
+        timeout (float): Seconds to wait for confirmation
+
+    Returns:
+        Dict[Pubkey, Optional[str]]: For each ATA that was missing, the
+        signature of the transaction that created it, or None if it failed
+    """
+    rpc = get_rpc_client()
+    blockhashes = get_blockhash_provider()
+    ata_resolver = get_ata_resolver()
+
+    resolved = await ata_resolver.resolve(pairs)
+    missing = {ata: pair for pair, (ata, exists) in resolved.items() if not exists}
+    if not missing:
+        return {}
+
+    recent_blockhash, _ = await blockhashes.get()
+    groups = pack_ata_instructions(payer.pubkey(), missing.values(), recent_blockhash)
+    transactions = [VersionedTransaction(_compile(payer.pubkey(), group, recent_blockhash), [payer])
+                    for group in groups]
+
+    sent = await asyncio.gather(*(rpc.send_transaction(bytes(tx)) for tx in transactions),
+                                return_exceptions=True)
+    signatures = [signature for signature in sent if isinstance(signature, str)]
+    statuses = await get_signature_tracker().wait_all(signatures, commitment, timeout)
+
+    created: Dict[Pubkey, Optional[str]] = {}
+    for group, signature in zip(groups, sent):
+        status = statuses.get(signature) if isinstance(signature, str) else None
+        landed = status is not None and status.get("err") is None
+        for instruction in group:
+            # Account 1 of the create-ATA instruction is the ATA itself
+            ata = instruction.accounts[1].pubkey
+            created[ata] = signature if landed else None
+            if landed:
+                ata_resolver.mark_existing(ata)
+            else:
+                ata_resolver.forget(ata)
+    return created
+
+
+async def main():
+    # Load environment variables
+    load_dotenv()
+    payer = Keypair.from_base58_string(os.getenv("PRIVATE_KEY"))
+    owner = Pubkey.from_string(os.getenv("FEE_ACCOUNT"))
+    mints = [Pubkey.from_string(mint) for mint in sys.argv[1:]]
+    if not mints:
+        print("Usage: python ata_batch.py <mint> [<mint> ...]")
+        return
+
+    created = await create_atas(payer, [(owner, mint) for mint in mints])
+    if not created:
+        print("✅ All ATAs already exist")
+    for ata, signature in created.items():
+        if signature:
+            print(f"✅ Created {ata} in {signature}")
+        else:
+            print(f"❌ Failed to create {ata}")
+
+
+if __name__ == "__main__":
+    run_and_close(main())
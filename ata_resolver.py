@@ -0,0 +1,133 @@
+import asyncio
+import time
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from solders.pubkey import Pubkey
+from spl.token.instructions import get_associated_token_address
+
+from rpc_client import AsyncRpcClient, get_rpc_client
+
+# getMultipleAccounts accepts at most 100 keys per call
+MAX_ACCOUNTS_PER_REQUEST = 100
+# ATAs can be created at any moment, so "doesn't exist" is only trusted briefly
+DEFAULT_NEGATIVE_TTL = 2.0  # seconds
+DERIVATION_CACHE_SIZE = 65_536
+
+OwnerMint = Tuple[Pubkey, Pubkey]
+
+
+@lru_cache(maxsize=DERIVATION_CACHE_SIZE)
+def derive_ata(owner: Pubkey, mint: Pubkey) -> Pubkey:
+    """Cached get_associated_token_address; the PDA bump search is not free."""
+    return get_associated_token_address(owner, mint)
+
+
+class AtaResolver:
+    """
+    Resolves whether associated token accounts exist, many at a time.
+
+    Addresses are derived locally and checked with getMultipleAccounts in
+    chunks of up to 100. ATAs seen to exist are remembered for the life of
+    the process, so repeat swaps for the same (owner, mint) skip the RPC
+    entirely; missing ATAs are cached for `negative_ttl` seconds.
+    """
+
+    def __init__(
+        self,
+        rpc: Optional[AsyncRpcClient] = None,
+        commitment: str = "confirmed",
+        negative_ttl: float = DEFAULT_NEGATIVE_TTL,
+    ):
+        self._rpc = rpc
+        self.commitment = commitment
+        self.negative_ttl = negative_ttl
+        self._existing: set = set()
+        self._missing: Dict[Pubkey, float] = {}
+        self.rpc_lookups = 0
+        self.cache_hits = 0
+
+    @property
+    def rpc(self) -> AsyncRpcClient:
+        return self._rpc or get_rpc_client()
+
+    def mark_existing(self, ata: Pubkey) -> None:
+        """Record an ATA known to exist (e.g. after its creation confirmed)."""
+        self._existing.add(ata)
+        self._missing.pop(ata, None)
+
+    def forget(self, ata: Pubkey) -> None:
+        """Drop anything cached for an ATA (e.g. after sending a create or close)."""
+        self._existing.discard(ata)
+        self._missing.pop(ata, None)
+
+    def _cached(self, ata: Pubkey, now: float) -> Optional[bool]:
+        if ata in self._existing:
+            return True
+        checked_at = self._missing.get(ata)
+        if checked_at is not None and now - checked_at <= self.negative_ttl:
+            return False
+        return None
+
+    async def _fetch_exists(self, atas: List[Pubkey]) -> List[bool]:
+        # Only existence matters, so skip the account data entirely
+        config = {"commitment": self.commitment, "encoding": "base64", "dataSlice": {"offset": 0, "length": 0}}
+        result = await self.rpc.call("getMultipleAccounts", [[str(ata) for ata in atas], config])
+        return [value is not None for value in result["value"]]
+
+    async def resolve(self, pairs: Iterable[OwnerMint]) -> Dict[OwnerMint, Tuple[Pubkey, bool]]:
+        """
+        Derive the ATA for each (owner, mint) pair and check whether it exists.
+
+        Args:
+            pairs (Iterable[Tuple[Pubkey, Pubkey]]): (owner, mint) pairs
+
+        Returns:
+            Dict[Tuple[Pubkey, Pubkey], Tuple[Pubkey, bool]]: For each pair,
+            its ATA address and whether the account exists
+        """
+        now = time.monotonic()
+        resolved: Dict[OwnerMint, Tuple[Pubkey, bool]] = {}
+        unknown: Dict[Pubkey, List[OwnerMint]] = {}
+        for owner, mint in pairs:
+            ata = derive_ata(owner, mint)
+            cached = self._cached(ata, now)
+            if cached is None:
+                unknown.setdefault(ata, []).append((owner, mint))
+            else:
+                self.cache_hits += 1
+                resolved[(owner, mint)] = (ata, cached)
+
+        atas = list(unknown)
+        chunks = [atas[i:i + MAX_ACCOUNTS_PER_REQUEST] for i in range(0, len(atas), MAX_ACCOUNTS_PER_REQUEST)]
+        self.rpc_lookups += len(chunks)
+        results = await asyncio.gather(*(self._fetch_exists(chunk) for chunk in chunks))
+
+        checked_at = time.monotonic()
+        for chunk, exists_flags in zip(chunks, results):
+            for ata, exists in zip(chunk, exists_flags):
+                if exists:
+                    self.mark_existing(ata)
+                else:
+                    self._missing[ata] = checked_at
+                for pair in unknown[ata]:
+                    resolved[pair] = (ata, exists)
+        return resolved
+
+    async def exists(self, owner: Pubkey, mint: Pubkey) -> Tuple[Pubkey, bool]:
+        """
+        Returns:
+            Tuple[Pubkey, bool]: The ATA for (owner, mint) and whether it exists
+        """
+        return (await self.resolve([(owner, mint)]))[(owner, mint)]
+
+
+_shared_resolver: Optional[AtaResolver] = None
+
+
+def get_ata_resolver() -> AtaResolver:
+    """Get the process-wide ATA resolver (its cache outlives event loops)."""
+    global _shared_resolver
+    if _shared_resolver is None:
+        _shared_resolver = AtaResolver()
+    return _shared_resolver
@@ -0,0 +1,150 @@
+"""
+Landing rate and latency of one-shot sends against hedged rebroadcasting.
+
+Several local endpoints front one MockChain, each with its own latency and
+a share of sendTransaction calls it accepts but never forwards (what a
+congested RPC's leader path looks like from outside). The same batch of
+swaps is sent once to one endpoint, rebroadcast to one endpoint, and
+rebroadcast to all of them.
+
+Usage:
+    python bench_broadcast.py --transactions 100 --concurrency 8 --drop-rates 0.5 0.3 0.3 --latencies-ms 20 40 60
+"""
+import argparse
+import asyncio
+import base64
+import random
+import statistics
+from collections import Counter
+from typing import Any, Dict, List, Tuple
+
+from solders.keypair import Keypair
+from solders.transaction import VersionedTransaction
+
+from bench_signing import build_swap_transactions
+from broadcaster import BroadcastResult, TransactionBroadcaster, endpoint_label
+from latency_stats import summarize_ms
+from local_http import JsonHttpServer
+from mock_server import MockChain
+from wire_transaction import WireTransaction
+
+
+class LossyEndpoint:
+    """An RPC endpoint in front of a shared MockChain that silently drops some sends."""
+
+    def __init__(self, chain: MockChain, latency_ms: float, drop_rate: float, seed: int):
+        self.chain = chain
+        self.latency_ms = latency_ms
+        self.drop_rate = drop_rate
+        self.random = random.Random(seed)
+
+    async def handle(self, method: str, path: str, query: Dict[str, str], body: Any) -> Tuple[int, Any]:
+        await asyncio.sleep(self.latency_ms / 1000)
+        if isinstance(body, dict) and body.get("method") == "sendTransaction" and self.random.random() < self.drop_rate:
+            # Accepted, but it never reaches a leader
+            tx = VersionedTransaction.from_bytes(base64.b64decode(body["params"][0]))
+            return 200, {"jsonrpc": "2.0", "id": body.get("id"), "result": str(tx.signatures[0])}
+        return await self.chain.handle(method, path, query, body)
+
+
+def signed_batch(count: int) -> List[bytes]:
+    """Distinct signed swaps (one wallet per batch, so batches never share signatures)."""
+    wallet = Keypair()
+    pubkeys = [wallet.pubkey()]
+    return [bytes(WireTransaction().load_base64(encoded).sign([wallet], pubkeys).wire)
+            for encoded in build_swap_transactions(wallet, count)]
+
+
+async def run_mode(
+    broadcaster: TransactionBroadcaster, transactions: List[bytes], chain: MockChain, validity_blocks: int,
+    concurrency: int,
+) -> List[BroadcastResult]:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(tx_bytes: bytes) -> BroadcastResult:
+        async with semaphore:
+            # As if the blockhash was fetched just before signing
+            return await broadcaster.broadcast(tx_bytes, chain.block_height + validity_blocks)
+
+    try:
+        return await asyncio.gather(*(one(tx_bytes) for tx_bytes in transactions))
+    finally:
+        await broadcaster.aclose()
+
+
+def print_mode(name: str, results: List[BroadcastResult]) -> None:
+    landed = [result for result in results if result.landed]
+    summary = summarize_ms([result.elapsed for result in landed])
+    sends = statistics.fmean(sum(stats.sends for stats in result.endpoints.values()) for result in results)
+    print(f"{name:<26}{len(landed):>5}/{len(results):<5}{summary['p50_ms']:>9.0f}{summary['p99_ms']:>9.0f}"
+          f"{sum(result.expired for result in results):>9}{sends:>8.1f}")
+
+
+def print_endpoints(results: List[BroadcastResult]) -> None:
+    first_seen: Counter = Counter()
+    for result in results:
+        seen = [(stats.seen_latency, stats.endpoint) for stats in result.endpoints.values()
+                if stats.seen_latency is not None]
+        if seen:
+            first_seen[min(seen)[1]] += 1
+    print(f"\n{'endpoint':<22}{'accepted p50':>14}{'seen p50':>10}{'seen first':>12}{'errors':>8}")
+    for endpoint in results[0].endpoints:
+        per_tx = [result.endpoints[endpoint] for result in results]
+        acks = [stats.ack_latency for stats in per_tx if stats.ack_latency is not None]
+        seen = [stats.seen_latency for stats in per_tx if stats.seen_latency is not None]
+        print(f"{endpoint_label(endpoint):<22}{summarize_ms(acks)['p50_ms']:>11.0f} ms"
+              f"{summarize_ms(seen)['p50_ms']:>7.0f} ms{first_seen[endpoint]:>12}"
+              f"{sum(stats.errors for stats in per_tx):>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark one-shot sends against hedged rebroadcasting")
+    parser.add_argument("--transactions", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--drop-rates", type=float, nargs="+", default=[0.5, 0.3, 0.3])
+    parser.add_argument("--latencies-ms", type=float, nargs="+", default=[20.0, 40.0, 60.0])
+    parser.add_argument("--validity-blocks", type=int, default=15, help="blocks until the blockhash expires")
+    parser.add_argument("--rebroadcast-interval", type=float, default=1.0)
+    args = parser.parse_args()
+    if len(args.drop_rates) != len(args.latencies_ms):
+        parser.error("--drop-rates and --latencies-ms need one value per endpoint")
+
+    chain = MockChain(seed=0)
+    print(f"Building {3 * args.transactions} signed swaps...")
+    batches = [signed_batch(args.transactions) for _ in range(3)]
+
+    async def run():
+        servers = []
+        for i, (drop_rate, latency_ms) in enumerate(zip(args.drop_rates, args.latencies_ms)):
+            server = JsonHttpServer(LossyEndpoint(chain, latency_ms, drop_rate, seed=i).handle)
+            await server.start()
+            servers.append(server)
+        endpoints = [server.url for server in servers]
+        modes = [
+            ("one endpoint, send once", [endpoints[0]], float("inf")),
+            ("one endpoint, rebroadcast", [endpoints[0]], args.rebroadcast_interval),
+            ("all endpoints, rebroadcast", endpoints, args.rebroadcast_interval),
+        ]
+        try:
+            results = []
+            for (name, mode_endpoints, interval), batch in zip(modes, batches):
+                broadcaster = TransactionBroadcaster(mode_endpoints, rebroadcast_interval=interval)
+                results.append((name, await run_mode(broadcaster, batch, chain, args.validity_blocks,
+                                                     args.concurrency)))
+            return results
+        finally:
+            for server in servers:
+                await server.stop()
+
+    results = asyncio.run(run())
+    rates = ", ".join(f"{rate:.0%} dropped/{latency:.0f} ms" for rate, latency in zip(args.drop_rates, args.latencies_ms))
+    print(f"\nEndpoints: {rates}; blockhash valid for {args.validity_blocks} blocks, "
+          f"rebroadcast every {args.rebroadcast_interval}s, {args.concurrency} in flight\n")
+    print(f"{'mode':<26}{'landed':>11}{'p50 ms':>9}{'p99 ms':>9}{'expired':>9}{'sends':>8}")
+    for name, mode_results in results:
+        print_mode(name, mode_results)
+    print_endpoints(results[-1][1])
+
+
+if __name__ == "__main__":
+    main()
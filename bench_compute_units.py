@@ -0,0 +1,87 @@
+"""
+Fee spend and latency of the instruction-API swap with and without
+simulation-sized compute unit limits, against the local mock server.
+
+Each mode runs the same number of swaps from fresh caches, so the sized
+run pays for one simulation per route and reuses the limit afterwards.
+
+Usage:
+    python bench_compute_units.py --iterations 50 --concurrency 4
+    python bench_compute_units.py --route-units 900000  # a route Jupiter's 200k limit can't cover
+"""
+import argparse
+import asyncio
+import importlib
+import statistics
+
+from solders.transaction import VersionedTransaction
+
+from bench_flows import configure_environment, run_flow
+from local_http import JsonHttpServer
+from mock_server import COMPUTE_BUDGET_PROGRAM_ID, DEFAULT_INSTRUCTION_COMPUTE_UNITS, MockChain
+
+BASE_FEE_LAMPORTS = 5_000  # per signature
+# The route the instruction-API script swaps
+ROUTE = ("So11111111111111111111111111111111111111112", "Dfh5DzRgSvvCFDoYc2ciTkMrbDfRKybA4SoFbPmApump")
+
+
+def compute_unit_limit(tx: VersionedTransaction) -> int:
+    """The limit a transaction requests, or the runtime default if it sets none."""
+    message = tx.message
+    keys = message.account_keys
+    budget = [bytes(ix.data) for ix in message.instructions if keys[ix.program_id_index] == COMPUTE_BUDGET_PROGRAM_ID]
+    for data in budget:
+        if data[:1] == b"\x02":
+            return int.from_bytes(data[1:5], "little")
+    return (len(message.instructions) - len(budget)) * DEFAULT_INSTRUCTION_COMPUTE_UNITS
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare fixed and simulation-sized compute unit limits")
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--jitter-ms", type=float, default=5.0)
+    parser.add_argument("--route-units", type=int, default=None,
+                        help="Compute units the swap instruction consumes (default: scales with its accounts)")
+    args = parser.parse_args()
+
+    route_compute_units = {ROUTE: args.route_units} if args.route_units else None
+    chain = MockChain(args.latency_ms, args.jitter_ms, seed=0, route_compute_units=route_compute_units)
+    server = JsonHttpServer(chain.handle)
+    configure_environment(server.start_in_thread())
+    # config reads the endpoints at import time, so anything that imports it loads after this point
+    flow = importlib.import_module("jupiter_swap_instruction_api").main
+    compute_units = importlib.import_module("compute_units")
+    swap_templates = importlib.import_module("swap_templates")
+    priority_fee_lamports = importlib.import_module("fee_relay").priority_fee_lamports
+
+    print(f"Mock latency {args.latency_ms}±{args.jitter_ms} ms, "
+          f"{args.iterations} swaps x {args.concurrency} concurrent\n")
+    print(f"{'compute unit limit':<20}{'ok':>5}{'failed':>8}{'p50 ms':>9}{'p99 ms':>9}"
+          f"{'avg limit':>11}{'avg fee':>10}{'sims':>6}")
+    try:
+        for name, enabled in (("from Jupiter", False), ("simulated", True)):
+            # Fresh templates and limits, so each mode compiles its route once
+            swap_templates._shared_cache = swap_templates.SwapTemplateCache()
+            sizer = compute_units._shared_sizer = compute_units.ComputeUnitSizer(enabled=enabled)
+            sent_before = set(chain.transactions)
+
+            result = asyncio.run(run_flow(flow, args.iterations, args.concurrency))
+
+            # Identical swaps (same amount and blockhash) land once under one signature
+            sent = [VersionedTransaction.from_bytes(tx_bytes)
+                    for signature, (_, tx_bytes) in chain.transactions.items() if signature not in sent_before]
+            failed = sum(str(tx.signatures[0]) in chain.errors for tx in sent)
+            fees = [priority_fee_lamports(tx.message) + BASE_FEE_LAMPORTS * len(tx.signatures) for tx in sent]
+            limits = [compute_unit_limit(tx) for tx in sent]
+            print(f"{name:<20}{result['ok']:>5}{failed:>8}{result['p50_ms']:>9.1f}{result['p99_ms']:>9.1f}"
+                  f"{statistics.fmean(limits) if limits else 0:>11.0f}"
+                  f"{statistics.fmean(fees) if fees else 0:>10.0f}{sizer.simulations:>6}")
+    finally:
+        server.stop_thread()
+    print("\nfee = base fee + priority fee, in lamports; failed = landed but ran out of compute")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Decompiling large multi-hop swap messages back into Instructions.
+
+Compares the per-account is_signer/is_maybe_writable path and the
+per-instruction role-set path that try_to_payer used with
+message_decompiler, on messages with and without address lookup tables.
+
+Usage:
+    python bench_decompile.py --hops 4 --messages 500
+"""
+import argparse
+import time
+from typing import Callable, Dict, List
+
+from solders.address_lookup_table_account import AddressLookupTableAccount
+from solders.compute_budget import set_compute_unit_limit, set_compute_unit_price
+from solders.hash import Hash
+from solders.instruction import AccountMeta, Instruction
+from solders.keypair import Keypair
+from solders.message import MessageV0, to_bytes_versioned
+from solders.pubkey import Pubkey
+from spl.token.instructions import create_idempotent_associated_token_account
+
+from message_decompiler import decompile_message
+from mock_server import JUPITER_PROGRAM_ID, ROUTE_DISCRIMINATOR, fake_pubkey
+
+ACCOUNTS_PER_HOP = 16
+TABLE_SIZE = 256
+
+
+def build_route_message(user: Pubkey, hops: int, seed: int, tables: List[AddressLookupTableAccount]) -> MessageV0:
+    """A Jupiter-shaped multi-hop swap: compute budget, ATA setup, one big route instruction."""
+    mints = [fake_pubkey("mint", seed, hop) for hop in range(hops + 1)]
+    setup = [create_idempotent_associated_token_account(user, user, mint) for mint in mints[1:]]
+    route_accounts = [AccountMeta(user, True, True)]
+    for hop in range(hops):
+        route_accounts += [AccountMeta(fake_pubkey("amm", seed % 8, hop, i), False, i % 3 != 0)
+                           for i in range(ACCOUNTS_PER_HOP)]
+    route = Instruction(JUPITER_PROGRAM_ID, ROUTE_DISCRIMINATOR + bytes(32), route_accounts)
+    instructions = [set_compute_unit_limit(1_000_000), set_compute_unit_price(50_000), *setup, route]
+    return MessageV0.try_compile(user, instructions, tables, Hash.default())
+
+
+def lookup_tables() -> List[AddressLookupTableAccount]:
+    # Tables holding the AMM accounts, the way Jupiter routes are usually compressed
+    addresses = [fake_pubkey("amm", seed, hop, i)
+                 for seed in range(8) for hop in range(8) for i in range(ACCOUNTS_PER_HOP)]
+    return [AddressLookupTableAccount(fake_pubkey("table", i), addresses[i * TABLE_SIZE:(i + 1) * TABLE_SIZE])
+            for i in range(-(-len(addresses) // TABLE_SIZE))]
+
+
+def per_account_calls(message: MessageV0) -> List[Instruction]:
+    # try_to_payer.convert_message_v0_to_instructions before message_decompiler
+    instructions = []
+    for compiled in message.instructions:
+        accounts = [AccountMeta(message.account_keys[index], message.is_signer(index), message.is_maybe_writable(index))
+                    for index in compiled.accounts]
+        instructions.append(Instruction(message.account_keys[compiled.program_id_index], compiled.data, accounts))
+    return instructions
+
+
+def per_instruction_sets(message: MessageV0) -> List[Instruction]:
+    # try_to_payer.versioned_tx_to_instructions before message_decompiler
+    account_keys = message.account_keys
+    header = message.header
+    instructions = []
+    for compiled in message.instructions:
+        signers = set(range(header.num_required_signatures))
+        writables = set(range(header.num_required_signatures - header.num_readonly_signed_accounts))
+        writables |= set(range(header.num_required_signatures,
+                               header.num_required_signatures + header.num_readonly_unsigned_accounts))
+        accounts = [AccountMeta(account_keys[index], index in signers, index in writables)
+                    for index in compiled.accounts]
+        instructions.append(Instruction(account_keys[compiled.program_id_index], compiled.data, accounts))
+    return instructions
+
+
+def time_per_message(decompile: Callable[[MessageV0], List[Instruction]], messages: List[MessageV0]) -> float:
+    started = time.perf_counter()
+    for message in messages:
+        decompile(message)
+    return (time.perf_counter() - started) / len(messages)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark MessageV0 decompilation")
+    parser.add_argument("--hops", type=int, default=4)
+    parser.add_argument("--messages", type=int, default=500)
+    args = parser.parse_args()
+
+    user = Keypair().pubkey()
+    tables = lookup_tables()
+    by_key: Dict[Pubkey, AddressLookupTableAccount] = {table.key: table for table in tables}
+    static = [build_route_message(user, args.hops, seed, []) for seed in range(args.messages)]
+    with_tables = [build_route_message(user, args.hops, seed, tables) for seed in range(args.messages)]
+
+    # Decompiling and recompiling must give back the same message
+    for message, used_tables in ((static[0], []), (with_tables[0], tables)):
+        rebuilt = MessageV0.try_compile(user, decompile_message(message, by_key), used_tables, Hash.default())
+        assert to_bytes_versioned(rebuilt) == to_bytes_versioned(message), "round trip changed the message"
+
+    sample = static[0]
+    print(f"{args.messages} messages, {args.hops} hops, {len(sample.instructions)} instructions, "
+          f"{len(sample.account_keys)} static accounts ({len(with_tables[0].account_keys)} with lookup tables)\n")
+    print(f"{'path':<34}{'µs/message':>12}{'speedup':>10}")
+    baseline = time_per_message(per_account_calls, static)
+    rows = [
+        ("is_signer/is_maybe_writable calls", baseline),
+        ("role sets per instruction", time_per_message(per_instruction_sets, static)),
+        ("message_decompiler", time_per_message(decompile_message, static)),
+        ("message_decompiler + lookup tables", time_per_message(lambda m: decompile_message(m, by_key), with_tables)),
+    ]
+    for name, seconds in rows:
+        print(f"{name:<34}{seconds * 1e6:>12.1f}{baseline / seconds:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+End-to-end latency benchmark for the swap flows against the local mock server.
+
+Usage:
+    python bench_flows.py --iterations 50 --concurrency 4 --latency-ms 20 --jitter-ms 5
+"""
+import argparse
+import asyncio
+import contextlib
+import importlib
+import io
+import os
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from solders.keypair import Keypair
+
+from latency_stats import summarize_ms
+from local_http import JsonHttpServer
+from mock_server import JUPITER_PREFIX, MockChain
+
+FLOWS = {
+    "swap": ("jupiter_swap", "main"),
+    "gas-payer-swap": ("jupiter_swap_gas_payer", "main"),
+    "ata-swap": ("combined_ata_swap", "perform_swap"),
+    "instruction-api-swap": ("jupiter_swap_instruction_api", "main"),
+}
+
+
+def configure_environment(server_url: str) -> None:
+    """Point config at the mock server and give the scripts throwaway wallets."""
+    os.environ["HELIUS_RPC_ENDPOINT"] = server_url
+    os.environ["JUPITER_API_URL"] = f"{server_url}{JUPITER_PREFIX}"
+    os.environ["PRIVATE_KEY"] = str(Keypair())
+    os.environ["PRIVATE_KEY_TrueNorthTest_2"] = str(Keypair())
+    os.environ["FEE_ACCOUNT"] = str(Keypair().pubkey())
+
+
+async def run_flow(
+    flow: Callable[[], Awaitable[Optional[str]]], iterations: int, concurrency: int
+) -> Dict[str, float]:
+    latencies: List[float] = []
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one() -> None:
+        nonlocal errors
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                succeeded = await flow() is not None
+            except Exception:
+                succeeded = False
+            if succeeded:
+                latencies.append(time.perf_counter() - started)
+            else:
+                errors += 1
+
+    started = time.perf_counter()
+    # The scripts narrate every step; keep the report readable
+    with contextlib.redirect_stdout(io.StringIO()):
+        await asyncio.gather(*(one() for _ in range(iterations)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "ok": len(latencies),
+        "errors": errors,
+        **summarize_ms(latencies),
+        "throughput": len(latencies) / elapsed if elapsed else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the swap flows against the local mock server")
+    parser.add_argument("--flows", nargs="+", choices=sorted(FLOWS), default=list(FLOWS))
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--jitter-ms", type=float, default=5.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    chain = MockChain(args.latency_ms, args.jitter_ms, args.error_rate, seed=0)
+    server = JsonHttpServer(chain.handle)
+    # The flows still make some blocking calls, so the server gets its own loop
+    configure_environment(server.start_in_thread())
+
+    print(f"Mock latency {args.latency_ms}±{args.jitter_ms} ms, error rate {args.error_rate:.1%}, "
+          f"{args.iterations} iterations x {args.concurrency} concurrent\n")
+    print(f"{'flow':<22}{'ok':>6}{'errors':>8}{'p50 ms':>10}{'p99 ms':>10}{'mean ms':>10}{'ops/s':>9}")
+    try:
+        for name in args.flows:
+            module_name, function_name = FLOWS[name]
+            flow = getattr(importlib.import_module(module_name), function_name)
+            result = asyncio.run(run_flow(flow, args.iterations, args.concurrency))
+            print(f"{name:<22}{result['ok']:>6}{result['errors']:>8}{result['p50_ms']:>10.1f}"
+                  f"{result['p99_ms']:>10.1f}{result['mean_ms']:>10.1f}{result['throughput']:>9.1f}")
+    finally:
+        server.stop_thread()
+
+
+if __name__ == "__main__":
+    main()
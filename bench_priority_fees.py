@@ -0,0 +1,99 @@
+"""
+Rolling priority-fee windows: sorting on every estimate against FeeWindow.
+
+Replays a stream of getRecentPrioritizationFees polls for a set of
+accounts (a few new slots per poll, like refreshing every couple of
+seconds) and asks for a route's price after each poll.
+
+Usage:
+    python bench_priority_fees.py --accounts 64 --route-accounts 16 --polls 2000
+"""
+import argparse
+import random
+import time
+from collections import deque
+from typing import Deque, Dict, List, Tuple
+
+from latency_stats import percentile
+from priority_fees import DEFAULT_PERCENTILE, RECENT_FEE_SLOTS, FeeWindow
+
+
+class SortedOnRead:
+    """The straightforward version: keep the last slots in a deque and sort when asked."""
+
+    def __init__(self, window: int = RECENT_FEE_SLOTS):
+        self.window = window
+        self.last_slot = -1
+        self.samples: Deque[Tuple[int, int]] = deque()
+
+    def add(self, slot: int, fee: int) -> None:
+        if slot <= self.last_slot:
+            return
+        self.last_slot = slot
+        self.samples.append((slot, fee))
+        while self.samples[0][0] <= slot - self.window:
+            self.samples.popleft()
+
+    def percentile(self, pct: float) -> int:
+        return percentile([fee for _, fee in self.samples], pct)
+
+
+def build_polls(accounts: int, polls: int, slots_per_poll: int, seed: int) -> List[Dict[int, List[Tuple[int, int]]]]:
+    """Each poll returns the full recent window per account, as the RPC does."""
+    rng = random.Random(seed)
+    fees = {account: deque(maxlen=RECENT_FEE_SLOTS) for account in range(accounts)}
+    polls_out = []
+    slot = 0
+    for _ in range(polls):
+        for _ in range(slots_per_poll):
+            slot += 1
+            for account, history in fees.items():
+                busy = 200_000 if account % 8 == 0 else 20_000
+                history.append((slot, 0 if rng.random() < 0.3 else rng.randrange(busy)))
+        polls_out.append({account: list(history) for account, history in fees.items()})
+    return polls_out
+
+
+def replay(window_type, polls, route: List[int]) -> Tuple[float, float, List[int]]:
+    windows = {account: window_type() for account in polls[0]}
+    update_seconds = query_seconds = 0.0
+    prices = []
+    for poll in polls:
+        started = time.perf_counter()
+        for account, samples in poll.items():
+            window = windows[account]
+            for slot, fee in samples:
+                window.add(slot, fee)
+        queried = time.perf_counter()
+        prices.append(max(windows[account].percentile(DEFAULT_PERCENTILE) for account in route))
+        query_seconds += time.perf_counter() - queried
+        update_seconds += queried - started
+    return update_seconds, query_seconds, prices
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark rolling priority-fee percentiles")
+    parser.add_argument("--accounts", type=int, default=64)
+    parser.add_argument("--route-accounts", type=int, default=16)
+    parser.add_argument("--polls", type=int, default=2000)
+    parser.add_argument("--slots-per-poll", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    polls = build_polls(args.accounts, args.polls, args.slots_per_poll, args.seed)
+    route = random.Random(args.seed).sample(range(args.accounts), args.route_accounts)
+    samples = args.polls * args.slots_per_poll * args.accounts
+
+    print(f"{args.polls} polls x {args.accounts} accounts ({args.slots_per_poll} new slots each, "
+          f"window {RECENT_FEE_SLOTS}), p{DEFAULT_PERCENTILE} over {args.route_accounts}-account routes\n")
+    print(f"{'window':<16}{'ns/new sample':>15}{'µs/estimate':>13}")
+    results = {}
+    for name, window_type in (("sort on read", SortedOnRead), ("FeeWindow", FeeWindow)):
+        update_seconds, query_seconds, prices = replay(window_type, polls, route)
+        results[name] = prices
+        print(f"{name:<16}{update_seconds / samples * 1e9:>15.0f}{query_seconds / args.polls * 1e6:>13.1f}")
+    assert results["sort on read"] == results["FeeWindow"], "estimates differ"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Load test for the fee-payer relay, forwarding to the local mock RPC.
+
+Usage:
+    python bench_relay.py --users 50 --requests 2000 --concurrency 64 --user-rate 5
+"""
+import argparse
+import asyncio
+import time
+from collections import Counter
+from typing import Dict, List, Tuple
+
+import httpx
+from solders.keypair import Keypair
+
+from bench_signing import build_swap_transactions
+from fee_relay import FeePayerRelay
+from latency_stats import summarize_ms
+from local_http import JsonHttpServer
+from mock_server import MockChain
+from rpc_client import AsyncRpcClient
+from wire_transaction import WireTransaction
+
+
+def build_requests(payer: Keypair, users: int, count: int) -> List[Tuple[int, str]]:
+    """User-signed sponsored swaps, spread round-robin over `users` wallets."""
+    wallets = [Keypair() for _ in range(users)]
+    per_user = -(-count // users)
+    transactions: Dict[int, List[str]] = {}
+    for index, wallet in enumerate(wallets):
+        pubkeys = [wallet.pubkey()]
+        transactions[index] = [
+            WireTransaction().load_base64(encoded).sign([wallet], pubkeys).to_base64()
+            for encoded in build_swap_transactions(wallet, per_user, payer.pubkey())
+        ]
+    return [(i % users, transactions[i % users][i // users]) for i in range(count)]
+
+
+async def run_load(relay_url: str, requests: List[Tuple[int, str]], concurrency: int):
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    queue: asyncio.Queue = asyncio.Queue()
+    for request in requests:
+        queue.put_nowait(request)
+
+    async with httpx.AsyncClient(base_url=relay_url, timeout=30.0,
+                                 limits=httpx.Limits(max_connections=concurrency)) as client:
+        async def worker() -> None:
+            while not queue.empty():
+                _, transaction = queue.get_nowait()
+                started = time.perf_counter()
+                try:
+                    response = await client.post("/relay", json={"transaction": transaction})
+                    statuses[response.status_code] += 1
+                except httpx.HTTPError:
+                    statuses["error"] += 1
+                    continue
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+        health = (await client.get("/health")).json()
+    return latencies, statuses, elapsed, health
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the fee-payer relay against the local mock server")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--max-inflight", type=int, default=32)
+    parser.add_argument("--user-rate", type=float, default=5.0)
+    parser.add_argument("--user-burst", type=int, default=10)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--jitter-ms", type=float, default=5.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    chain = MockChain(args.latency_ms, args.jitter_ms, args.error_rate, seed=0)
+    rpc_server = JsonHttpServer(chain.handle)
+    rpc_url = rpc_server.start_in_thread()
+
+    payer = Keypair()
+    print(f"Building {args.requests} user-signed transactions for {args.users} users...")
+    requests = build_requests(payer, args.users, args.requests)
+
+    async def run():
+        # The mock uses plain HTTP/1.1
+        rpc = AsyncRpcClient(rpc_url, http2=False)
+        relay = FeePayerRelay(payer, rpc, max_inflight=args.max_inflight,
+                              user_rate=args.user_rate, user_burst=args.user_burst)
+        relay_server = JsonHttpServer(relay.handle)
+        await relay_server.start()
+        try:
+            return await run_load(relay_server.url, requests, args.concurrency)
+        finally:
+            await relay_server.stop()
+            await rpc.aclose()
+
+    try:
+        latencies, statuses, elapsed, health = asyncio.run(run())
+    finally:
+        rpc_server.stop_thread()
+
+    summary = summarize_ms(latencies)
+    print(f"\nMock RPC latency {args.latency_ms}±{args.jitter_ms} ms, {args.concurrency} concurrent clients, "
+          f"max {args.max_inflight} in flight, {args.user_rate}/s per user (burst {args.user_burst})\n")
+    print(f"{'requests':>9}{'p50 ms':>9}{'p99 ms':>9}{'mean ms':>9}{'req/s':>9}   responses")
+    responses = ", ".join(f"{status}: {count}" for status, count in sorted(statuses.items(), key=str))
+    print(f"{sum(statuses.values()):>9}{summary['p50_ms']:>9.1f}{summary['p99_ms']:>9.1f}"
+          f"{summary['mean_ms']:>9.1f}{len(latencies) / elapsed:>9.0f}   {responses}")
+    print(f"\nRelay stats: {', '.join(f'{name} {value}' for name, value in health.items() if name != 'payer')}")
+
+
+if __name__ == "__main__":
+    main()
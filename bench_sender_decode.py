@@ -0,0 +1,140 @@
+"""
+Cost of reading a transaction's sender out of a getTransaction response:
+the JSON-encoded response parsed whole (what get_transaction_sender used to
+do), the base64-encoded response parsed whole, and the base64 response
+byte-scanned so only the start of the transaction is decoded.
+
+Runs over recorded response bodies. Without --fixtures they are recorded
+from the local mock server into a temporary directory; with an empty
+--fixtures directory they are recorded there (from --endpoint if given)
+and reused on later runs.
+
+Usage:
+    python bench_sender_decode.py --count 500
+    python bench_sender_decode.py --fixtures fixtures/ --endpoint https://... --address <address>
+"""
+import argparse
+import importlib
+import json
+import os
+import statistics
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+import requests
+
+from bench_flows import configure_environment
+from local_http import JsonHttpServer
+from mock_server import MockChain
+
+FEE_ACCOUNT = "9mFXMkSBEjMySfTjWwc3zZvYSYom2j6pG9tz5SYbfTqo"
+ENCODINGS = ("json", "base64")
+
+
+def rpc(endpoint: str, method: str, params: list) -> requests.Response:
+    response = requests.post(endpoint, json={"jsonrpc": "2.0", "id": 1, "method": method, "params": params})
+    response.raise_for_status()
+    return response
+
+
+def record_fixtures(directory: str, endpoint: str, address: str, count: int) -> None:
+    """Save raw getTransaction response bodies in both encodings, one file per signature."""
+    infos = rpc(endpoint, "getSignaturesForAddress", [address, {"limit": min(count, 1000)}]).json()["result"]
+    for encoding in ENCODINGS:
+        os.makedirs(os.path.join(directory, encoding), exist_ok=True)
+    for info in infos[:count]:
+        for encoding in ENCODINGS:
+            config = {"encoding": encoding, "maxSupportedTransactionVersion": 0}
+            body = rpc(endpoint, "getTransaction", [info["signature"], config]).content
+            with open(os.path.join(directory, encoding, f"{info['signature']}.json"), "wb") as f:
+                f.write(body)
+
+
+def load_fixtures(directory: str) -> Dict[str, List[bytes]]:
+    names = sorted(os.listdir(os.path.join(directory, "json")))
+    fixtures = {}
+    for encoding in ENCODINGS:
+        fixtures[encoding] = []
+        for name in names:
+            with open(os.path.join(directory, encoding, name), "rb") as f:
+                fixtures[encoding].append(f.read())
+    return fixtures
+
+
+def time_per_body(read_sender: Callable[[bytes], str], bodies: List[bytes], repeat: int) -> float:
+    """Best of `repeat` passes over `bodies`, in microseconds per body."""
+    passes = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for body in bodies:
+            read_sender(body)
+        passes.append(time.perf_counter() - started)
+    return min(passes) / len(bodies) * 1e6
+
+
+def peak_memory_per_body(read_sender: Callable[[bytes], str], bodies: List[bytes]) -> float:
+    """Mean peak of memory allocated while reading one body, in bytes."""
+    peaks = []
+    tracemalloc.start()
+    for body in bodies:
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        read_sender(body)
+        peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+    tracemalloc.stop()
+    return statistics.fmean(peaks)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark sender extraction from getTransaction responses")
+    parser.add_argument("--fixtures", help="directory of recorded responses; recorded into if empty")
+    parser.add_argument("--endpoint", help="RPC to record from (default: the local mock server)")
+    parser.add_argument("--address", default=FEE_ACCOUNT, help="address whose transactions are recorded")
+    parser.add_argument("--count", type=int, default=500, help="transactions to record")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    server = JsonHttpServer(MockChain(latency_ms=0, jitter_ms=0, seed=0).handle)
+    configure_environment(server.start_in_thread())
+    # config reads the endpoint at import time, so anything that imports it loads after this point
+    scan_sender = importlib.import_module("get_tx_sender").scan_sender
+    fee_payer_from_base64 = importlib.import_module("wire_transaction").fee_payer_from_base64
+
+    directory = args.fixtures or tempfile.mkdtemp(prefix="sender-fixtures-")
+    try:
+        if not os.path.isdir(os.path.join(directory, "json")):
+            endpoint = args.endpoint or server.url
+            print(f"Recording {args.count} responses from {endpoint} into {directory}")
+            record_fixtures(directory, endpoint, args.address, args.count)
+    finally:
+        server.stop_thread()
+    fixtures = load_fixtures(directory)
+
+    paths = [
+        ("json, parsed", "json",
+         lambda body: json.loads(body)["result"]["transaction"]["message"]["accountKeys"][0]),
+        ("base64, parsed", "base64",
+         lambda body: str(fee_payer_from_base64(json.loads(body)["result"]["transaction"][0]))),
+        ("base64, byte scan", "base64", scan_sender),
+    ]
+    expected = [paths[0][2](body) for body in fixtures["json"]]
+    for name, encoding, read_sender in paths:
+        assert [read_sender(body) for body in fixtures[encoding]] == expected, f"{name} read different senders"
+
+    count = len(expected)
+    print(f"{count} responses, {statistics.fmean(map(len, fixtures['json'])) / 1e3:.1f} KB as json, "
+          f"{statistics.fmean(map(len, fixtures['base64'])) / 1e3:.1f} KB as base64\n")
+    print(f"{'path':<22}{'µs/response':>14}{'peak KB/response':>19}{'speedup':>10}")
+    baseline = None
+    for name, encoding, read_sender in paths:
+        micros = time_per_body(read_sender, fixtures[encoding], args.repeat)
+        peak = peak_memory_per_body(read_sender, fixtures[encoding])
+        baseline = baseline or micros
+        print(f"{name:<22}{micros:>14.1f}{peak / 1e3:>19.1f}{baseline / micros:>9.1f}x")
+    print("\n✅ All paths agree on every sender")
+
+
+if __name__ == "__main__":
+    main()
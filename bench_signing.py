@@ -0,0 +1,93 @@
+"""
+Signing throughput: the inline path from jupiter_swap.py against SigningService.
+
+Usage:
+    python bench_signing.py --transactions 2000 --workers 4 --chunk-size 64
+"""
+import argparse
+import asyncio
+import base64
+import time
+from typing import List, Optional
+
+from solders.keypair import Keypair
+from solders.message import to_bytes_versioned
+from solders.pubkey import Pubkey
+from solders.transaction import VersionedTransaction
+
+from mock_server import MockChain
+from signing_service import SigningService
+
+SOL_MINT = "So11111111111111111111111111111111111111112"
+USDC_MINT = "EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v"
+
+
+def build_swap_transactions(wallet: Keypair, count: int, payer: Optional[Pubkey] = None) -> List[str]:
+    """Unsigned base64 swap transactions shaped like Jupiter's /swap output."""
+    chain = MockChain()
+    transactions = []
+    for i in range(count):
+        quote = chain.jupiter_quote({"inputMint": SOL_MINT, "outputMint": USDC_MINT,
+                                     "amount": str(10_000 + i), "slippageBps": "50"})
+        body = {"quoteResponse": quote, "userPublicKey": str(wallet.pubkey())}
+        if payer is not None:
+            body["payer"] = str(payer)
+        transactions.append(chain.jupiter_swap(body)["swapTransaction"])
+    return transactions
+
+
+def sign_inline(wallet: Keypair, encoded: List[str]) -> List[bytes]:
+    # What jupiter_swap.main does for each transaction
+    signed = []
+    for transaction_base64 in encoded:
+        raw_tx = VersionedTransaction.from_bytes(base64.b64decode(transaction_base64))
+        signature = wallet.sign_message(to_bytes_versioned(raw_tx.message))
+        signed.append(bytes(VersionedTransaction.populate(raw_tx.message, [signature])))
+    return signed
+
+
+async def sign_with_service(service: SigningService, wallet: Keypair, encoded: List[str]) -> List[bytes]:
+    batch = [(VersionedTransaction.from_bytes(base64.b64decode(transaction_base64)).message, [wallet])
+             for transaction_base64 in encoded]
+    return await service.sign_batch(batch)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare inline signing with the bulk signing service")
+    parser.add_argument("--transactions", type=int, default=2000)
+    parser.add_argument("--workers", type=int, default=None, help="Pool size (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=64)
+    parser.add_argument("--rounds", type=int, default=3, help="Best of this many runs is reported")
+    args = parser.parse_args()
+
+    wallet = Keypair()
+    encoded = build_swap_transactions(wallet, args.transactions)
+    expected = sign_inline(wallet, encoded)
+
+    def best_of(run) -> float:
+        timings = []
+        for _ in range(args.rounds):
+            started = time.perf_counter()
+            signed = run()
+            timings.append(time.perf_counter() - started)
+            assert signed == expected, "signed transactions differ from the inline path"
+        return min(timings)
+
+    print(f"{args.transactions} swap transactions, best of {args.rounds}\n")
+    print(f"{'path':<18}{'seconds':>10}{'tx/s':>12}{'speedup':>10}")
+    baseline = best_of(lambda: sign_inline(wallet, encoded))
+    print(f"{'inline':<18}{baseline:>10.3f}{args.transactions / baseline:>12.0f}{1:>10.2f}")
+
+    for label, use_processes in (("thread pool", False), ("process pool", True)):
+        service = SigningService(args.workers, use_processes, args.chunk_size)
+        try:
+            # Start the workers outside the timed runs
+            asyncio.run(sign_with_service(service, wallet, encoded[:service.max_workers]))
+            elapsed = best_of(lambda: asyncio.run(sign_with_service(service, wallet, encoded)))
+        finally:
+            service.shutdown()
+        print(f"{label:<18}{elapsed:>10.3f}{args.transactions / elapsed:>12.0f}{baseline / elapsed:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
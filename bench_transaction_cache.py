@@ -0,0 +1,95 @@
+"""
+Repeated sender lookups with the finalized getTransaction cache, against
+the local mock server.
+
+The same set of signatures is resolved three times with
+get_transaction_senders: cold, warm, and warm again after reopening the
+cache file (a new process). A fourth run replays the set into a cache
+capped at a fraction of its size to show eviction keeping it bounded.
+
+Usage:
+    python bench_transaction_cache.py --signatures 2000 --latency-ms 40
+"""
+import argparse
+import importlib
+import os
+import tempfile
+import time
+
+from bench_flows import configure_environment
+from local_http import JsonHttpServer
+from mock_server import MockChain
+
+FEE_ACCOUNT = "9mFXMkSBEjMySfTjWwc3zZvYSYom2j6pG9tz5SYbfTqo"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the finalized getTransaction cache")
+    parser.add_argument("--signatures", type=int, default=2000)
+    parser.add_argument("--latency-ms", type=float, default=40.0)
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--capped-fraction", type=float, default=0.25, help="cap for the eviction run")
+    args = parser.parse_args()
+
+    chain = MockChain(args.latency_ms, args.jitter_ms, seed=0)
+    server = JsonHttpServer(chain.handle)
+    workdir = tempfile.mkdtemp(prefix="tx-cache-")
+    configure_environment(server.start_in_thread())
+    os.environ["TRANSACTION_CACHE_PATH"] = os.path.join(workdir, "transaction_cache.sqlite")
+    # config reads the endpoint and cache path at import time, so anything that imports it loads after this point
+    transaction_cache = importlib.import_module("transaction_cache")
+    get_transaction_senders = importlib.import_module("get_tx_sender").get_transaction_senders
+    signatures = [info["signature"] for info in chain.rpc_getSignaturesForAddress(FEE_ACCOUNT, {"limit": 1000})]
+    while len(signatures) < args.signatures:
+        before = signatures[-1]
+        signatures += [info["signature"] for info in
+                       chain.rpc_getSignaturesForAddress(FEE_ACCOUNT, {"limit": 1000, "before": before})]
+    signatures = signatures[:args.signatures]
+
+    def run(name: str) -> dict:
+        cache = transaction_cache.get_transaction_cache()
+        fetched_before = chain.request_counts.get("rpc:getTransaction", 0)
+        hits_before, misses_before = cache.hits, cache.misses
+        started = time.perf_counter()
+        senders = get_transaction_senders(signatures, batch_size=args.batch_size, max_workers=args.workers)
+        elapsed = time.perf_counter() - started
+        fetched = chain.request_counts.get("rpc:getTransaction", 0) - fetched_before
+        hits, misses = cache.hits - hits_before, cache.misses - misses_before
+        ok = sum(isinstance(sender, str) for sender in senders.values())
+        print(f"{name:<22}{ok:>6}{elapsed * 1000:>11.0f}{fetched:>10}{hits / max(hits + misses, 1):>10.0%}")
+        return senders
+
+    print(f"{len(signatures)} signatures, mock latency {args.latency_ms}±{args.jitter_ms} ms, "
+          f"batches of {args.batch_size} x {args.workers} workers\n")
+    print(f"{'pass':<22}{'ok':>6}{'wall ms':>11}{'fetched':>10}{'hit rate':>10}")
+    try:
+        cold = run("cold")
+        assert run("warm") == cold, "cached senders differ"
+        # A new process: same file, fresh connection and counters
+        transaction_cache.get_transaction_cache().close()
+        transaction_cache._shared_cache = transaction_cache.TransactionCache()
+        assert run("reopened") == cold, "reopened senders differ"
+
+        stats = transaction_cache.get_transaction_cache().stats()
+        print(f"\n{stats['entries']} entries, {stats['bytes'] / 1e6:.2f} MB on disk "
+              f"(JSON compressed {stats['compression_ratio']:.1f}x)")
+
+        capped = transaction_cache.TransactionCache(
+            os.path.join(workdir, "capped.sqlite"), max_bytes=int(stats["bytes"] * args.capped_fraction)
+        )
+        full = transaction_cache.get_transaction_cache()
+        config = importlib.import_module("get_tx_sender").GET_TRANSACTION_CONFIG
+        for signature in signatures:
+            capped.put(signature, config, full.get(signature, config))
+        capped_stats = capped.stats()
+        print(f"capped at {capped.max_bytes / 1e6:.2f} MB: {capped_stats['entries']} entries, "
+              f"{capped_stats['bytes'] / 1e6:.2f} MB, {capped_stats['evictions']} evicted")
+        capped.close()
+    finally:
+        server.stop_thread()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""
+Size and lookup latency of the Parquet + SQLite transaction store against
+keeping the crawler's JSON Lines file and scanning it.
+
+Transactions are synthetic getTransaction results shaped like Jupiter
+swaps: a sender from a pool of wallets, AMM accounts drawn from a shared
+pool, loaded lookup-table addresses, inner program calls and token
+balance changes on the sender's accounts.
+
+Usage:
+    python bench_transaction_store.py --transactions 50000 --lookups 2000
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import shutil
+import tempfile
+import time
+from typing import Callable, List
+
+import base58
+
+from latency_stats import summarize_ms
+
+SOL_MINT = "So11111111111111111111111111111111111111112"
+JUPITER_PROGRAM = "JUP6LkbZbjS1jKKwapdHNy74zcZ3tLUZoi5QNyVTaV4"
+TOKEN_PROGRAM = "TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA"
+COMPUTE_BUDGET_PROGRAM = "ComputeBudget111111111111111111111111111111"
+
+
+def fake_key(*seed) -> str:
+    return base58.b58encode(hashlib.sha256(repr(seed).encode()).digest()).decode()
+
+
+def fake_transaction(rng: random.Random, i: int, slot: int, senders: int, amm_accounts: int, mints: int) -> dict:
+    """A getTransaction result (json encoding) for a multi-hop swap."""
+    sender = fake_key("sender", rng.randrange(senders))
+    output_mint = fake_key("mint", rng.randrange(mints))
+    static_keys = [sender, fake_key("ata", sender, SOL_MINT), fake_key("ata", sender, output_mint),
+                   COMPUTE_BUDGET_PROGRAM, JUPITER_PROGRAM, TOKEN_PROGRAM, SOL_MINT, output_mint]
+    loaded = [fake_key("amm", rng.randrange(amm_accounts)) for _ in range(rng.randrange(12, 36))]
+    signature = base58.b58encode(hashlib.sha512(f"tx:{i}".encode()).digest()).decode()
+
+    def balance(index, mint, amount):
+        return {"accountIndex": index, "mint": mint, "owner": sender,
+                "uiTokenAmount": {"amount": str(amount), "decimals": 6}}
+
+    spent, received = rng.randrange(1, 10**10), rng.randrange(1, 10**12)
+    return {
+        "slot": slot,
+        "blockTime": 1_700_000_000 + slot * 2 // 5,
+        "meta": {
+            "err": None if i % 20 else {"InstructionError": [2, {"Custom": 6001}]},
+            "fee": 5_000 + rng.randrange(50_000),
+            "loadedAddresses": {"writable": loaded[: len(loaded) // 2], "readonly": loaded[len(loaded) // 2:]},
+            "innerInstructions": [{"index": 2, "instructions": [{"programIdIndex": 5, "accounts": [], "data": ""}]}],
+            "preTokenBalances": [balance(1, SOL_MINT, spent), balance(2, output_mint, 0)],
+            "postTokenBalances": [balance(1, SOL_MINT, 0), balance(2, output_mint, received)],
+            "logMessages": [f"Program {JUPITER_PROGRAM} invoke [1]"] * 20,
+        },
+        "transaction": {
+            "signatures": [signature],
+            "message": {
+                "accountKeys": static_keys,
+                "header": {"numRequiredSignatures": 1, "numReadonlySignedAccounts": 0,
+                           "numReadonlyUnsignedAccounts": 5},
+                "instructions": [{"programIdIndex": 3, "accounts": [], "data": "3DdGGhkhJbjm"},
+                                 {"programIdIndex": 4, "accounts": list(range(8, 8 + len(loaded))), "data": "x" * 40}],
+            },
+        },
+        "version": 0,
+    }
+
+
+def time_lookups(lookup: Callable, keys: List) -> dict:
+    samples = []
+    for key in keys:
+        started = time.perf_counter()
+        lookup(key)
+        samples.append(time.perf_counter() - started)
+    return summarize_ms(samples)
+
+
+def scan_jsonl(path: str, predicate: Callable[[dict], bool]) -> List[dict]:
+    with open(path, "rb") as f:
+        return [row for row in map(json.loads, f) if predicate(row)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the columnar transaction store")
+    parser.add_argument("--transactions", type=int, default=50_000)
+    parser.add_argument("--lookups", type=int, default=2_000)
+    parser.add_argument("--jsonl-lookups", type=int, default=20, help="full scans are slow; keep this small")
+    parser.add_argument("--senders", type=int, default=5_000)
+    parser.add_argument("--amm-accounts", type=int, default=2_000)
+    parser.add_argument("--mints", type=int, default=200)
+    parser.add_argument("--partition-slots", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    from transaction_store import TransactionStore, decode_transaction
+
+    rng = random.Random(args.seed)
+    slot = 300_000_000
+    results = []
+    for i in range(args.transactions):
+        slot += rng.randrange(0, 4)
+        results.append(fake_transaction(rng, i, slot, args.senders, args.amm_accounts, args.mints))
+
+    workdir = tempfile.mkdtemp(prefix="tx-store-")
+    try:
+        jsonl_path = os.path.join(workdir, "rows.jsonl")
+        raw_bytes = sum(len(json.dumps(result)) for result in results)
+        started = time.perf_counter()
+        rows = [decode_transaction(result) for result in results]
+        decode_seconds = time.perf_counter() - started
+        with open(jsonl_path, "w") as f:
+            f.writelines(json.dumps(row) + "\n" for row in rows)
+
+        started = time.perf_counter()
+        store = TransactionStore(os.path.join(workdir, "store"), partition_slots=args.partition_slots)
+        store.add_many(rows)
+        store.flush()
+        ingest_seconds = time.perf_counter() - started
+        stats = store.stats()
+
+        print(f"{args.transactions} transactions over {slot - 300_000_000} slots\n")
+        print(f"decode {decode_seconds / args.transactions * 1e6:.1f} µs/tx, "
+              f"store ingest {args.transactions / ingest_seconds:,.0f} tx/s "
+              f"({stats['files']} part files)\n")
+        print(f"{'on disk':<28}{'MB':>10}")
+        print(f"{'getTransaction JSON':<28}{raw_bytes / 1e6:>10.1f}")
+        print(f"{'crawler JSON Lines':<28}{os.path.getsize(jsonl_path) / 1e6:>10.1f}")
+        print(f"{'Parquet partitions':<28}{stats['data_bytes'] / 1e6:>10.1f}")
+        print(f"{'SQLite index':<28}{stats['index_bytes'] / 1e6:>10.1f}")
+
+        signatures = [row["signature"] for row in rng.sample(rows, args.lookups)]
+        addresses = [rng.choice(row["account_keys"][8:]) for row in rng.sample(rows, args.lookups)]
+        senders = [row["sender"] for row in rng.sample(rows, args.lookups)]
+        few = slice(0, args.jsonl_lookups)
+        cases = [
+            ("sender by signature", time_lookups(store.sender, signatures),
+             time_lookups(lambda sig: scan_jsonl(jsonl_path, lambda row: row["signature"] == sig), signatures[few])),
+            ("full row by signature", time_lookups(store.get, signatures), None),
+            ("signatures for address", time_lookups(lambda a: store.signatures_for_address(a, 100), addresses),
+             time_lookups(lambda a: scan_jsonl(jsonl_path, lambda row: a in row["account_keys"]), addresses[few])),
+            ("signatures for sender", time_lookups(lambda s: store.signatures_for_sender(s, 100), senders), None),
+        ]
+        print(f"\n{'lookup':<26}{'store p50 ms':>14}{'p99 ms':>10}{'JSONL scan p50 ms':>20}")
+        for name, store_ms, jsonl_ms in cases:
+            jsonl = f"{jsonl_ms['p50_ms']:>20.1f}" if jsonl_ms else f"{'-':>20}"
+            print(f"{name:<26}{store_ms['p50_ms']:>14.3f}{store_ms['p99_ms']:>10.3f}{jsonl}")
+
+        low = 300_000_000 + (slot - 300_000_000) // 3
+        high = low + args.partition_slots // 2
+        started = time.perf_counter()
+        table = store.scan(low, high, columns=["sender", "fee"])
+        scan_ms = (time.perf_counter() - started) * 1000
+        started = time.perf_counter()
+        matched = scan_jsonl(jsonl_path, lambda row: low <= row["slot"] <= high)
+        jsonl_scan_ms = (time.perf_counter() - started) * 1000
+        assert table.num_rows == len(matched)
+        print(f"\nslot range of {table.num_rows} transactions, sender + fee: "
+              f"{scan_ms:.1f} ms from Parquet, {jsonl_scan_ms:.1f} ms from JSON Lines")
+        store.close()
+    finally:
+        shutil.rmtree(workdir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Sign-and-encode cost per swap transaction: the object round trip used by the
+scripts against the in-place WireTransaction path.
+
+Usage:
+    python bench_wire.py --transactions 2000
+"""
+import argparse
+import base64
+import statistics
+import time
+import tracemalloc
+from typing import Callable, List
+
+from solders.keypair import Keypair
+from solders.message import to_bytes_versioned
+from solders.transaction import VersionedTransaction
+
+from bench_signing import build_swap_transactions
+from latency_stats import percentile
+from wire_transaction import WireTransaction
+
+
+def object_path(wallet: Keypair) -> Callable[[str], str]:
+    # jupiter_swap.main before the wire path, plus the encode in send_transaction
+    def run(transaction_base64: str) -> str:
+        raw_tx = VersionedTransaction.from_bytes(base64.b64decode(transaction_base64))
+        signature = wallet.sign_message(to_bytes_versioned(raw_tx.message))
+        signed_tx = VersionedTransaction.populate(raw_tx.message, [signature])
+        return base64.b64encode(bytes(signed_tx)).decode("utf-8")
+    return run
+
+
+def wire_path(wallet: Keypair) -> Callable[[str], str]:
+    wire = WireTransaction()
+    signers, pubkeys = [wallet], [wallet.pubkey()]
+
+    def run(transaction_base64: str) -> str:
+        return wire.load_base64(transaction_base64).sign(signers, pubkeys).to_base64()
+    return run
+
+
+def measure_latency(run: Callable[[str], str], encoded: List[str]) -> List[float]:
+    samples = []
+    for transaction_base64 in encoded:
+        started = time.perf_counter()
+        run(transaction_base64)
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def measure_allocations(run: Callable[[str], str], encoded: List[str]) -> float:
+    """Mean peak of Python-heap allocations while handling one transaction, in bytes."""
+    peaks = []
+    tracemalloc.start()
+    try:
+        for transaction_base64 in encoded:
+            baseline, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            run(transaction_base64)
+            peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+    finally:
+        tracemalloc.stop()
+    return statistics.fmean(peaks)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the object and in-place signing paths")
+    parser.add_argument("--transactions", type=int, default=2000)
+    args = parser.parse_args()
+
+    wallet = Keypair()
+    encoded = build_swap_transactions(wallet, args.transactions)
+    paths = {"object round trip": object_path(wallet), "wire in place": wire_path(wallet)}
+
+    expected = [paths["object round trip"](transaction_base64) for transaction_base64 in encoded]
+    assert [paths["wire in place"](transaction_base64) for transaction_base64 in encoded] == expected, \
+        "wire path output differs from the object path"
+
+    print(f"{args.transactions} swap transactions of ~{len(base64.b64decode(encoded[0]))} bytes\n")
+    print(f"{'path':<20}{'p50 µs':>9}{'p99 µs':>9}{'tx/s':>9}{'peak alloc B':>14}")
+    for name, run in paths.items():
+        samples = measure_latency(run, encoded)
+        allocated = measure_allocations(run, encoded)
+        print(f"{name:<20}{percentile(samples, 50) * 1e6:>9.1f}{percentile(samples, 99) * 1e6:>9.1f}"
+              f"{len(samples) / sum(samples):>9.0f}{allocated:>14.0f}")
+    print("\nPeak alloc counts the Python heap only; solders' own Rust allocations aren't traced.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+import asyncio
+import time
+from typing import Optional, Tuple
+
+from solders.hash import Hash
+
+from rpc_client import AsyncRpcClient, get_rpc_client
+
+# Nominal Solana slot duration; refined from observed slot progress at runtime
+DEFAULT_SLOT_DURATION = 0.4  # seconds
+# Refresh every N slots; a blockhash stays usable for ~150 blocks
+DEFAULT_REFRESH_SLOTS = 10
+# Don't hand out hashes older than this many slots (leaves room to land the tx)
+DEFAULT_MAX_AGE_SLOTS = 60
+
+
+class BlockhashProvider:
+    """
+    Keeps a recent blockhash warm so building a transaction doesn't pay for
+    a getLatestBlockhash round trip.
+
+    A background task refreshes the cached hash every `refresh_slots` slots,
+    using the slot rate observed between refreshes to size the interval.
+    `get()` returns the cached value in O(1) while it is younger than
+    `max_age_slots` and only falls back to a synchronous fetch otherwise.
+    """
+
+    def __init__(
+        self,
+        rpc: Optional[AsyncRpcClient] = None,
+        commitment: str = "finalized",
+        refresh_slots: int = DEFAULT_REFRESH_SLOTS,
+        max_age_slots: int = DEFAULT_MAX_AGE_SLOTS,
+    ):
+        self._rpc = rpc
+        self.commitment = commitment
+        self.refresh_slots = refresh_slots
+        self.max_age_slots = max_age_slots
+        self.slot_duration = DEFAULT_SLOT_DURATION
+
+        self._blockhash: Optional[Tuple[Hash, int]] = None
+        self._fetched_at = 0.0
+        self._context_slot: Optional[int] = None
+        self._inflight: Optional[asyncio.Task] = None
+        self._refresher: Optional[asyncio.Task] = None
+
+    @property
+    def rpc(self) -> AsyncRpcClient:
+        return self._rpc or get_rpc_client()
+
+    @property
+    def refresh_interval(self) -> float:
+        return self.refresh_slots * self.slot_duration
+
+    def start(self) -> None:
+        """Start the background refresher; the first fetch begins immediately."""
+        if self._refresher is None or self._refresher.done():
+            self._refresher = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._refresher is not None:
+            self._refresher.cancel()
+            try:
+                await self._refresher
+            except asyncio.CancelledError:
+                pass
+            self._refresher = None
+
+    def peek(self) -> Optional[Tuple[Hash, int]]:
+        """
+        Returns:
+            Optional[Tuple[Hash, int]]: The cached blockhash and its
+            lastValidBlockHeight, or None if the cache is empty or stale
+        """
+        if self._blockhash is None:
+            return None
+        age_slots = (time.monotonic() - self._fetched_at) / self.slot_duration
+        if age_slots > self.max_age_slots:
+            return None
+        return self._blockhash
+
+    async def get(self) -> Tuple[Hash, int]:
+        """
+        Returns:
+            Tuple[Hash, int]: The freshest non-expired blockhash and its
+            lastValidBlockHeight
+        """
+        cached = self.peek()
+        if cached is not None:
+            return cached
+        return await self.refresh()
+
+    async def refresh(self) -> Tuple[Hash, int]:
+        """Fetch a new blockhash, sharing the request with any fetch already in flight."""
+        if self._inflight is None or self._inflight.done():
+            self._inflight = asyncio.create_task(self._fetch())
+        return await asyncio.shield(self._inflight)
+
+    async def _fetch(self) -> Tuple[Hash, int]:
+        result = await self.rpc.call("getLatestBlockhash", [{"commitment": self.commitment}])
+        now = time.monotonic()
+        slot = result["context"]["slot"]
+        value = result["value"]
+
+        # Track how fast slots actually advance to keep the refresh slot-aligned
+        if self._context_slot is not None and slot > self._context_slot:
+            observed = (now - self._fetched_at) / (slot - self._context_slot)
+            self.slot_duration = 0.8 * self.slot_duration + 0.2 * observed
+
+        self._blockhash = (Hash.from_string(value["blockhash"]), value["lastValidBlockHeight"])
+        self._fetched_at = now
+        self._context_slot = slot
+        return self._blockhash
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                # Keep serving the cached hash; get() falls back to a direct fetch once it's stale
+                print(f"❌ Blockhash refresh failed: {str(e)}")
+            await asyncio.sleep(self.refresh_interval)
+
+
+_shared_provider: Optional[BlockhashProvider] = None
+_shared_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_blockhash_provider() -> BlockhashProvider:
+    """
+    Get the process-wide blockhash provider, starting its refresher on first use.
+
+    Like get_rpc_client(), the provider is tied to the running event loop.
+    """
+    global _shared_provider, _shared_loop
+    loop = asyncio.get_running_loop()
+    if _shared_provider is None or _shared_loop is not loop:
+        _shared_provider = BlockhashProvider()
+        _shared_loop = loop
+        _shared_provider.start()
+    return _shared_provider
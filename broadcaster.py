@@ -0,0 +1,249 @@
+import asyncio
+import base64
+import time
+from typing import Any, Awaitable, Dict, List, Optional, Sequence, Set, TypeVar
+from urllib.parse import urlsplit
+
+from solders.signature import Signature
+
+from config import BROADCAST_RPC_ENDPOINTS, HELIUS_RPC_ENDPOINT
+from confirmation import STATUS_POLL_INTERVAL, reached
+from quote_engine import close_quote_engine
+from rpc_client import DEFAULT_SEND_OPTIONS, AsyncRpcClient, close_rpc_client, get_rpc_client
+from wire_transaction import SIGNATURE_LENGTH, BytesLike, decode_length
+
+# Re-send about every couple of seconds while the blockhash is valid; the
+# runtime dedupes by signature, so the same bytes can't execute twice
+DEFAULT_REBROADCAST_INTERVAL = 2.0  # seconds
+# Block height moves every ~400 ms; checking about once a second bounds how
+# long an expired transaction keeps being polled, whatever the send cadence
+DEFAULT_EXPIRY_CHECK_INTERVAL = 1.0  # seconds
+
+T = TypeVar("T")
+
+
+def endpoint_label(endpoint: str) -> str:
+    """An endpoint's host and path, without the query string (where API keys usually live)."""
+    parts = urlsplit(endpoint)
+    return f"{parts.netloc}{parts.path.rstrip('/')}"
+
+
+class EndpointStats:
+    """What one endpoint did during a broadcast; latencies are from the first send."""
+
+    __slots__ = ("endpoint", "sends", "errors", "ack_latency", "seen_latency", "last_error")
+
+    def __init__(self, endpoint: str):
+        self.endpoint = endpoint
+        self.sends = 0
+        self.errors = 0
+        self.ack_latency: Optional[float] = None  # first accepted sendTransaction
+        self.seen_latency: Optional[float] = None  # first non-null signature status
+        self.last_error: Optional[str] = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "endpoint": endpoint_label(self.endpoint),
+            "sends": self.sends,
+            "errors": self.errors,
+            "ack_ms": None if self.ack_latency is None else self.ack_latency * 1000,
+            "seen_ms": None if self.seen_latency is None else self.seen_latency * 1000,
+            "last_error": self.last_error,
+        }
+
+
+class BroadcastResult:
+    def __init__(self, signature: str, endpoints: Sequence[str]):
+        self.signature = signature
+        self.status: Optional[dict] = None
+        self.expired = False
+        self.rounds = 0
+        self.elapsed = 0.0
+        self.endpoints = {endpoint: EndpointStats(endpoint) for endpoint in endpoints}
+
+    @property
+    def landed(self) -> bool:
+        """Confirmed without an error."""
+        return self.status is not None and self.status.get("err") is None
+
+    def report(self) -> List[Dict[str, Any]]:
+        return [stats.as_dict() for stats in self.endpoints.values()]
+
+    def summary(self) -> str:
+        """One line per endpoint, for printing."""
+        def ms(value: Optional[float]) -> str:
+            return "-" if value is None else f"{value:.0f} ms"
+
+        return "\n".join(
+            f"   {row['endpoint']}: {row['sends']} sends, {row['errors']} errors, "
+            f"accepted after {ms(row['ack_ms'])}, seen after {ms(row['seen_ms'])}"
+            for row in self.report()
+        )
+
+
+def first_signature(tx_bytes: BytesLike) -> str:
+    """The fee payer's signature, i.e. the transaction id, read straight from the wire bytes."""
+    _, offset = decode_length(tx_bytes)
+    return str(Signature.from_bytes(bytes(tx_bytes[offset:offset + SIGNATURE_LENGTH])))
+
+
+class TransactionBroadcaster:
+    """
+    Sends a signed transaction to several RPC endpoints until it confirms or expires.
+
+    Every `rebroadcast_interval` seconds the same bytes go out to all
+    endpoints at once, without waiting on slow ones. In between, each
+    endpoint is asked for the signature's status every `poll_interval`
+    seconds; the first one to report it at `commitment` (or failed) ends
+    the broadcast. The block height is checked every `expiry_check_interval`
+    seconds; once it passes the transaction's lastValidBlockHeight the
+    transaction can no longer land and the broadcast gives up.
+    """
+
+    def __init__(
+        self,
+        endpoints: Optional[Sequence[str]] = None,
+        commitment: str = "confirmed",
+        rebroadcast_interval: float = DEFAULT_REBROADCAST_INTERVAL,
+        poll_interval: float = STATUS_POLL_INTERVAL,
+        expiry_check_interval: float = DEFAULT_EXPIRY_CHECK_INTERVAL,
+        send_options: Optional[Dict[str, Any]] = None,
+    ):
+        self.endpoints = list(endpoints or BROADCAST_RPC_ENDPOINTS)
+        self.commitment = commitment
+        self.rebroadcast_interval = rebroadcast_interval
+        self.poll_interval = poll_interval
+        self.expiry_check_interval = expiry_check_interval
+        # Retries are ours; the node shouldn't queue its own
+        self.send_options = {**DEFAULT_SEND_OPTIONS, "maxRetries": 0, **(send_options or {})}
+        self._clients: Dict[str, AsyncRpcClient] = {}
+
+    def _client(self, endpoint: str) -> AsyncRpcClient:
+        if endpoint == HELIUS_RPC_ENDPOINT:
+            return get_rpc_client()
+        client = self._clients.get(endpoint)
+        if client is None:
+            client = self._clients[endpoint] = AsyncRpcClient(endpoint)
+        return client
+
+    async def aclose(self) -> None:
+        """Close the connection pools opened for endpoints other than the shared client's."""
+        await asyncio.gather(*(client.aclose() for client in self._clients.values()))
+        self._clients.clear()
+
+    async def _send(self, stats: EndpointStats, encoded_tx: str, started: float) -> None:
+        stats.sends += 1
+        try:
+            await self._client(stats.endpoint).call("sendTransaction", [encoded_tx, self.send_options])
+        except Exception as e:
+            stats.errors += 1
+            stats.last_error = str(e)
+            return
+        if stats.ack_latency is None:
+            stats.ack_latency = time.perf_counter() - started
+
+    async def _status(self, stats: EndpointStats, signature: str, started: float) -> Optional[dict]:
+        try:
+            result = await self._client(stats.endpoint).call("getSignatureStatuses", [[signature]])
+            status = result["value"][0]
+        except Exception as e:
+            stats.last_error = str(e)
+            return None
+        if status is not None and stats.seen_latency is None:
+            stats.seen_latency = time.perf_counter() - started
+        return status
+
+    async def _expired(self, last_valid_block_height: int) -> bool:
+        try:
+            height = await self._client(self.endpoints[0]).call("getBlockHeight", [{"commitment": "confirmed"}])
+        except Exception:
+            # Can't tell; keep going and ask again next round
+            return False
+        return height > last_valid_block_height
+
+    async def broadcast(self, tx_bytes: BytesLike, last_valid_block_height: int) -> BroadcastResult:
+        """
+        Broadcast a signed transaction until it confirms or its blockhash expires.
+
+        Args:
+            tx_bytes (bytes-like): The signed wire-format transaction
+            last_valid_block_height (int): The lastValidBlockHeight of its blockhash
+
+        Returns:
+            BroadcastResult: The final status (None if it expired), whether it
+            expired, and per-endpoint send counts and latencies
+        """
+        encoded_tx = base64.b64encode(tx_bytes).decode("utf-8")
+        result = BroadcastResult(first_signature(tx_bytes), self.endpoints)
+        stats = list(result.endpoints.values())
+        sends: Set[asyncio.Task] = set()
+        started = time.perf_counter()
+        next_round = started
+        next_expiry_check = started + self.expiry_check_interval
+        try:
+            while True:
+                now = time.perf_counter()
+                if now >= next_expiry_check:
+                    if await self._expired(last_valid_block_height):
+                        result.expired = True
+                        break
+                    next_expiry_check = time.perf_counter() + self.expiry_check_interval
+                if now >= next_round:
+                    # Fire and forget, so one slow endpoint doesn't hold up the rest
+                    for endpoint_stats in stats:
+                        task = asyncio.create_task(self._send(endpoint_stats, encoded_tx, started))
+                        sends.add(task)
+                        task.add_done_callback(sends.discard)
+                    result.rounds += 1
+                    next_round = time.perf_counter() + self.rebroadcast_interval
+
+                await asyncio.sleep(self.poll_interval)
+                statuses = await asyncio.gather(*(self._status(s, result.signature, started) for s in stats))
+                final = next((status for status in statuses if reached(status, self.commitment)), None)
+                if final is not None:
+                    result.status = final
+                    break
+        finally:
+            for task in list(sends):
+                task.cancel()
+            result.elapsed = time.perf_counter() - started
+        return result
+
+
+_shared_broadcaster: Optional[TransactionBroadcaster] = None
+_shared_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_broadcaster() -> TransactionBroadcaster:
+    """Get the process-wide broadcaster for BROADCAST_RPC_ENDPOINTS on the running event loop."""
+    global _shared_broadcaster, _shared_loop
+    loop = asyncio.get_running_loop()
+    if _shared_broadcaster is None or _shared_loop is not loop:
+        _shared_broadcaster = TransactionBroadcaster()
+        _shared_loop = loop
+    return _shared_broadcaster
+
+
+async def close_broadcaster() -> None:
+    """Close the shared broadcaster's per-endpoint pools, if it was created on this loop."""
+    global _shared_broadcaster, _shared_loop
+    if _shared_broadcaster is not None and _shared_loop is asyncio.get_running_loop():
+        await _shared_broadcaster.aclose()
+    _shared_broadcaster = None
+    _shared_loop = None
+
+
+def run_and_close(main: Awaitable[T]) -> T:
+    """
+    asyncio.run() for scripts: runs `main`, then closes the shared
+    broadcaster's pools, RPC client and quote engine before the loop shuts down.
+    """
+    async def run() -> T:
+        try:
+            return await main
+        finally:
+            await close_broadcaster()
+            await close_rpc_client()
+            await close_quote_engine()
+
+    return asyncio.run(run())
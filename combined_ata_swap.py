@@ -1,27 +1,21 @@
 import os
-import base64
-import time
-import httpx
 import requests
-from solana.rpc.api import Client
-from solana.rpc.commitment import Confirmed
 from solders.keypair import Keypair
 from solders.pubkey import Pubkey
 from solders.transaction import VersionedTransaction
-from solders.message import MessageV0, to_bytes_versioned
-from spl.token.instructions import (
-    get_associated_token_address,
-    create_associated_token_account,
-)
+from solders.message import MessageV0
+from spl.token.instructions import create_associated_token_account
 from dotenv import load_dotenv
+from broadcaster import get_broadcaster, run_and_close
+from config import JUPITER_API_URL
+from quote_cache import fetch_quote
+from blockhash_cache import get_blockhash_provider
+from ata_resolver import get_ata_resolver
+from wire_transaction import WireTransaction
 
 # Load environment variables
 load_dotenv()
 
-# Setup RPC connection
-client = Client(
-    f"https://mainnet.helius-rpc.com/?api-key={os.getenv('HELIUS_API_KEY')}"
-)
 wallet = Keypair.from_base58_string(os.getenv("PRIVATE_KEY"))
 
 async def create_ata_if_not_exists(mint: str, owner_address: str) -> str:
@@ -29,14 +23,16 @@ async def create_ata_if_not_exists(mint: str, owner_address: str) -> str:
     # Calculate target user's ATA address
     owner = Pubkey.from_string(owner_address)
     mint_pubkey = Pubkey.from_string(mint)
-    ata_address = get_associated_token_address(owner, mint_pubkey)
 
-    print(f"Checking ATA address: {ata_address}")
+    # Check if ATA exists (known ATAs are answered from cache)
+    # Warm the blockhash cache while the ATA is looked up
+    blockhashes = get_blockhash_provider()
+    ata_resolver = get_ata_resolver()
+    ata_address, ata_exists = await ata_resolver.exists(owner, mint_pubkey)
 
-    # Check if ATA exists
-    ata_info = client.get_account_info(ata_address, commitment=Confirmed)
+    print(f"Checking ATA address: {ata_address}")
 
-    if ata_info.value is None:
+    if not ata_exists:
         print("ATA doesn't exist, creating...")
 
         # Create ATA instruction
@@ -47,46 +43,24 @@ async def create_ata_if_not_exists(mint: str, owner_address: str) -> str:
         )
 
         # Create MessageV0
+        recent_blockhash, last_valid_block_height = await blockhashes.get()
         message = MessageV0.try_compile(
             payer=wallet.pubkey(),
             instructions=[instruction],
             address_lookup_table_accounts=[],
-            recent_blockhash=client.get_latest_blockhash().value.blockhash
+            recent_blockhash=recent_blockhash
         )
 
         # Create and sign VersionedTransaction
         tx = VersionedTransaction(message, [wallet])
 
-        # Encode transaction
-        encoded_tx = base64.b64encode(bytes(tx)).decode("utf-8")
-
-        # Send transaction
-        headers = {"Content-Type": "application/json"}
-        data = {
-            "jsonrpc": "2.0",
-            "id": 1,
-            "method": "sendTransaction",
-            "params": [
-                encoded_tx,
-                {
-                    "skipPreflight": True,
-                    "preflightCommitment": "finalized",
-                    "encoding": "base64",
-                    "maxRetries": None,
-                    "minContextSlot": None,
-                },
-            ],
-        }
-
-        response = httpx.post(
-            f"https://mainnet.helius-rpc.com/?api-key={os.getenv('HELIUS_API_KEY')}",
-            headers=headers,
-            json=data,
-        )
-        
-        print("ATA creation response:", response.json()['result'])
-        # wait 1 second to make sure the ATA is created
-        time.sleep(1)
+        # Broadcast until it confirms, so the ATA has landed before it's used as feeAccount
+        ata_resolver.forget(ata_address)
+        result = await get_broadcaster().broadcast(bytes(tx), last_valid_block_height)
+        print("ATA creation response:", result.signature)
+        if not result.landed:
+            raise Exception(f"ATA creation {'expired' if result.expired else 'failed: ' + str(result.status['err'])}")
+        ata_resolver.mark_existing(ata_address)
         return ata_address
     else:
         print("ATA already exists")
@@ -106,7 +80,6 @@ async def perform_swap():
     
     try:
         # Get quote for swap
-        quote_url = "https://api.jup.ag/swap/v1/quote"
         params = {
             "inputMint": "So11111111111111111111111111111111111111112",  # SOL
             "outputMint": output_token,  # Pipin
@@ -116,11 +89,11 @@ async def perform_swap():
             "platformFeeBps": "50",  # 0.5% fee
         }
 
-        quote_response = requests.get(quote_url, params=params).json()
+        quote_response = await fetch_quote(params)
         print("✅ Quote received")
 
         # Create swap transaction with priority fee estimation
-        swap_url = "https://api.jup.ag/swap/v1/swap"
+        swap_url = f"{JUPITER_API_URL}/swap"
         swap_payload = {
             "quoteResponse": quote_response,
             "userPublicKey": str(wallet.pubkey()),
@@ -140,40 +113,25 @@ async def perform_swap():
         print("✅ Swap created")
 
         # Execute swap
-        transaction_base64 = swap_response["swapTransaction"]
-        raw_tx = VersionedTransaction.from_bytes(base64.b64decode(transaction_base64))
-        signature = wallet.sign_message(to_bytes_versioned(raw_tx.message))
-        signed_tx = VersionedTransaction.populate(raw_tx.message, [signature])
-        encoded_tx = base64.b64encode(bytes(signed_tx)).decode("utf-8")
-
-        headers = {"Content-Type": "application/json"}
-        data = {
-            "jsonrpc": "2.0",
-            "id": 1,
-            "method": "sendTransaction",
-            "params": [
-                encoded_tx,
-                {
-                    "skipPreflight": True,
-                    "preflightCommitment": "finalized",
-                    "encoding": "base64",
-                    "maxRetries": None,
-                    "minContextSlot": None,
-                },
-            ],
-        }
-
-        tx_response = httpx.post(
-            f"https://mainnet.helius-rpc.com/?api-key={os.getenv('HELIUS_API_KEY')}",
-            headers=headers,
-            json=data,
-        )
-
-        print("Transaction result:", tx_response.json()['result'])
+        # Sign in place in the wire bytes instead of rebuilding the transaction
+        signed_tx = WireTransaction().load_base64(swap_response["swapTransaction"]).sign([wallet])
+
+        # Send to every broadcast endpoint, re-sending until it confirms or the blockhash expires
+        result = await get_broadcaster().broadcast(signed_tx.wire, swap_response["lastValidBlockHeight"])
+        if not result.landed:
+            print(f"❌ Transaction {result.signature} "
+                  f"{'expired before confirming' if result.expired else 'failed: ' + str(result.status['err'])}")
+            print(result.summary())
+            return None
+        print(f"✅ Transaction confirmed in {result.elapsed:.1f}s after {result.rounds} broadcast round(s)")
+        print(result.summary())
+        tx_signature = result.signature
+
+        print("Transaction result:", tx_signature)
+        return tx_signature
 
     except Exception as e:
         print(f"❌ Error during swap: {str(e)}")
 
 if __name__ == "__main__":
-    import asyncio
-    asyncio.run(perform_swap()) 
\ No newline at end of file
+    run_and_close(perform_swap()) 
\ No newline at end of file
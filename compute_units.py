@@ -0,0 +1,136 @@
+import base64
+import math
+import time
+from typing import Any, Dict, Hashable, List, Optional, Tuple, Union
+
+from config import SIMULATE_COMPUTE_UNITS
+from rpc_client import AsyncRpcClient, get_rpc_client
+
+MAX_COMPUTE_UNIT_LIMIT = 1_400_000
+# Headroom over the simulated usage; account state (e.g. whether an ATA
+# exists yet) shifts the real cost a little from run to run
+DEFAULT_MARGIN = 0.15
+DEFAULT_MIN_HEADROOM = 5_000  # compute units
+# Re-simulate a route after this long in case its cost drifted
+DEFAULT_MAX_AGE = 300.0  # seconds
+
+
+class SimulationFailed(Exception):
+    """Raised when simulateTransaction reports an error; the transaction wouldn't land either."""
+
+    def __init__(self, err: Any, logs: Optional[List[str]] = None):
+        super().__init__(f"Simulation failed: {err}")
+        self.err = err
+        self.logs = logs or []
+
+
+class ComputeUnitSizer:
+    """
+    Compute unit limits sized from simulateTransaction, cached per route.
+
+    The transaction is simulated with the maximum limit, the node's latest
+    blockhash and no signature checks, so it can run before signing; the
+    limit is unitsConsumed plus `margin` (at least `min_headroom` units).
+    Hot routes reuse the cached limit until it's `max_age` seconds old or
+    invalidated (e.g. after a transaction ran out of compute).
+    """
+
+    def __init__(
+        self,
+        rpc: Optional[AsyncRpcClient] = None,
+        enabled: bool = SIMULATE_COMPUTE_UNITS,
+        margin: float = DEFAULT_MARGIN,
+        min_headroom: int = DEFAULT_MIN_HEADROOM,
+        max_age: float = DEFAULT_MAX_AGE,
+        commitment: str = "processed",
+    ):
+        self._rpc = rpc
+        self.enabled = enabled
+        self.margin = margin
+        self.min_headroom = min_headroom
+        self.max_age = max_age
+        self.commitment = commitment
+        self._limits: Dict[Hashable, Tuple[int, float]] = {}
+        self.hits = 0
+        self.simulations = 0
+        self.failures = 0
+
+    @property
+    def rpc(self) -> AsyncRpcClient:
+        return self._rpc or get_rpc_client()
+
+    def limit_for(self, units_consumed: int) -> int:
+        headroom = max(math.ceil(units_consumed * self.margin), self.min_headroom)
+        return min(units_consumed + headroom, MAX_COMPUTE_UNIT_LIMIT)
+
+    def get(self, key: Hashable) -> Optional[int]:
+        """The cached limit for a route, or None if it needs simulating."""
+        cached = self._limits.get(key)
+        if cached is None or time.monotonic() - cached[1] > self.max_age:
+            return None
+        self.hits += 1
+        return cached[0]
+
+    def invalidate(self, key: Hashable) -> None:
+        self._limits.pop(key, None)
+
+    async def simulate(self, tx_bytes: Union[bytes, bytearray, memoryview]) -> int:
+        """
+        Simulate an unsigned (or signed) transaction.
+
+        Args:
+            tx_bytes (bytes-like): The wire-format transaction, with a compute
+                unit limit high enough not to cut the simulation short
+
+        Returns:
+            int: unitsConsumed
+
+        Raises:
+            SimulationFailed: If the simulated transaction fails
+        """
+        self.simulations += 1
+        encoded_tx = base64.b64encode(tx_bytes).decode("utf-8")
+        result = await self.rpc.call("simulateTransaction", [encoded_tx, {
+            "encoding": "base64",
+            "commitment": self.commitment,
+            "sigVerify": False,
+            "replaceRecentBlockhash": True,
+        }])
+        value = result["value"]
+        if value["err"] is not None:
+            self.failures += 1
+            raise SimulationFailed(value["err"], value.get("logs"))
+        return value["unitsConsumed"]
+
+    async def size(self, key: Hashable, tx_bytes: Union[bytes, bytearray, memoryview]) -> int:
+        """
+        Simulate a route's transaction and cache the limit it needs.
+
+        Args:
+            key: The route, e.g. swap_templates.route_key
+            tx_bytes (bytes-like): See simulate()
+
+        Returns:
+            int: The compute unit limit to set
+
+        Raises:
+            SimulationFailed: If the simulated transaction fails
+        """
+        limit = self.limit_for(await self.simulate(tx_bytes))
+        self._limits[key] = (limit, time.monotonic())
+        return limit
+
+    def stats(self) -> Dict[str, int]:
+        return {"routes": len(self._limits), "hits": self.hits,
+                "simulations": self.simulations, "failures": self.failures}
+
+
+_shared_sizer: Optional[ComputeUnitSizer] = None
+
+
+def get_compute_unit_sizer() -> ComputeUnitSizer:
+    """Get the process-wide compute unit sizer (its limits outlive event loops)."""
+    global _shared_sizer
+    if _shared_sizer is None:
+        _shared_sizer = ComputeUnitSizer()
+    return _shared_sizer
@@ -1,3 +1,33 @@
+import os
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
 # Helius RPC configuration
-HELIUS_API_KEY = "YOUR_API_KEY_HERE"  # Replace with your actual Helius API key
-HELIUS_RPC_ENDPOINT = f"https://mainnet.helius-rpc.com/?api-key={HELIUS_API_KEY}" 
\ No newline at end of file
+HELIUS_API_KEY = os.getenv("HELIUS_API_KEY", "YOUR_API_KEY_HERE")  # Set HELIUS_API_KEY in your .env
+HELIUS_RPC_ENDPOINT = os.getenv(
+    "HELIUS_RPC_ENDPOINT", f"https://mainnet.helius-rpc.com/?api-key={HELIUS_API_KEY}"
+)
+HELIUS_WS_ENDPOINT = os.getenv(
+    "HELIUS_WS_ENDPOINT", HELIUS_RPC_ENDPOINT.replace("https://", "wss://", 1).replace("http://", "ws://", 1)
+)
+
+# Endpoints signed transactions are broadcast to, comma-separated (Helius first by default)
+BROADCAST_RPC_ENDPOINTS = [
+    url.strip() for url in os.getenv("BROADCAST_RPC_ENDPOINTS", HELIUS_RPC_ENDPOINT).split(",") if url.strip()
+]
+
+# Jupiter swap API configuration
+JUPITER_API_URL = os.getenv("JUPITER_API_URL", "https://api.jup.ag/swap/v1")
+
+# Local Parquet + SQLite store of decoded transactions (needs pyarrow)
+TRANSACTION_STORE_DIR = os.getenv("TRANSACTION_STORE_DIR", "transaction_store")
+
+# Read-through cache of finalized getTransaction results; off unless a path is set
+# (e.g. TRANSACTION_CACHE_PATH=transaction_cache.sqlite), or with 0 MB
+TRANSACTION_CACHE_PATH = os.getenv("TRANSACTION_CACHE_PATH", "")
+TRANSACTION_CACHE_MAX_MB = int(os.getenv("TRANSACTION_CACHE_MAX_MB", "512"))
+
+# Size compute unit limits by simulating locally assembled swaps
+SIMULATE_COMPUTE_UNITS = os.getenv("SIMULATE_COMPUTE_UNITS", "true").lower() in ("1", "true", "yes")
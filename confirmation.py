@@ -0,0 +1,307 @@
+import asyncio
+import itertools
+import json
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+import websockets
+
+from config import HELIUS_WS_ENDPOINT
+from rpc_client import AsyncRpcClient, get_rpc_client
+
+COMMITMENT_LEVELS = {"processed": 0, "confirmed": 1, "finalized": 2}
+MAX_SIGNATURES_PER_STATUS_REQUEST = 256
+# Poll about once a slot without a websocket, and only as a safety net with one
+STATUS_POLL_INTERVAL = 0.4  # seconds
+WS_STATUS_POLL_INTERVAL = 2.0  # seconds
+WS_MAX_BACKOFF = 30.0  # seconds
+
+TrackedKey = Tuple[str, str]  # (signature, commitment)
+
+
+class ConfirmationTimeout(asyncio.TimeoutError):
+    """Raised when a signature doesn't reach the requested commitment in time."""
+
+
+def reached(status: Optional[dict], commitment: str) -> bool:
+    """Whether a getSignatureStatuses entry is final for `commitment` (landed or failed)."""
+    if status is None:
+        return False
+    if status.get("err") is not None:
+        return True
+    return COMMITMENT_LEVELS.get(status.get("confirmationStatus"), -1) >= COMMITMENT_LEVELS[commitment]
+
+
+class SignatureTracker:
+    """
+    Tracks many transaction signatures until they reach a commitment level.
+
+    Each tracked signature gets a signatureSubscribe over one shared
+    websocket; a background poller checks every pending signature with
+    batched getSignatureStatuses calls, which covers a dropped or
+    unavailable websocket. Whichever sees the signature first resolves it.
+    """
+
+    def __init__(
+        self,
+        rpc: Optional[AsyncRpcClient] = None,
+        ws_endpoint: Optional[str] = HELIUS_WS_ENDPOINT,
+        poll_interval: float = STATUS_POLL_INTERVAL,
+        ws_poll_interval: float = WS_STATUS_POLL_INTERVAL,
+    ):
+        self._rpc = rpc
+        self.ws_endpoint = ws_endpoint
+        self.poll_interval = poll_interval
+        self.ws_poll_interval = ws_poll_interval
+
+        self._pending: Dict[TrackedKey, asyncio.Future] = {}
+        self._waiters: Dict[TrackedKey, int] = {}
+        self._wakeup = asyncio.Event()
+        self._ws = None
+        self._ws_ids = itertools.count(1)
+        self._ws_requests: Dict[int, TrackedKey] = {}
+        self._subscriptions: Dict[int, TrackedKey] = {}
+        self._subscription_ids: Dict[TrackedKey, int] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self._poller: Optional[asyncio.Task] = None
+        self._ws_task: Optional[asyncio.Task] = None
+
+    @property
+    def rpc(self) -> AsyncRpcClient:
+        return self._rpc or get_rpc_client()
+
+    def _ensure_running(self) -> None:
+        # Also restarts a loop that has died, so tracking never goes without a poller
+        if self._poller is None or self._poller.done():
+            self._poller = self._spawn(self._poll_loop())
+        if self.ws_endpoint and (self._ws_task is None or self._ws_task.done()):
+            self._ws_task = self._spawn(self._ws_loop())
+
+    def _spawn(self, coroutine) -> asyncio.Task:
+        # Keep a reference so the task isn't garbage collected mid-send
+        task = asyncio.create_task(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._task_done)
+        return task
+
+    def _task_done(self, task: asyncio.Task) -> None:
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            print(f"❌ Signature tracker task failed: {str(task.exception())}")
+
+    async def stop(self) -> None:
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks.clear()
+        self._poller = self._ws_task = None
+
+    def track(self, signature: str, commitment: str = "confirmed") -> asyncio.Future:
+        """
+        Start tracking a signature.
+
+        Returns:
+            asyncio.Future: Resolves to the signature's status once it reaches
+            `commitment` or fails; check status["err"]
+        """
+        key = (signature, commitment)
+        future = self._pending.get(key)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._pending[key] = future
+            self._ensure_running()
+            if self._ws is not None:
+                self._spawn(self._subscribe(key))
+            self._wakeup.set()
+        return future
+
+    async def wait(self, signature: str, commitment: str = "confirmed", timeout: Optional[float] = None) -> dict:
+        """
+        Wait for a signature to reach `commitment`.
+
+        Returns:
+            dict: The signature status; status["err"] is set if the transaction failed
+
+        Raises:
+            ConfirmationTimeout: If `timeout` seconds pass first
+        """
+        key = (signature, commitment)
+        future = self._acquire(key)
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            raise ConfirmationTimeout(f"{signature} not {commitment} after {timeout}s") from None
+        finally:
+            self._release(key)
+
+    async def wait_all(
+        self, signatures: Iterable[str], commitment: str = "confirmed", timeout: Optional[float] = None
+    ) -> Dict[str, Optional[dict]]:
+        """
+        Returns:
+            Dict[str, Optional[dict]]: Each signature's status, or None if it
+            didn't reach `commitment` within `timeout`
+        """
+        keys = [(signature, commitment) for signature in dict.fromkeys(signatures)]
+        futures = [self._acquire(key) for key in keys]
+        try:
+            if futures:
+                await asyncio.wait([asyncio.shield(future) for future in futures], timeout=timeout)
+            return {key[0]: future.result() if future.done() else None for key, future in zip(keys, futures)}
+        finally:
+            for key in keys:
+                self._release(key)
+
+    def _acquire(self, key: TrackedKey) -> asyncio.Future:
+        self._waiters[key] = self._waiters.get(key, 0) + 1
+        return self.track(*key)
+
+    def _release(self, key: TrackedKey) -> None:
+        # Stop tracking a signature once nobody is waiting for it any more
+        self._waiters[key] -= 1
+        if self._waiters[key] == 0:
+            del self._waiters[key]
+            future = self._pending.get(key)
+            if future is not None and not future.done():
+                del self._pending[key]
+                self._unsubscribe(key)
+
+    def _resolve(self, key: TrackedKey, status: dict) -> None:
+        future = self._pending.pop(key, None)
+        if future is not None and not future.done():
+            future.set_result(status)
+        self._unsubscribe(key)
+
+    # Polling fallback
+
+    async def _poll_loop(self) -> None:
+        while True:
+            if not self._pending:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+            try:
+                await self._poll_once()
+            except Exception as e:
+                print(f"❌ Signature status poll failed: {str(e)}")
+            await asyncio.sleep(self.ws_poll_interval if self._ws is not None else self.poll_interval)
+
+    async def _poll_once(self) -> None:
+        signatures = list(dict.fromkeys(signature for signature, _ in self._pending))
+        chunks = [signatures[i:i + MAX_SIGNATURES_PER_STATUS_REQUEST]
+                  for i in range(0, len(signatures), MAX_SIGNATURES_PER_STATUS_REQUEST)]
+        results = await asyncio.gather(*(self.rpc.call("getSignatureStatuses", [chunk]) for chunk in chunks))
+        statuses = {}
+        for chunk, result in zip(chunks, results):
+            statuses.update(zip(chunk, result["value"]))
+        for key in list(self._pending):
+            status = statuses.get(key[0])
+            if reached(status, key[1]):
+                self._resolve(key, status)
+
+    # Websocket subscriptions
+
+    async def _subscribe(self, key: TrackedKey) -> None:
+        ws = self._ws
+        if ws is None:
+            return
+        request_id = next(self._ws_ids)
+        self._ws_requests[request_id] = key
+        signature, commitment = key
+        try:
+            await ws.send(json.dumps({
+                "jsonrpc": "2.0",
+                "id": request_id,
+                "method": "signatureSubscribe",
+                "params": [signature, {"commitment": commitment}],
+            }))
+        except websockets.ConnectionClosed:
+            self._ws_requests.pop(request_id, None)
+
+    def _unsubscribe(self, key: TrackedKey) -> None:
+        """Cancel the subscription of a signature that was resolved or dropped some other way."""
+        subscription = self._subscription_ids.pop(key, None)
+        if subscription is None:
+            return
+        del self._subscriptions[subscription]
+        if self._ws is not None:
+            self._spawn(self._send_unsubscribe(subscription))
+
+    async def _send_unsubscribe(self, subscription: int) -> None:
+        ws = self._ws
+        if ws is None:
+            return
+        try:
+            await ws.send(json.dumps({
+                "jsonrpc": "2.0",
+                "id": next(self._ws_ids),
+                "method": "signatureUnsubscribe",
+                "params": [subscription],
+            }))
+        except websockets.ConnectionClosed:
+            pass
+
+    def _on_ws_message(self, message: dict) -> None:
+        if "id" in message:
+            key = self._ws_requests.pop(message["id"], None)
+            if key is not None and "result" in message:
+                self._subscriptions[message["result"]] = key
+                self._subscription_ids[key] = message["result"]
+                if key not in self._pending:
+                    # Resolved by polling while the subscribe request was in flight
+                    self._unsubscribe(key)
+            return
+        if message.get("method") != "signatureNotification":
+            return
+        params = message["params"]
+        # The node cancels a signature subscription itself once it has notified
+        key = self._subscriptions.pop(params["subscription"], None)
+        if key is None:
+            return
+        self._subscription_ids.pop(key, None)
+        result = params["result"]
+        value = result["value"]
+        self._resolve(key, {
+            "slot": result["context"]["slot"],
+            "err": value.get("err") if isinstance(value, dict) else None,
+            "confirmationStatus": key[1],
+        })
+
+    async def _ws_loop(self) -> None:
+        backoff = 1.0
+        while True:
+            try:
+                async with websockets.connect(self.ws_endpoint) as ws:
+                    self._ws = ws
+                    backoff = 1.0
+                    for key in list(self._pending):
+                        await self._subscribe(key)
+                    async for raw in ws:
+                        # One bad message mustn't take the subscriptions down with it
+                        try:
+                            self._on_ws_message(json.loads(raw))
+                        except Exception as e:
+                            print(f"❌ Bad signature notification: {str(e)}")
+            except (OSError, websockets.WebSocketException, asyncio.TimeoutError):
+                pass
+            finally:
+                # Subscriptions die with the connection; polling covers the gap
+                self._ws = None
+                self._ws_requests.clear()
+                self._subscriptions.clear()
+                self._subscription_ids.clear()
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, WS_MAX_BACKOFF)
+
+
+_shared_tracker: Optional[SignatureTracker] = None
+_shared_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_signature_tracker() -> SignatureTracker:
+    """Get the process-wide signature tracker for the running event loop."""
+    global _shared_tracker, _shared_loop
+    loop = asyncio.get_running_loop()
+    if _shared_tracker is None or _shared_loop is not loop:
+        _shared_tracker = SignatureTracker()
+        _shared_loop = loop
+    return _shared_tracker
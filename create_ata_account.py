@@ -1,42 +1,36 @@
 import os
-from solana.rpc.api import Client
-from solana.rpc.async_api import AsyncClient
 from solders.transaction import VersionedTransaction
 from solders.keypair import Keypair
 from solders.pubkey import Pubkey
-from spl.token.instructions import (
-    get_associated_token_address,
-    create_associated_token_account,
-)
-from solana.rpc.commitment import Confirmed
+from spl.token.instructions import create_associated_token_account
 from dotenv import load_dotenv
-import base64
 from solders.message import MessageV0, to_bytes_versioned
-import httpx
+from rpc_client import get_rpc_client
+from blockhash_cache import get_blockhash_provider
+from ata_resolver import get_ata_resolver
+from broadcaster import run_and_close
 
 # Load environment variables
 load_dotenv()
 
-# 設定 RPC 連線
-client = Client(
-    f"https://mainnet.helius-rpc.com/?api-key={os.getenv('HELIUS_API_KEY')}"
-)
 payer = Keypair.from_base58_string(os.getenv("PRIVATE_KEY"))
 
 # 目標用戶（Owner）
 owner = Pubkey.from_string(os.getenv("WALLET_ADDRESS_TrueNorthTest_2"))
 
 async def create_ata_if_not_exists(mint: str) -> str:
-    # 計算目標用戶的 ATA 地址
     mint_pubkey = Pubkey.from_string(mint)
-    ata_address = get_associated_token_address(owner, mint_pubkey)
 
-    print("目標用戶的 ATA 地址:", ata_address)
+    # 計算目標用戶的 ATA 地址並檢查是否已存在
+    rpc = get_rpc_client()
+    # 查詢 ATA 的同時預先取得 blockhash
+    blockhashes = get_blockhash_provider()
+    ata_resolver = get_ata_resolver()
+    ata_address, ata_exists = await ata_resolver.exists(owner, mint_pubkey)
 
-    # 檢查 ATA 是否已存在
-    ata_info = client.get_account_info(ata_address, commitment=Confirmed)
+    print("目標用戶的 ATA 地址:", ata_address)
 
-    if ata_info.value is None:
+    if not ata_exists:
         print("ATA 不存在，正在創建...")
 
         # 創建 ATA 指令
@@ -47,48 +41,24 @@ async def create_ata_if_not_exists(mint: str) -> str:
         )
 
         # 創建 MessageV0
+        recent_blockhash, _ = await blockhashes.get()
         message = MessageV0.try_compile(
             payer.pubkey(),
             [instruction],
             [],  # address lookup tables
-            client.get_latest_blockhash().value.blockhash
+            recent_blockhash
         )
 
         # 創建並簽名 VersionedTransaction
         tx = VersionedTransaction(message, [payer])
 
-        # Encode transaction
-        encoded_tx = base64.b64encode(bytes(tx)).decode("utf-8")
-
-        # Send transaction with proper configuration
-        headers = {"Content-Type": "application/json"}
-        data = {
-            "jsonrpc": "2.0",
-            "id": 1,
-            "method": "sendTransaction",
-            "params": [
-                encoded_tx,
-                {
-                    "skipPreflight": True,
-                    "preflightCommitment": "finalized",
-                    "encoding": "base64",
-                    "maxRetries": None,
-                    "minContextSlot": None,
-                },
-            ],
-        }
+        # Send transaction
+        tx_signature = await rpc.send_transaction(bytes(tx))
 
-        response = httpx.post(
-            f"https://mainnet.helius-rpc.com/?api-key={os.getenv('HELIUS_API_KEY')}",
-            headers=headers,
-            json=data,
-        )
-        
-        print("ATA 創建成功:", response.json()['result'])
+        print("ATA 創建成功:", tx_signature)
+        ata_resolver.forget(ata_address)
     else:
         print("ATA 已存在")
 
 # 執行
-import asyncio
-
-asyncio.run(create_ata_if_not_exists(mint="Dfh5DzRgSvvCFDoYc2ciTkMrbDfRKybA4SoFbPmApump"))
+run_and_close(create_ata_if_not_exists(mint="Dfh5DzRgSvvCFDoYc2ciTkMrbDfRKybA4SoFbPmApump"))
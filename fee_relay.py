@@ -0,0 +1,305 @@
+import argparse
+import asyncio
+import base64
+import binascii
+import os
+import struct
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from dotenv import load_dotenv
+from solders.keypair import Keypair
+from solders.message import MessageV0
+from solders.pubkey import Pubkey
+from solders.signature import Signature
+from solders.transaction import VersionedTransaction
+
+from local_http import JsonHttpServer
+from quote_engine import RateLimiter
+from rpc_client import AsyncRpcClient, RpcError, get_rpc_client
+from wire_transaction import SIGNATURE_LENGTH, WireTransaction
+
+# Requests being validated or forwarded at once; beyond this the relay sheds load
+DEFAULT_MAX_INFLIGHT = 256
+# Per-user budget (token bucket)
+DEFAULT_USER_RATE = 5.0  # requests per second
+DEFAULT_USER_BURST = 10
+MAX_TRACKED_USERS = 10_000
+# Most the relay pays in priority fees for one transaction
+DEFAULT_MAX_PRIORITY_FEE_LAMPORTS = 100_000
+# Most signatures a sponsored transaction may require; each adds a base fee the payer covers
+DEFAULT_MAX_SIGNATURES = 4
+# Sponsored transactions are simulated before they're sent, so one that would fail isn't paid for
+DEFAULT_PREFLIGHT_COMMITMENT = "confirmed"
+# sendTransaction's error when the preflight simulation fails
+PREFLIGHT_FAILURE = -32002
+
+COMPUTE_BUDGET_PROGRAM_ID = Pubkey.from_string("ComputeBudget111111111111111111111111111111")
+SET_COMPUTE_UNIT_LIMIT = 2
+SET_COMPUTE_UNIT_PRICE = 3
+# Discriminator plus a u32 unit limit / u64 micro-lamport price; the runtime rejects any other length
+SET_COMPUTE_UNIT_LIMIT_LENGTH = 5
+SET_COMPUTE_UNIT_PRICE_LENGTH = 9
+DEFAULT_INSTRUCTION_COMPUTE_UNITS = 200_000
+MAX_COMPUTE_UNITS = 1_400_000
+MICRO_LAMPORTS_PER_LAMPORT = 1_000_000
+
+_EMPTY_SIGNATURE = bytes(SIGNATURE_LENGTH)
+
+
+class RelayRejected(Exception):
+    """Raised when the relay refuses a transaction; `status` is the HTTP status to answer with."""
+
+    def __init__(self, status: int, reason: str):
+        super().__init__(reason)
+        self.status = status
+        self.reason = reason
+
+
+def priority_fee_lamports(message: MessageV0) -> int:
+    """
+    The priority fee a message's compute budget instructions commit the fee payer to.
+
+    Raises:
+        RelayRejected: If a unit limit or price instruction is malformed
+    """
+    account_keys = message.account_keys
+    compute_units = None
+    micro_lamports = 0
+    budgeted = 0
+    for instruction in message.instructions:
+        if account_keys[instruction.program_id_index] != COMPUTE_BUDGET_PROGRAM_ID:
+            continue
+        budgeted += 1
+        data = bytes(instruction.data)
+        if data[:1] == bytes([SET_COMPUTE_UNIT_LIMIT]):
+            if len(data) != SET_COMPUTE_UNIT_LIMIT_LENGTH:
+                raise RelayRejected(400, "Malformed SetComputeUnitLimit instruction")
+            compute_units = struct.unpack_from("<I", data, 1)[0]
+        elif data[:1] == bytes([SET_COMPUTE_UNIT_PRICE]):
+            if len(data) != SET_COMPUTE_UNIT_PRICE_LENGTH:
+                raise RelayRejected(400, "Malformed SetComputeUnitPrice instruction")
+            micro_lamports = struct.unpack_from("<Q", data, 1)[0]
+    if compute_units is None:
+        compute_units = (len(message.instructions) - budgeted) * DEFAULT_INSTRUCTION_COMPUTE_UNITS
+    compute_units = min(compute_units, MAX_COMPUTE_UNITS)
+    return -(-compute_units * micro_lamports // MICRO_LAMPORTS_PER_LAMPORT)
+
+
+def validate_sponsored(
+    message: MessageV0,
+    payer: Pubkey,
+    max_priority_fee_lamports: int,
+    max_signatures: int = DEFAULT_MAX_SIGNATURES,
+) -> Pubkey:
+    """
+    Check that a message uses `payer` for nothing but paying its fees.
+
+    The payer must be the fee payer (account 0) and no instruction may name
+    it, as an account or as a program. Addresses loaded from lookup tables
+    can't sign, and the runtime rejects a key that appears twice, so
+    checking the static index is enough. The payer covers the base fee of
+    every signature, so at most `max_signatures` may be required.
+
+    Returns:
+        Pubkey: The user, i.e. the first signer after the payer
+
+    Raises:
+        RelayRejected: If the message doesn't meet the policy
+    """
+    account_keys = message.account_keys
+    if account_keys[0] != payer:
+        raise RelayRejected(403, "Relay payer must be the fee payer")
+    if message.header.num_required_signatures < 2:
+        raise RelayRejected(400, "Transaction has no user signer")
+    if message.header.num_required_signatures > max_signatures:
+        raise RelayRejected(403, f"Transaction requires more than {max_signatures} signatures")
+    for instruction in message.instructions:
+        if instruction.program_id_index == 0 or 0 in bytes(instruction.accounts):
+            raise RelayRejected(403, "Relay payer may only pay fees")
+    fee = priority_fee_lamports(message)
+    if fee > max_priority_fee_lamports:
+        raise RelayRejected(403, f"Priority fee {fee} lamports exceeds {max_priority_fee_lamports}")
+    return account_keys[1]
+
+
+class FeePayerRelay:
+    """
+    Co-signs and forwards user transactions that a sponsor account pays for.
+
+    Users build transactions with the relay's payer as fee payer, sign their
+    own slots and POST them to /relay. The relay checks the payer is only
+    used for fees and the user signatures are valid, adds the payer's
+    signature and sends through the shared RPC client with preflight on, so
+    a transaction that would fail is refused rather than landing on the
+    payer's account.
+
+    Admission control keeps at most `max_inflight` requests in progress and
+    answers 503 past that instead of queueing; each user also gets a token
+    bucket and is answered 429 when it runs dry.
+
+    The user is the first signer after the payer, and is only charged once
+    its signature checks out, so nobody can spend another user's budget.
+    The per-user limit is still best-effort: keypairs are free, so a caller
+    rotating through fresh ones gets a fresh bucket each time. The inflight
+    cap and the priority fee ceiling are what bound the payer's exposure;
+    put the relay behind authentication or per-client limits if callers
+    aren't trusted.
+    """
+
+    def __init__(
+        self,
+        payer: Keypair,
+        rpc: Optional[AsyncRpcClient] = None,
+        max_inflight: int = DEFAULT_MAX_INFLIGHT,
+        user_rate: float = DEFAULT_USER_RATE,
+        user_burst: int = DEFAULT_USER_BURST,
+        max_priority_fee_lamports: int = DEFAULT_MAX_PRIORITY_FEE_LAMPORTS,
+        max_signatures: int = DEFAULT_MAX_SIGNATURES,
+        preflight_commitment: str = DEFAULT_PREFLIGHT_COMMITMENT,
+    ):
+        self.payer = payer
+        self.payer_pubkey = payer.pubkey()
+        self._rpc = rpc
+        self.max_inflight = max_inflight
+        self.user_rate = user_rate
+        self.user_burst = user_burst
+        self.max_priority_fee_lamports = max_priority_fee_lamports
+        self.max_signatures = max_signatures
+        self.preflight_commitment = preflight_commitment
+        self.inflight = 0
+        self._user_limits: "OrderedDict[Pubkey, RateLimiter]" = OrderedDict()
+        self.stats = {"relayed": 0, "rejected": 0, "rate_limited": 0, "overloaded": 0, "send_failed": 0}
+
+    @property
+    def rpc(self) -> AsyncRpcClient:
+        return self._rpc or get_rpc_client()
+
+    def _user_limit(self, user: Pubkey) -> RateLimiter:
+        limiter = self._user_limits.get(user)
+        if limiter is None:
+            limiter = RateLimiter(self.user_rate, self.user_burst)
+            self._user_limits[user] = limiter
+            if len(self._user_limits) > MAX_TRACKED_USERS:
+                self._user_limits.popitem(last=False)
+        else:
+            self._user_limits.move_to_end(user)
+        return limiter
+
+    def _cosign(self, tx_bytes: bytes) -> Tuple[WireTransaction, Pubkey]:
+        try:
+            message = VersionedTransaction.from_bytes(tx_bytes).message
+            wire = WireTransaction(len(tx_bytes)).load(tx_bytes)
+        except ValueError as e:
+            raise RelayRejected(400, f"Invalid transaction: {str(e)}")
+        user = validate_sponsored(message, self.payer_pubkey, self.max_priority_fee_lamports, self.max_signatures)
+
+        # Only send what the users have actually signed; the node would drop it anyway
+        message_bytes = bytes(wire.message)
+        signers = message.account_keys[:wire.signature_count]
+        signatures = wire.wire[wire.signatures_offset:wire.message_offset]
+        for index in range(1, wire.signature_count):
+            signature = bytes(signatures[index * SIGNATURE_LENGTH:(index + 1) * SIGNATURE_LENGTH])
+            if signature == _EMPTY_SIGNATURE or not Signature.from_bytes(signature).verify(signers[index], message_bytes):
+                raise RelayRejected(403, f"Missing or invalid signature for {signers[index]}")
+        # Charged only after `user` has proven it signed, so its budget can't be spent by others
+        if not self._user_limit(user).try_acquire():
+            raise RelayRejected(429, f"Rate limit exceeded for {user}")
+
+        wire.set_signature(0, self.payer.sign_message(message_bytes))
+        return wire, user
+
+    async def relay(self, tx_bytes: bytes) -> str:
+        """
+        Validate, co-sign and send one user transaction.
+
+        Returns:
+            str: The transaction signature
+
+        Raises:
+            RelayRejected: If the transaction is refused or can't be sent
+        """
+        if self.inflight >= self.max_inflight:
+            self.stats["overloaded"] += 1
+            raise RelayRejected(503, "Relay is at capacity, retry shortly")
+        self.inflight += 1
+        try:
+            try:
+                wire, _ = self._cosign(tx_bytes)
+            except RelayRejected as e:
+                self.stats["rate_limited" if e.status == 429 else "rejected"] += 1
+                raise
+            try:
+                signature = await self.rpc.send_transaction(
+                    wire.wire, skipPreflight=False, preflightCommitment=self.preflight_commitment
+                )
+            except RpcError as e:
+                if e.code != PREFLIGHT_FAILURE:
+                    self.stats["send_failed"] += 1
+                    raise RelayRejected(502, f"Send failed: {str(e)}")
+                self.stats["rejected"] += 1
+                raise RelayRejected(422, f"Transaction fails simulation: {e.message}")
+            except Exception as e:
+                self.stats["send_failed"] += 1
+                raise RelayRejected(502, f"Send failed: {str(e)}")
+            self.stats["relayed"] += 1
+            return signature
+        finally:
+            self.inflight -= 1
+
+    async def handle(self, method: str, path: str, query: Dict[str, str], body: Any) -> Tuple[int, Any]:
+        """JsonHttpServer handler: POST /relay {"transaction": base64} and GET /health."""
+        if method == "GET" and path == "/health":
+            return 200, {"payer": str(self.payer_pubkey), "inflight": self.inflight, **self.stats}
+        if method != "POST" or path != "/relay":
+            return 404, {"error": "Not found"}
+        if not isinstance(body, dict) or not isinstance(body.get("transaction"), str):
+            return 400, {"error": "Expected {\"transaction\": <base64>}"}
+        try:
+            tx_bytes = base64.b64decode(body["transaction"], validate=True)
+        except binascii.Error:
+            return 400, {"error": "Transaction is not valid base64"}
+        try:
+            return 200, {"signature": await self.relay(tx_bytes)}
+        except RelayRejected as e:
+            return e.status, {"error": e.reason}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fee-payer relay: co-sign and forward sponsored transactions")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8898)
+    parser.add_argument("--max-inflight", type=int, default=DEFAULT_MAX_INFLIGHT)
+    parser.add_argument("--user-rate", type=float, default=DEFAULT_USER_RATE)
+    parser.add_argument("--user-burst", type=int, default=DEFAULT_USER_BURST)
+    parser.add_argument("--max-priority-fee", type=int, default=DEFAULT_MAX_PRIORITY_FEE_LAMPORTS)
+    parser.add_argument("--max-signatures", type=int, default=DEFAULT_MAX_SIGNATURES)
+    args = parser.parse_args()
+
+    load_dotenv()
+    relay = FeePayerRelay(
+        Keypair.from_base58_string(os.getenv("PRIVATE_KEY_TrueNorthTest_2")),
+        max_inflight=args.max_inflight,
+        user_rate=args.user_rate,
+        user_burst=args.user_burst,
+        max_priority_fee_lamports=args.max_priority_fee,
+        max_signatures=args.max_signatures,
+    )
+
+    async def serve():
+        server = JsonHttpServer(relay.handle, args.host, args.port)
+        await server.start()
+        print(f"✅ Relay for fee payer {relay.payer_pubkey} listening on {server.url}")
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await server.stop()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,52 +1,217 @@
+import argparse
 import requests
 import json
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Union
+from requests.adapters import HTTPAdapter
 from config import HELIUS_RPC_ENDPOINT
+from transaction_cache import get_transaction_cache
+from transaction_store import TransactionStore, decode_transaction
+from wire_transaction import fee_payer_from_base64
 
-def get_transaction_sender(tx_signature: str) -> str:
+# Bulk lookup defaults
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_MAX_RETRIES = 2
+
+# A sender address, or a JSON-RPC style error object {"code": ..., "message": ...}
+SenderResult = Union[str, Dict[str, object]]
+
+# No commitment: the RPC default, finalized, so results can be cached
+GET_TRANSACTION_CONFIG = {
+    "encoding": "json",
+    "maxSupportedTransactionVersion": 0
+}
+
+# Only the sender is needed, so the transaction comes back as raw bytes
+GET_TRANSACTION_BASE64_CONFIG = {
+    "encoding": "base64",
+    "maxSupportedTransactionVersion": 0
+}
+
+# The start of the transaction in a base64-encoded getTransaction result,
+# ["<data>", "base64"]. Quotes inside JSON strings (log messages) are escaped,
+# so this can't match there.
+BASE64_TRANSACTION_KEY = b'"transaction"'
+BASE64_TRANSACTION_PATTERN = re.compile(rb'"transaction"\s*:\s*\[\s*"')
+
+# The response members around the result, for slicing it out unparsed. The
+# result's own members come after its key, so the first match is the top-level
+# key; what may follow the result is "id" and "jsonrpc", which are short.
+RESULT_KEY = b'"result"'
+RESULT_KEY_PATTERN = re.compile(rb'"result"\s*:\s*')
+TRAILING_MEMBER_PATTERN = re.compile(rb',\s*"(?:id|jsonrpc)"\s*:\s*(?:"[^"\\]*"|-?\d+|null)\s*$')
+TRAILING_MEMBERS_WINDOW = 128
+
+
+def _build_get_transaction_request(
+    tx_signature: str, request_id: int = 1, config: dict = GET_TRANSACTION_CONFIG
+) -> dict:
+    return {
+        "jsonrpc": "2.0",
+        "id": request_id,
+        "method": "getTransaction",
+        "params": [tx_signature, config]
+    }
+
+
+def _extract_sender(result: dict) -> str:
+    # The first signer in the transaction is typically the sender
+    return result["transaction"]["message"]["accountKeys"][0]
+
+
+def scan_sender(body: bytes) -> Optional[str]:
+    """
+    Read the sender out of a base64-encoded getTransaction response body.
+
+    The body is never parsed as JSON: the base64 transaction is found with a
+    byte scan and only its first bytes are decoded (see fee_payer_from_base64).
+
+    Args:
+        body (bytes): A raw JSON-RPC response, or a cached result
+
+    Returns:
+        Optional[str]: The sender's address, or None if the body holds no
+        base64 transaction (an error or a not-found result)
+
+    Raises:
+        ValueError: If the transaction is truncated
+    """
+    # bytes.find is several times faster than letting the regex look for the key
+    start = body.find(BASE64_TRANSACTION_KEY)
+    match = BASE64_TRANSACTION_PATTERN.match(body, start) if start >= 0 else None
+    if match is None:
+        return None
+    # Only the first few hundred characters are decoded, so don't copy the rest
+    return str(fee_payer_from_base64(memoryview(body)[match.end():]))
+
+
+def result_bytes(body: bytes) -> Optional[memoryview]:
+    """
+    Slice the result out of a raw JSON-RPC response body without parsing it.
+
+    Args:
+        body (bytes): A single JSON-RPC response object
+
+    Returns:
+        Optional[memoryview]: The result's JSON, or None if the body isn't
+        laid out as expected
+    """
+    start = body.find(RESULT_KEY)
+    match = RESULT_KEY_PATTERN.match(body, start) if start >= 0 else None
+    if match is None:
+        return None
+    end = len(body.rstrip())
+    if not end or body[end - 1:end] != b"}":
+        return None
+    end -= 1
+    # Drop "id" and "jsonrpc" if they come after the result
+    while True:
+        window = max(match.end(), end - TRAILING_MEMBERS_WINDOW)
+        member = TRAILING_MEMBER_PATTERN.search(body, window, end)
+        if member is None:
+            break
+        end = member.start()
+    return memoryview(body)[match.end():end]
+
+
+def _get_sender_from_bytes(tx_signature: str) -> str:
+    """
+    get_transaction_sender without a store: fetch the transaction as base64
+    and scan the sender out of the raw response. A fetched result is cached
+    as the bytes sliced out of the response; the body is only parsed to
+    report an error.
+    """
+    cache = get_transaction_cache()
+    try:
+        cached = cache.get_raw(tx_signature, GET_TRANSACTION_BASE64_CONFIG) if cache is not None else None
+        sender = scan_sender(cached) if cached is not None else None
+        if sender is not None:
+            return sender
+
+        payload = _build_get_transaction_request(tx_signature, config=GET_TRANSACTION_BASE64_CONFIG)
+        response = requests.post(HELIUS_RPC_ENDPOINT, json=payload)
+        response.raise_for_status()
+
+        sender = scan_sender(response.content)
+        if sender is not None:
+            raw = result_bytes(response.content) if cache is not None else None
+            if raw is not None:
+                cache.put_raw(tx_signature, GET_TRANSACTION_BASE64_CONFIG, raw)
+            return sender
+
+        # No transaction in the body: an error object or a null result
+        result = response.json()
+        if "error" in result:
+            return f"Error: {result['error']['message']}"
+        return "Error: Transaction not found"
+
+    except requests.exceptions.RequestException as e:
+        return f"Error making request: {str(e)}"
+    except (KeyError, IndexError) as e:
+        return f"Error parsing response: {str(e)}"
+    except json.JSONDecodeError:
+        return "Error: Invalid JSON response"
+    except ValueError as e:
+        return f"Error parsing response: {str(e)}"
+
+
+def get_transaction_sender(tx_signature: str, store: Optional[TransactionStore] = None) -> str:
     """
     Get the sender's address from a Solana transaction using Helius RPC.
-    
+
+    Without a store only the sender is needed, so the transaction is fetched
+    as base64 and the sender decoded from its first bytes, skipping the JSON
+    parse of the (often large) response. A store needs the whole decoded
+    transaction, so it gets the JSON encoding.
+
     Args:
         tx_signature (str): The transaction signature to look up
-        
+        store (TransactionStore, optional): Answer from here if the transaction
+            is already stored, and store it after fetching otherwise
+
     Returns:
         str: The sender's address or error message
     """
+    if store is None:
+        return _get_sender_from_bytes(tx_signature)
+    sender = store.sender(tx_signature)
+    if sender is not None:
+        return sender
+
+    # A finalized transaction fetched before comes from the local cache
+    cache = get_transaction_cache()
+    cached = cache.get(tx_signature, GET_TRANSACTION_CONFIG) if cache is not None else None
+    if cached is not None:
+        store.add(decode_transaction(cached, tx_signature))
+        return _extract_sender(cached)
+
     # Prepare the RPC request
-    payload = {
-        "jsonrpc": "2.0",
-        "id": 1,
-        "method": "getTransaction",
-        "params": [
-            tx_signature,
-            {
-                "encoding": "json",
-                "maxSupportedTransactionVersion": 0
-            }
-        ]
-    }
-    
+    payload = _build_get_transaction_request(tx_signature)
+
     try:
         # Make the RPC request
         response = requests.post(HELIUS_RPC_ENDPOINT, json=payload)
         response.raise_for_status()  # Raise an exception for bad status codes
-        
+
         # Parse the response
         result = response.json()
-        
+
         # Check for errors in the response
         if "error" in result:
             return f"Error: {result['error']['message']}"
-        
+
         # Extract the sender (first signer) from the transaction
         if result["result"]:
-            transaction_data = result["result"]
-            # The first signer in the transaction is typically the sender
-            sender = transaction_data["transaction"]["message"]["accountKeys"][0]
-            return sender
+            if cache is not None:
+                cache.put(tx_signature, GET_TRANSACTION_CONFIG, result["result"])
+            store.add(decode_transaction(result["result"], tx_signature))
+            return _extract_sender(result["result"])
         else:
             return "Error: Transaction not found"
-            
+
     except requests.exceptions.RequestException as e:
         return f"Error making request: {str(e)}"
     except (KeyError, IndexError) as e:
@@ -54,13 +219,185 @@ def get_transaction_sender(tx_signature: str) -> str:
     except json.JSONDecodeError:
         return "Error: Invalid JSON response"
 
+
+def _chunked(items: Iterable[str], size: int) -> Iterator[List[str]]:
+    iterator = iter(items)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def _create_session(pool_size: int) -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def _rpc_error(code: Optional[int], message: str) -> Dict[str, object]:
+    return {"code": code, "message": message}
+
+
+def _is_retryable(result: SenderResult) -> bool:
+    # "Transaction not found" is a definitive answer, everything else is worth another try
+    return isinstance(result, dict) and result.get("code") is not None
+
+
+def _parse_rpc_response(response: dict) -> SenderResult:
+    if "error" in response:
+        error = response["error"]
+        return _rpc_error(error.get("code", -32603), error.get("message", "Unknown error"))
+    if not response.get("result"):
+        return _rpc_error(None, "Transaction not found")
+    try:
+        return _extract_sender(response["result"])
+    except (KeyError, IndexError, TypeError) as e:
+        return _rpc_error(None, f"Error parsing response: {str(e)}")
+
+
+def _fetch_batch(session: requests.Session, tx_signatures: List[str]) -> Dict[str, SenderResult]:
+    """
+    Resolve a batch of signatures with a single JSON-RPC batch request.
+
+    Entries missing from the batch response (or the whole batch, on a
+    transport failure) are reported as retryable errors. Signatures in the
+    transaction cache are answered from it and left out of the request.
+    """
+    results: Dict[str, SenderResult] = {}
+    cache = get_transaction_cache()
+    if cache is not None:
+        for tx_signature in tx_signatures:
+            cached = cache.get(tx_signature, GET_TRANSACTION_CONFIG)
+            if cached is not None:
+                results[tx_signature] = _extract_sender(cached)
+        tx_signatures = [tx_signature for tx_signature in tx_signatures if tx_signature not in results]
+        if not tx_signatures:
+            return results
+
+    payload = [
+        _build_get_transaction_request(tx_signature, request_id)
+        for request_id, tx_signature in enumerate(tx_signatures)
+    ]
+    try:
+        response = session.post(HELIUS_RPC_ENDPOINT, json=payload)
+        response.raise_for_status()
+        items = response.json()
+    except requests.exceptions.RequestException as e:
+        error = _rpc_error(-32000, f"Error making request: {str(e)}")
+        return {**results, **{tx_signature: error for tx_signature in tx_signatures}}
+    except json.JSONDecodeError:
+        error = _rpc_error(-32700, "Error: Invalid JSON response")
+        return {**results, **{tx_signature: error for tx_signature in tx_signatures}}
+
+    # A non-list body means the endpoint rejected the batch as a whole
+    if not isinstance(items, list):
+        error = _parse_rpc_response(items) if isinstance(items, dict) else None
+        if not isinstance(error, dict) or error.get("code") is None:
+            error = _rpc_error(-32600, "Invalid batch response")
+        return {**results, **{tx_signature: error for tx_signature in tx_signatures}}
+
+    fetched = []
+    for item in items:
+        # A non-object item can't be matched to a request; its signature is
+        # reported as missing below and retried
+        if not isinstance(item, dict):
+            continue
+        request_id = item.get("id")
+        if isinstance(request_id, int) and 0 <= request_id < len(tx_signatures):
+            results[tx_signatures[request_id]] = _parse_rpc_response(item)
+            if item.get("result"):
+                fetched.append((tx_signatures[request_id], GET_TRANSACTION_CONFIG, item["result"]))
+    if cache is not None and fetched:
+        cache.put_many(fetched)
+    for tx_signature in tx_signatures:
+        results.setdefault(tx_signature, _rpc_error(-32603, "Missing from batch response"))
+    return results
+
+
+def _fetch_with_retries(
+    session: requests.Session, tx_signatures: List[str], max_retries: int
+) -> Dict[str, SenderResult]:
+    results = _fetch_batch(session, tx_signatures)
+    # Retry failed entries one by one so a single bad item cannot sink the batch again
+    for _ in range(max_retries):
+        failed = [sig for sig, result in results.items() if _is_retryable(result)]
+        if not failed:
+            break
+        for tx_signature in failed:
+            results.update(_fetch_batch(session, [tx_signature]))
+    return results
+
+
+def get_transaction_senders(
+    tx_signatures: Iterable[str],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    max_retries: int = DEFAULT_MAX_RETRIES,
+    session: Optional[requests.Session] = None,
+) -> Dict[str, SenderResult]:
+    """
+    Get the senders of many Solana transactions using JSON-RPC batch requests.
+
+    Signatures are packed into batches of `batch_size` and up to `max_workers`
+    batches are in flight at once over a pooled HTTP session. Entries that fail
+    inside a batch are retried individually up to `max_retries` times.
+
+    Args:
+        tx_signatures (Iterable[str]): The transaction signatures to look up
+        batch_size (int): Number of getTransaction calls per batch request
+        max_workers (int): Number of batches sent concurrently
+        max_retries (int): Per-signature retry attempts for failed entries
+        session (requests.Session, optional): Session to reuse for the requests
+
+    Returns:
+        Dict[str, SenderResult]: Mapping from signature to the sender's address,
+        or to an error object {"code": ..., "message": ...}
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size must be at least 1")
+    if max_workers < 1:
+        raise ValueError("max_workers must be at least 1")
+
+    unique_signatures = dict.fromkeys(tx_signatures)
+    owns_session = session is None
+    if owns_session:
+        session = _create_session(max_workers)
+
+    results: Dict[str, SenderResult] = {}
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(_fetch_with_retries, session, batch, max_retries)
+                for batch in _chunked(unique_signatures, batch_size)
+            ]
+            for future in as_completed(futures):
+                results.update(future.result())
+    finally:
+        if owns_session:
+            session.close()
+    return results
+
+
 def main():
+    parser = argparse.ArgumentParser(description="Look up the sender of a transaction")
+    parser.add_argument(
+        "--store", action="store_true",
+        help="keep the decoded transaction in the TransactionStore (needs pyarrow); "
+             "without it only the sender is fetched",
+    )
+    args = parser.parse_args()
+
     # Get transaction signature from user input
     tx_signature = input("Enter the transaction signature: ")
-    
-    # Get and display the sender
-    sender = get_transaction_sender(tx_signature)
-    
+
+    # Get and display the sender; the store needs the whole transaction, so it's opt-in
+    store = TransactionStore() if args.store else None
+    try:
+        sender = get_transaction_sender(tx_signature, store)
+    finally:
+        if store is not None:
+            store.close()
+
     # Print the result
     if sender.startswith("Error"):
         print(f"\n❌ {sender}")
@@ -68,4 +405,4 @@ def main():
         print(f"\n✅ Transaction sender: {sender}")
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
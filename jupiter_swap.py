@@ -1,27 +1,23 @@
-import httpx
 import requests
-from solana.rpc.api import Client
-import solders
 from solders.keypair import Keypair
 from dotenv import load_dotenv
+from config import JUPITER_API_URL
+from broadcaster import get_broadcaster, run_and_close
+from quote_cache import fetch_quote
+from wire_transaction import WireTransaction
 import os
-import base64
 from solders.keypair import Keypair
 
 # Load environment variables
 load_dotenv()
 
 
-def main():
-    # Set up connection and wallet
-    connection = Client(
-        f"https://mainnet.helius-rpc.com/?api-key={os.getenv('HELIUS_API_KEY')}"
-    )
+async def main():
+    # Set up wallet
     wallet = Keypair.from_base58_string(os.getenv("PRIVATE_KEY"))
 
     try:
         # 1. Get quote for swap
-        quote_url = "https://api.jup.ag/swap/v1/quote"
         params = {
             "inputMint": "So11111111111111111111111111111111111111112",  # SOL
             # "outputMint": "EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v",  # USDC
@@ -34,11 +30,11 @@ def main():
             # "dynamicComputeUnitLimit": True  # Enable dynamic compute unit limit
         }
 
-        quote_response = requests.get(quote_url, params=params).json()
+        quote_response = await fetch_quote(params)
         print("✅ Quote received")
 
         # 2. Create swap transaction with priority fee estimation
-        swap_url = "https://api.jup.ag/swap/v1/swap"
+        swap_url = f"{JUPITER_API_URL}/swap"
         swap_payload = {
             "quoteResponse": quote_response,
             "userPublicKey": str(wallet.pubkey()),
@@ -59,51 +55,21 @@ def main():
         print("✅ Swap created")
 
         # 3. Execute swap
-        # Decode the base64 transaction data
-        transaction_base64 = swap_response["swapTransaction"]
+        # Sign in place in the decoded wire bytes; no VersionedTransaction round trip
+        signed_tx = WireTransaction().load_base64(swap_response["swapTransaction"]).sign([wallet])
 
-
-        raw_tx = solders.transaction.VersionedTransaction.from_bytes(
-            base64.b64decode(transaction_base64)
-        )
-
-        signature = wallet.sign_message(solders.message.to_bytes_versioned(raw_tx.message))
-
-        signed_tx = solders.transaction.VersionedTransaction.populate(
-            raw_tx.message, [signature]
-        )
-
-
-        encoded_tx = base64.b64encode(bytes(signed_tx)).decode("utf-8")
-
-        headers = {"Content-Type": "application/json"}
-        data = {
-            "jsonrpc": "2.0",
-            "id": 1,
-            "method": "sendTransaction",
-            "params": [
-                encoded_tx,
-                {
-                    "skipPreflight": True,
-                    "preflightCommitment": "finalized",
-                    "encoding": "base64",
-                    "maxRetries": None,
-                    "minContextSlot": None,
-                },
-            ],
-        }
-
-        tx_response = httpx.post(
-            f"https://mainnet.helius-rpc.com/?api-key={os.getenv('HELIUS_API_KEY')}",
-            headers=headers,
-            json=data,
-        )
-
-        # Convert base64 to binary buffer and deserialize to Transaction
-        # transaction_data = base64.b64decode(transaction_base64)
-        # transaction = Transaction.deserialize(transaction_data)
-        print("Transaction deserialized successfully")
-        print(tx_response.json()['result'])
+        # Send to every broadcast endpoint, re-sending until it confirms or the blockhash expires
+        result = await get_broadcaster().broadcast(signed_tx.wire, swap_response["lastValidBlockHeight"])
+        if not result.landed:
+            print(f"❌ Transaction {result.signature} "
+                  f"{'expired before confirming' if result.expired else 'failed: ' + str(result.status['err'])}")
+            print(result.summary())
+            return None
+        print(f"✅ Transaction confirmed in {result.elapsed:.1f}s after {result.rounds} broadcast round(s)")
+        print(result.summary())
+        tx_signature = result.signature
+        print(tx_signature)
+        return tx_signature
 
 
 
@@ -112,4 +78,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    run_and_close(main())
@@ -1,31 +1,32 @@
-import httpx
 import requests
-from solana.rpc.api import Client
 import solders
 from solders.keypair import Keypair
 from dotenv import load_dotenv
+from config import JUPITER_API_URL
+from broadcaster import get_broadcaster, run_and_close
+from quote_engine import fetch_quote
+from blockhash_cache import get_blockhash_provider
+from lookup_table_cache import get_lookup_table_cache
+from compute_units import MAX_COMPUTE_UNIT_LIMIT, get_compute_unit_sizer
+from priority_fees import fee_accounts, get_priority_fee_estimator
+from swap_instructions import parse_instructions, parse_swap_instructions
+from swap_templates import get_swap_template_cache, requested_compute_unit_limit, route_key
+from wire_transaction import WireTransaction
 import os
-import base64
+import asyncio
 from solders.keypair import Keypair
 
-# Create the message
-from solders.message import Message, MessageV0
-from solders.transaction import VersionedTransaction
-
 # Load environment variables
 load_dotenv()
 
 
-def main():
-    # Set up connection and wallet
-    client = Client(
-        f"https://mainnet.helius-rpc.com/?api-key={os.getenv('HELIUS_API_KEY')}"
-    )
+async def main():
+    # Start warming the blockhash cache while the quote is fetched
+    blockhashes = get_blockhash_provider()
     wallet = Keypair.from_base58_string(os.getenv("PRIVATE_KEY"))
 
     try:
         # 1. Get quote for swap
-        quote_url = "https://api.jup.ag/swap/v1/quote"
         params = {
             "inputMint": "So11111111111111111111111111111111111111112",  # SOL
             # "outputMint": "EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v",  # USDC
@@ -38,151 +39,103 @@ def main():
             # "dynamicComputeUnitLimit": True  # Enable dynamic compute unit limit
         }
 
-        quote_response = requests.get(quote_url, params=params).json()
+        quote_response = await fetch_quote(params)
         print("✅ Quote received")
 
-        # 2. Create swap transaction with priority fee estimation
-        swap_url = "https://api.jup.ag/swap/v1/swap-instructions"
-        swap_payload = {
-            "quoteResponse": quote_response,
-            "userPublicKey": str(wallet.pubkey()),
-            # "feeAccount": os.getenv("FEE_ACCOUNT"),
-            # "feeAccount": "9mFXMkSBEjMySfTjWwc3zZvYSYom2j6pG9tz5SYbfTqo",
-            "dynamicSlippage": {"minBps": 50, "maxBps": 300},
-            "prioritizationFeeLamports": {
-                "priorityLevelWithMaxLamports": {
-                    "maxLamports": 5000,  # 0.01 SOL max priority fee
-                    "global": False,  # Use local fee market
-                    "priorityLevel": "veryHigh",  # 75th percentile
-                }
-            },
-        }
-
-        instructions_response = requests.post(
-            swap_url, json=swap_payload, headers={"Content-Type": "application/json"}
-        ).json()
-        print("✅ Swap created")
-
-        # Convert the response from string to dictionary if needed
-        if isinstance(instructions_response, str):
-            import json
-
-            instructions_response = json.loads(instructions_response)
-
-        # Create a list to hold all our instructions
-        all_instructions = []
-
-        # Helper function to convert account metas
-        def convert_account_metas(accounts):
-            from solders.instruction import AccountMeta
-            from solders.pubkey import Pubkey
-
-            return [
-                AccountMeta(
-                    pubkey=Pubkey.from_string(acc["pubkey"]),
-                    is_signer=acc["isSigner"],
-                    is_writable=acc["isWritable"],
-                )
-                for acc in accounts
-            ]
-
-        # Add compute budget instructions
-        for compute_instruction in instructions_response["computeBudgetInstructions"]:
-            from solders.instruction import Instruction
-            from solders.pubkey import Pubkey
-
-            compute_ix = Instruction(
-                program_id=Pubkey.from_string(compute_instruction["programId"]),
-                accounts=convert_account_metas(compute_instruction.get("accounts", [])),
-                data=base64.b64decode(compute_instruction["data"]),
+        # Same route as an earlier swap: patch its compiled transaction instead of rebuilding it
+        templates = get_swap_template_cache()
+        fees = get_priority_fee_estimator()
+        sizer = get_compute_unit_sizer()
+        route = route_key(quote_response, wallet.pubkey())
+        template = templates.get(route)
+        compute_unit_limit = sizer.get(route) if sizer.enabled else None
+        if template is not None:
+            print("✅ Reusing compiled route")
+            # Cap the price for the limit the transaction actually carries
+            (recent_blockhash, last_valid_block_height), compute_unit_price = await asyncio.gather(
+                blockhashes.get(),
+                fees.compute_unit_price(template.fee_accounts, compute_unit_limit or template.compute_unit_limit),
             )
-            all_instructions.append(compute_ix)
-
-        # Add setup instructions
-        for setup_instruction in instructions_response["setupInstructions"]:
-            setup_ix = Instruction(
-                program_id=Pubkey.from_string(setup_instruction["programId"]),
-                accounts=convert_account_metas(setup_instruction["accounts"]),
-                data=base64.b64decode(setup_instruction["data"]),
+        else:
+            # 2. Create swap transaction with priority fee estimation
+            swap_url = f"{JUPITER_API_URL}/swap-instructions"
+            swap_payload = {
+                "quoteResponse": quote_response,
+                "userPublicKey": str(wallet.pubkey()),
+                # "feeAccount": os.getenv("FEE_ACCOUNT"),
+                # "feeAccount": "9mFXMkSBEjMySfTjWwc3zZvYSYom2j6pG9tz5SYbfTqo",
+                "dynamicSlippage": {"minBps": 50, "maxBps": 300},
+                # No prioritizationFeeLamports: the compute unit price comes from the
+                # local fee estimator, sampled from the route's own write-locked accounts
+            }
+
+            instructions_response = requests.post(
+                swap_url, json=swap_payload, headers={"Content-Type": "application/json"}
+            ).json()
+            print("✅ Swap created")
+
+            # Convert the response from string to dictionary if needed
+            if isinstance(instructions_response, str):
+                import json
+
+                instructions_response = json.loads(instructions_response)
+
+            # Get the blockhash from the response
+            # blockhash_bytes = bytes(instructions_response['blockhashWithMetadata']['blockhash'])
+            # recent_blockhash = solders.hash.Hash(blockhash_bytes)
+
+            # Compile the message once for the route; the lookup tables keep the route's accounts out of it
+            swap_instruction = parse_instructions([instructions_response["swapInstruction"]])[0]
+            # Until the route is sized the transaction keeps Jupiter's limit; cap the price for it
+            price_limit = compute_unit_limit or requested_compute_unit_limit(
+                parse_swap_instructions(instructions_response)
             )
-            all_instructions.append(setup_ix)
-
-        # Add swap instruction
-        swap_ix = Instruction(
-            program_id=Pubkey.from_string(
-                instructions_response["swapInstruction"]["programId"]
-            ),
-            accounts=convert_account_metas(
-                instructions_response["swapInstruction"]["accounts"]
-            ),
-            data=base64.b64decode(instructions_response["swapInstruction"]["data"]),
-        )
-        all_instructions.append(swap_ix)
-
-        # Add cleanup instruction if present
-        if instructions_response.get("cleanupInstruction"):
-            cleanup_ix = Instruction(
-                program_id=Pubkey.from_string(
-                    instructions_response["cleanupInstruction"]["programId"]
-                ),
-                accounts=convert_account_metas(
-                    instructions_response["cleanupInstruction"]["accounts"]
-                ),
-                data=base64.b64decode(
-                    instructions_response["cleanupInstruction"]["data"]
-                ),
+            (recent_blockhash, last_valid_block_height), lookup_tables, compute_unit_price = await asyncio.gather(
+                blockhashes.get(),
+                get_lookup_table_cache().get_many(instructions_response.get("addressLookupTableAddresses", [])),
+                fees.compute_unit_price(fee_accounts(swap_instruction), price_limit),
+            )
+            template = templates.compile(
+                route,
+                quote_response,
+                instructions_response,
+                payer=wallet.pubkey(),
+                lookup_tables=list(lookup_tables.values()),
+                recent_blockhash=recent_blockhash,
+                compute_unit_price=compute_unit_price,
+                compute_unit_limit=MAX_COMPUTE_UNIT_LIMIT if sizer.enabled else None,
             )
-            all_instructions.append(cleanup_ix)
-
-        # Get the blockhash from the response
-        # blockhash_bytes = bytes(instructions_response['blockhashWithMetadata']['blockhash'])
-        # recent_blockhash = solders.hash.Hash(blockhash_bytes)
-
-        # Create the message
-        message = MessageV0.try_compile(
-            payer=wallet.pubkey(),
-            instructions=all_instructions,
-            address_lookup_table_accounts=[],
-            recent_blockhash=client.get_latest_blockhash().value.blockhash,
-        )
-
-        # Create and sign VersionedTransaction
-        tx = VersionedTransaction(message, [wallet])
-
-        # Encode transaction
-        encoded_tx = base64.b64encode(bytes(tx)).decode("utf-8")
-
-        # Send transaction
-        headers = {"Content-Type": "application/json"}
-        data = {
-            "jsonrpc": "2.0",
-            "id": 1,
-            "method": "sendTransaction",
-            "params": [
-                encoded_tx,
-                {
-                    "skipPreflight": True,
-                    "preflightCommitment": "finalized",
-                    "encoding": "base64",
-                    "maxRetries": None,
-                    "minContextSlot": None,
-                },
-            ],
-        }
-
-        response = httpx.post(
-            f"https://mainnet.helius-rpc.com/?api-key={os.getenv('HELIUS_API_KEY')}",
-            headers=headers,
-            json=data,
-        )
-
-        print(f"✅ Transaction sent: {response.json()}")
 
-        # Wait for confirmation
+        # Size the compute unit limit from a simulation the first time the route is seen
+        if sizer.enabled and compute_unit_limit is None:
+            compute_unit_limit = await sizer.size(
+                route, template.render(quote_response, recent_blockhash, compute_unit_limit=MAX_COMPUTE_UNIT_LIMIT)
+            )
+            print(f"✅ Simulated route: compute unit limit {compute_unit_limit}")
+            # The price was capped for the limit before sizing; cap it for the sized one
+            compute_unit_price = fees.estimate(template.fee_accounts, compute_unit_limit)
+
+        # Patch in this quote's amounts, the blockhash and the compute budget, then sign the wire bytes in place
+        print(f"✅ Compute unit price: {compute_unit_price} micro-lamports")
+        tx = WireTransaction().load(
+            template.render(quote_response, recent_blockhash, compute_unit_price, compute_unit_limit)
+        ).sign([wallet])
+
+        # Send to every broadcast endpoint, re-sending until it confirms or the blockhash expires
+        result = await get_broadcaster().broadcast(tx.wire, last_valid_block_height)
+        if not result.landed:
+            print(f"❌ Transaction {result.signature} "
+                  f"{'expired before confirming' if result.expired else 'failed: ' + str(result.status['err'])}")
+            print(result.summary())
+            return None
+        print(f"✅ Transaction confirmed in {result.elapsed:.1f}s after {result.rounds} broadcast round(s)")
+        print(result.summary())
+        print(f"Transaction signature: {result.signature}")
+        return result.signature
 
     except Exception as e:
         print(f"❌ Error during swap: {str(e)}")
 
 
 if __name__ == "__main__":
-    main()
+    run_and_close(main())
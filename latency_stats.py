@@ -0,0 +1,26 @@
+import math
+import statistics
+from typing import Dict, List
+
+
+def nearest_rank(count: int, pct: float) -> int:
+    """Index of the nearest-rank `pct` percentile (0-100) in `count` sorted samples."""
+    # pct * count / 100 rather than pct / 100 * count, which rounds e.g. 7% of 100 up to 7.000000000000001
+    return max(0, min(count - 1, math.ceil(pct * count / 100) - 1))
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of `samples` (pct in 0-100)."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[nearest_rank(len(ordered), pct)]
+
+
+def summarize_ms(samples: List[float]) -> Dict[str, float]:
+    """p50/p99/mean of latency samples given in seconds, reported in milliseconds."""
+    return {
+        "p50_ms": percentile(samples, 50) * 1000,
+        "p99_ms": percentile(samples, 99) * 1000,
+        "mean_ms": statistics.fmean(samples) * 1000 if samples else 0.0,
+    }
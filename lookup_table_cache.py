@@ -0,0 +1,157 @@
+import asyncio
+import base64
+import struct
+import time
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
+
+from solders.address_lookup_table_account import AddressLookupTable, AddressLookupTableAccount
+from solders.message import Message, MessageV0
+from solders.pubkey import Pubkey
+
+from message_decompiler import MissingLookupTable
+from rpc_client import AsyncRpcClient, get_rpc_client
+
+# getMultipleAccounts accepts at most 100 keys per call
+MAX_ACCOUNTS_PER_REQUEST = 100
+# Tables only ever grow, so a cached copy stays correct for the indexes it
+# has; re-check now and then that nobody extended or deactivated them
+DEFAULT_REVALIDATE_INTERVAL = 30.0  # seconds
+# deactivation_slot and last_extended_slot, right after the 4-byte type tag
+META_SLOTS_OFFSET = 4
+META_SLOTS = struct.Struct("<QQ")
+
+
+class CachedTable(NamedTuple):
+    account: AddressLookupTableAccount
+    slots: Tuple[int, int]  # (deactivation_slot, last_extended_slot)
+    checked_at: float
+
+
+class LookupTableCache:
+    """
+    Keeps address lookup tables loaded across swaps.
+
+    Unknown tables are fetched together with getMultipleAccounts (up to 100
+    per call) and decoded into AddressLookupTableAccounts. A cached table is
+    re-checked after `revalidate_interval` seconds by reading only its
+    deactivation and last-extended slots; if either changed the table is
+    fetched again, otherwise the cached copy is kept.
+    """
+
+    def __init__(
+        self,
+        rpc: Optional[AsyncRpcClient] = None,
+        commitment: str = "confirmed",
+        revalidate_interval: float = DEFAULT_REVALIDATE_INTERVAL,
+    ):
+        self._rpc = rpc
+        self.commitment = commitment
+        self.revalidate_interval = revalidate_interval
+        self._tables: Dict[Pubkey, CachedTable] = {}
+        self.hits = 0
+        self.fetches = 0
+        self.revalidations = 0
+        self.invalidations = 0
+
+    @property
+    def rpc(self) -> AsyncRpcClient:
+        return self._rpc or get_rpc_client()
+
+    def invalidate(self, address: Pubkey) -> None:
+        """Drop a table, e.g. after a lookup index turned out to be out of range."""
+        if self._tables.pop(address, None) is not None:
+            self.invalidations += 1
+
+    async def _get_multiple(self, keys: List[Pubkey], data_slice: Optional[dict] = None) -> List[Optional[bytes]]:
+        chunks = [keys[i:i + MAX_ACCOUNTS_PER_REQUEST] for i in range(0, len(keys), MAX_ACCOUNTS_PER_REQUEST)]
+        config = {"commitment": self.commitment, "encoding": "base64"}
+        if data_slice is not None:
+            config["dataSlice"] = data_slice
+        results = await asyncio.gather(*(
+            self.rpc.call("getMultipleAccounts", [[str(key) for key in chunk], config]) for chunk in chunks
+        ))
+        return [base64.b64decode(value["data"][0]) if value is not None else None
+                for result in results for value in result["value"]]
+
+    async def _fetch(self, keys: List[Pubkey], now: float) -> None:
+        self.fetches += 1
+        for key, data in zip(keys, await self._get_multiple(keys)):
+            if data is None:
+                self._tables.pop(key, None)
+                continue
+            table = AddressLookupTable.deserialize(data)
+            meta = table.meta
+            self._tables[key] = CachedTable(AddressLookupTableAccount(key, table.addresses),
+                                            (meta.deactivation_slot, meta.last_extended_slot), now)
+
+    async def _revalidate(self, keys: List[Pubkey], now: float) -> List[Pubkey]:
+        # Only the two slot fields; the addresses are what we'd be saving on
+        self.revalidations += 1
+        slice_config = {"offset": META_SLOTS_OFFSET, "length": META_SLOTS.size}
+        changed = []
+        for key, data in zip(keys, await self._get_multiple(keys, slice_config)):
+            cached = self._tables[key]
+            if data is None or META_SLOTS.unpack(data) != cached.slots:
+                self.invalidations += 1
+                changed.append(key)
+            else:
+                self._tables[key] = cached._replace(checked_at=now)
+        return changed
+
+    async def get_many(self, addresses: Iterable[Union[Pubkey, str]]) -> Dict[Pubkey, AddressLookupTableAccount]:
+        """
+        Load lookup tables, from the cache where possible.
+
+        Args:
+            addresses (Iterable[Pubkey | str]): Table addresses, e.g. Jupiter's
+                addressLookupTableAddresses
+
+        Returns:
+            Dict[Pubkey, AddressLookupTableAccount]: The tables, in the order asked for
+
+        Raises:
+            MissingLookupTable: If a table doesn't exist on chain
+        """
+        keys = list(dict.fromkeys(
+            address if isinstance(address, Pubkey) else Pubkey.from_string(address) for address in addresses
+        ))
+        now = time.monotonic()
+        missing = [key for key in keys if key not in self._tables]
+        stale = [key for key in keys
+                 if key in self._tables and now - self._tables[key].checked_at > self.revalidate_interval]
+        self.hits += len(keys) - len(missing) - len(stale)
+
+        if stale:
+            missing += await self._revalidate(stale, now)
+        if missing:
+            await self._fetch(missing, now)
+
+        try:
+            return {key: self._tables[key].account for key in keys}
+        except KeyError as e:
+            raise MissingLookupTable(f"Lookup table {e.args[0]} not found") from None
+
+    async def for_message(self, message: Union[Message, MessageV0]) -> Dict[Pubkey, AddressLookupTableAccount]:
+        """Load every table a compiled message looks addresses up in."""
+        lookups = getattr(message, "address_table_lookups", None) or []
+        return await self.get_many(lookup.account_key for lookup in lookups)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "tables": len(self._tables),
+            "hits": self.hits,
+            "fetches": self.fetches,
+            "revalidations": self.revalidations,
+            "invalidations": self.invalidations,
+        }
+
+
+_shared_cache: Optional[LookupTableCache] = None
+
+
+def get_lookup_table_cache() -> LookupTableCache:
+    """Get the process-wide lookup table cache (its tables outlive event loops)."""
+    global _shared_cache
+    if _shared_cache is None:
+        _shared_cache = LookupTableCache()
+    return _shared_cache
@@ -0,0 +1,103 @@
+from typing import List, Mapping, Optional, Union
+
+from solders.address_lookup_table_account import AddressLookupTableAccount
+from solders.instruction import AccountMeta, Instruction
+from solders.message import Message, MessageV0
+from solders.pubkey import Pubkey
+
+AnyMessage = Union[Message, MessageV0]
+LookupTables = Mapping[Pubkey, AddressLookupTableAccount]
+
+
+class MissingLookupTable(KeyError):
+    """Raised when a message references an address lookup table that wasn't supplied."""
+
+
+def _lookups(message: AnyMessage) -> list:
+    # Legacy messages have no lookup section
+    return getattr(message, "address_table_lookups", None) or []
+
+
+def lookup_table_accounts(message: AnyMessage, lookup_tables: LookupTables) -> List[AddressLookupTableAccount]:
+    """
+    The tables a message loads addresses from, e.g. to recompile it.
+
+    Raises:
+        MissingLookupTable: If one of them isn't in `lookup_tables`
+    """
+    try:
+        return [lookup_tables[lookup.account_key] for lookup in _lookups(message)]
+    except KeyError as e:
+        raise MissingLookupTable(f"Lookup table {e.args[0]} not loaded") from None
+
+
+def account_metas(message: AnyMessage, lookup_tables: Optional[LookupTables] = None) -> List[AccountMeta]:
+    """
+    Signer/writable roles for every account a message can reference, by index.
+
+    Static keys take their roles from the message header: the first
+    num_required_signatures keys sign, and the trailing num_readonly_*
+    keys of the signed and unsigned ranges are read-only. Addresses loaded
+    from lookup tables follow, all writable ones (in lookup order) before
+    all read-only ones, and never sign.
+
+    These are the roles the message was compiled with, so recompiling the
+    decompiled instructions reproduces the same header.
+
+    Args:
+        message (MessageV0 | Message): The message
+        lookup_tables (Mapping[Pubkey, AddressLookupTableAccount], optional):
+            Loaded tables, needed if the message has address table lookups
+
+    Returns:
+        List[AccountMeta]: One entry per account index
+
+    Raises:
+        MissingLookupTable: If the message uses a table not in `lookup_tables`
+    """
+    header = message.header
+    static_keys = message.account_keys
+    signed = header.num_required_signatures
+    writable_signed = signed - header.num_readonly_signed_accounts
+    writable_unsigned = len(static_keys) - header.num_readonly_unsigned_accounts
+
+    metas = [AccountMeta(key, True, True) for key in static_keys[:writable_signed]]
+    metas += [AccountMeta(key, True, False) for key in static_keys[writable_signed:signed]]
+    metas += [AccountMeta(key, False, True) for key in static_keys[signed:writable_unsigned]]
+    metas += [AccountMeta(key, False, False) for key in static_keys[writable_unsigned:]]
+
+    lookups = _lookups(message)
+    if lookups:
+        tables = lookup_table_accounts(message, lookup_tables or {})
+        addresses = [table.addresses for table in tables]
+        try:
+            metas += [AccountMeta(table[index], False, True)
+                      for table, lookup in zip(addresses, lookups) for index in lookup.writable_indexes]
+            metas += [AccountMeta(table[index], False, False)
+                      for table, lookup in zip(addresses, lookups) for index in lookup.readonly_indexes]
+        except IndexError:
+            raise ValueError("Lookup table index out of range; the cached table may be stale") from None
+    return metas
+
+
+def decompile_message(message: AnyMessage, lookup_tables: Optional[LookupTables] = None) -> List[Instruction]:
+    """
+    Turn a compiled message back into Instructions.
+
+    Roles are resolved once per message (see account_metas), so each
+    instruction costs one list lookup per account.
+
+    Args:
+        message (MessageV0 | Message): The message, e.g. a Jupiter swap transaction's
+        lookup_tables (Mapping[Pubkey, AddressLookupTableAccount], optional):
+            Loaded tables, needed if the message has address table lookups
+
+    Returns:
+        List[Instruction]: The message's instructions, in order
+    """
+    metas = account_metas(message, lookup_tables)
+    return [
+        Instruction(metas[compiled.program_id_index].pubkey, compiled.data,
+                    [metas[index] for index in compiled.accounts])
+        for compiled in message.instructions
+    ]
@@ -0,0 +1,711 @@
+import argparse
+import asyncio
+import base64
+import hashlib
+import random
+import struct
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import base58
+from solders.address_lookup_table_account import AddressLookupTableAccount
+from solders.compute_budget import set_compute_unit_limit, set_compute_unit_price
+from solders.hash import Hash
+from solders.instruction import AccountMeta, Instruction
+from solders.message import MessageV0
+from solders.pubkey import Pubkey
+from solders.signature import Signature
+from solders.transaction import VersionedTransaction
+from solders.system_program import TransferParams, transfer
+from spl.token.constants import ASSOCIATED_TOKEN_PROGRAM_ID, TOKEN_PROGRAM_ID, WRAPPED_SOL_MINT
+from spl.token.instructions import (
+    CloseAccountParams,
+    SyncNativeParams,
+    close_account,
+    create_idempotent_associated_token_account,
+    get_associated_token_address,
+    sync_native,
+)
+
+from local_http import JsonHttpServer
+
+JUPITER_PROGRAM_ID = Pubkey.from_string("JUP6LkbZbjS1jKKwapdHNy74zcZ3tLUZoi5QNyVTaV4")
+# Anchor discriminator of Jupiter's `route` instruction
+ROUTE_DISCRIMINATOR = bytes([229, 23, 203, 151, 122, 227, 173, 42])
+JUPITER_PREFIX = "/swap/v1"
+
+SLOT_DURATION = 0.4  # seconds
+BLOCKHASH_VALIDITY = 150  # blocks
+RECENT_FEE_SLOTS = 150
+BASE_SLOT = 300_000_000
+AMM_ACCOUNTS_PER_ROUTE = 12
+ADDRESS_LOOKUP_TABLE_PROGRAM_ID = Pubkey.from_string("AddressLookupTab1e1111111111111111111111111")
+LOOKUP_TABLE_META_SIZE = 56
+COMPUTE_BUDGET_PROGRAM_ID = Pubkey.from_string("ComputeBudget111111111111111111111111111111")
+# Rough compute costs, enough for simulateTransaction to size limits against
+COMPUTE_BUDGET_UNITS = 150
+ATA_CREATE_UNITS = 25_000
+ATA_EXISTING_UNITS = 5_000
+ROUTE_BASE_UNITS = 30_000
+ROUTE_UNITS_PER_ACCOUNT = 2_000
+OTHER_INSTRUCTION_UNITS = 3_000
+DEFAULT_INSTRUCTION_COMPUTE_UNITS = 200_000
+MAX_COMPUTE_UNITS = 1_400_000
+# sendTransaction's error when the preflight simulation fails
+PREFLIGHT_FAILURE = -32002
+# Synthetic past transactions per address, for getSignaturesForAddress paging
+ADDRESS_HISTORY = 5_000
+MAX_SIGNATURES_PER_REQUEST = 1_000
+
+
+def fake_pubkey(*seed: Any) -> Pubkey:
+    """Deterministic pubkey for a seed, so the same route always gets the same accounts."""
+    return Pubkey(hashlib.sha256(repr(seed).encode()).digest())
+
+
+def instruction_to_json(instruction: Instruction) -> dict:
+    return {
+        "programId": str(instruction.program_id),
+        "accounts": [
+            {"pubkey": str(meta.pubkey), "isSigner": meta.is_signer, "isWritable": meta.is_writable}
+            for meta in instruction.accounts
+        ],
+        "data": base64.b64encode(bytes(instruction.data)).decode("utf-8"),
+    }
+
+
+class RpcFailure(Exception):
+    """Raised by an rpc_* handler to answer with a specific JSON-RPC error."""
+
+    def __init__(self, code: int, message: str, data: Any = None):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+        self.data = data
+
+
+class MockChain:
+    """
+    In-memory stand-in for the Helius RPC and Jupiter swap APIs.
+
+    Slots advance with wall-clock time, sent transactions are recorded and
+    land immediately, and ATAs created through the associated token program
+    start existing. Latency and errors are injected per route key
+    ("rpc:<method>" or "jupiter:<endpoint>").
+    """
+
+    def __init__(
+        self,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        error_rate: float = 0.0,
+        route_latency_ms: Optional[Dict[str, float]] = None,
+        seed: Optional[int] = None,
+        route_compute_units: Optional[Dict[Tuple[str, str], int]] = None,
+    ):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.route_latency_ms = route_latency_ms or {}
+        # Units the swap instruction of an (inputMint, outputMint) route consumes,
+        # keyed by the route's first AMM account, which every swap on it passes
+        self.route_compute_units: Dict[Pubkey, int] = {
+            fake_pubkey("amm", input_mint, output_mint, 0): units
+            for (input_mint, output_mint), units in (route_compute_units or {}).items()
+        }
+        self.random = random.Random(seed)
+        self.started_at = time.monotonic()
+
+        self.accounts: Dict[str, dict] = {}
+        self.lookup_tables: Dict[Pubkey, AddressLookupTableAccount] = {}
+        self.transactions: Dict[str, Tuple[int, bytes]] = {}
+        self.errors: Dict[str, dict] = {}
+        self.request_counts: Dict[str, int] = {}
+        self.histories: Dict[str, List[str]] = {}
+        self.history_positions: Dict[str, int] = {}
+
+    # Chain clock
+
+    @property
+    def slot(self) -> int:
+        return BASE_SLOT + int((time.monotonic() - self.started_at) / SLOT_DURATION)
+
+    @property
+    def block_height(self) -> int:
+        return self.slot - 1_000
+
+    def blockhash_at(self, slot: int) -> Hash:
+        return Hash(hashlib.sha256(f"blockhash:{slot}".encode()).digest())
+
+    def block_time(self, slot: int) -> int:
+        return int(time.time() - (self.slot - slot) * SLOT_DURATION)
+
+    def history_slot(self, position: int) -> int:
+        # Newest first, a couple of slots apart, all before the chain started
+        return BASE_SLOT - 2 * (position + 1)
+
+    def context(self) -> dict:
+        return {"apiVersion": "mock", "slot": self.slot}
+
+    # Fault injection
+
+    async def _inject(self, route: str) -> bool:
+        """Sleep for the configured latency; returns True if this call should fail."""
+        self.request_counts[route] = self.request_counts.get(route, 0) + 1
+        latency = self.route_latency_ms.get(route, self.latency_ms)
+        if self.jitter_ms:
+            latency += self.random.uniform(-self.jitter_ms, self.jitter_ms)
+        if latency > 0:
+            await asyncio.sleep(latency / 1000)
+        return self.error_rate > 0 and self.random.random() < self.error_rate
+
+    # HTTP entry point
+
+    async def handle(self, method: str, path: str, query: Dict[str, str], body: Any) -> Tuple[int, Any]:
+        if path.startswith(JUPITER_PREFIX):
+            return await self._handle_jupiter(method, path[len(JUPITER_PREFIX):], query, body)
+        if method != "POST":
+            return 404, {"error": "Not found"}
+        if isinstance(body, list):
+            return 200, list(await asyncio.gather(*(self._handle_rpc(item) for item in body)))
+        return 200, await self._handle_rpc(body)
+
+    # JSON-RPC
+
+    async def _handle_rpc(self, request: dict) -> dict:
+        request_id = request.get("id")
+        rpc_method = request.get("method", "")
+        handler = getattr(self, f"rpc_{rpc_method}", None)
+        if handler is None:
+            return self._rpc_error(request_id, -32601, "Method not found")
+        if await self._inject(f"rpc:{rpc_method}"):
+            return self._rpc_error(request_id, -32005, "Node is behind")
+        try:
+            result = handler(*request.get("params", []))
+        except RpcFailure as e:
+            return self._rpc_error(request_id, e.code, e.message, e.data)
+        except (ValueError, TypeError, IndexError) as e:
+            return self._rpc_error(request_id, -32602, f"Invalid params: {str(e)}")
+        return {"jsonrpc": "2.0", "id": request_id, "result": result}
+
+    @staticmethod
+    def _rpc_error(request_id: Any, code: int, message: str, data: Any = None) -> dict:
+        error = {"code": code, "message": message}
+        if data is not None:
+            error["data"] = data
+        return {"jsonrpc": "2.0", "id": request_id, "error": error}
+
+    def rpc_getLatestBlockhash(self, config: Optional[dict] = None) -> dict:
+        slot = self.slot
+        return {
+            "context": self.context(),
+            "value": {
+                "blockhash": str(self.blockhash_at(slot)),
+                "lastValidBlockHeight": self.block_height + BLOCKHASH_VALIDITY,
+            },
+        }
+
+    def rpc_getBlockHeight(self, config: Optional[dict] = None) -> int:
+        return self.block_height
+
+    def rpc_getAccountInfo(self, pubkey: str, config: Optional[dict] = None) -> dict:
+        return {"context": self.context(), "value": self._account(pubkey, config)}
+
+    def rpc_getMultipleAccounts(self, pubkeys: List[str], config: Optional[dict] = None) -> dict:
+        if len(pubkeys) > 100:
+            raise ValueError("Too many inputs provided; max 100")
+        return {"context": self.context(), "value": [self._account(pubkey, config) for pubkey in pubkeys]}
+
+    def _account(self, pubkey: str, config: Optional[dict]) -> Optional[dict]:
+        account = self.accounts.get(pubkey)
+        data_slice = (config or {}).get("dataSlice")
+        if account is None or data_slice is None:
+            return account
+        data = base64.b64decode(account["data"][0])[data_slice["offset"]:data_slice["offset"] + data_slice["length"]]
+        return {**account, "data": [base64.b64encode(data).decode("utf-8"), "base64"]}
+
+    def rpc_sendTransaction(self, encoded_tx: str, config: Optional[dict] = None) -> str:
+        config = config or {}
+        encoding = config.get("encoding", "base58")
+        tx_bytes = base64.b64decode(encoded_tx) if encoding == "base64" else base58.b58decode(encoded_tx)
+        tx = VersionedTransaction.from_bytes(tx_bytes)
+        signature = str(tx.signatures[0])
+        units, err, logs = self._execute(tx.message)
+        # With preflight a failing transaction is refused; skipped, it still lands, failed
+        if err is not None and not config.get("skipPreflight", False):
+            raise RpcFailure(PREFLIGHT_FAILURE, f"Transaction simulation failed: {err}",
+                             {"err": err, "logs": logs, "unitsConsumed": units})
+        self.transactions[signature] = (self.slot, tx_bytes)
+        if err is None:
+            self._apply(tx)
+        else:
+            self.errors[signature] = err
+        return signature
+
+    def rpc_simulateTransaction(self, encoded_tx: str, config: Optional[dict] = None) -> dict:
+        config = config or {}
+        if config.get("sigVerify") and config.get("replaceRecentBlockhash"):
+            raise ValueError("sigVerify may not be used with replaceRecentBlockhash")
+        encoding = config.get("encoding", "base58")
+        tx_bytes = base64.b64decode(encoded_tx) if encoding == "base64" else base58.b58decode(encoded_tx)
+        units, err, logs = self._execute(VersionedTransaction.from_bytes(tx_bytes).message)
+        value = {"err": err, "logs": logs, "accounts": None, "unitsConsumed": units, "returnData": None}
+        if config.get("replaceRecentBlockhash"):
+            value["replacementBlockhash"] = {
+                "blockhash": str(self.blockhash_at(self.slot)),
+                "lastValidBlockHeight": self.block_height + BLOCKHASH_VALIDITY,
+            }
+        return {"context": self.context(), "value": value}
+
+    @staticmethod
+    def _prioritization_fee(account: str, slot: int) -> int:
+        # Most slots have a few payers bidding; AMM accounts see busier markets
+        digest = hashlib.sha256(f"fee:{account}:{slot}".encode()).digest()
+        roll = digest[0] % 10
+        if roll < 3:
+            return 0
+        return int.from_bytes(digest[1:4], "little") % (20_000 if roll < 9 else 200_000)
+
+    def rpc_getRecentPrioritizationFees(self, accounts: Optional[List[str]] = None) -> List[dict]:
+        # Per slot, the fee it took to land a transaction locking all of `accounts`
+        accounts = accounts or [""]
+        latest = self.slot
+        return [
+            {"slot": slot, "prioritizationFee": max(self._prioritization_fee(account, slot) for account in accounts)}
+            for slot in range(latest - RECENT_FEE_SLOTS + 1, latest + 1)
+        ]
+
+    def rpc_getSignatureStatuses(self, signatures: List[str], config: Optional[dict] = None) -> dict:
+        if len(signatures) > 256:
+            raise ValueError("Too many inputs provided; max 256")
+        statuses = []
+        for signature in signatures:
+            if signature not in self.transactions:
+                statuses.append(None)
+                continue
+            landed_slot, _ = self.transactions[signature]
+            confirmations = self.slot - landed_slot
+            err = self.errors.get(signature)
+            statuses.append({
+                "slot": landed_slot,
+                "confirmations": None if confirmations >= 32 else confirmations,
+                "err": err,
+                "status": {"Ok": None} if err is None else {"Err": err},
+                "confirmationStatus": "finalized" if confirmations >= 32 else "confirmed",
+            })
+        return {"context": self.context(), "value": statuses}
+
+    def rpc_getTransaction(self, signature: str, config: Optional[dict] = None) -> Optional[dict]:
+        if signature not in self.transactions:
+            # Unknown signatures resolve to a synthetic historical transaction
+            position = self.history_positions.get(signature)
+            slot = self.slot - 10_000 if position is None else self.history_slot(position)
+            self.transactions[signature] = (slot, self._synthetic_tx(signature))
+        slot, tx_bytes = self.transactions[signature]
+        return self._encode_transaction(
+            slot, tx_bytes, (config or {}).get("encoding", "json"), self.errors.get(signature)
+        )
+
+    def _history(self, address: str) -> List[str]:
+        history = self.histories.get(address)
+        if history is None:
+            history = self.histories[address] = [
+                str(Signature.from_bytes(hashlib.sha512(f"history:{address}:{i}".encode()).digest()))
+                for i in range(ADDRESS_HISTORY)
+            ]
+            for position, signature in enumerate(history):
+                self.history_positions[signature] = position
+                if position % 20 == 19:
+                    # Slippage exceeded, the usual way a swap fails
+                    self.errors[signature] = {"InstructionError": [2, {"Custom": 6001}]}
+        return history
+
+    def rpc_getSignaturesForAddress(self, address: str, config: Optional[dict] = None) -> List[dict]:
+        config = config or {}
+        limit = config.get("limit") or MAX_SIGNATURES_PER_REQUEST
+        if not 1 <= limit <= MAX_SIGNATURES_PER_REQUEST:
+            raise ValueError(f"Invalid limit; max {MAX_SIGNATURES_PER_REQUEST}")
+        Pubkey.from_string(address)
+        history = self._history(address)
+        # `before` and `until` are exclusive; unknown cursors mean "no bound"
+        start = self.history_positions.get(config.get("before"), -1) + 1
+        end = self.history_positions.get(config.get("until"), len(history))
+        return [
+            {
+                "signature": signature,
+                "slot": self.history_slot(start + i),
+                "err": self.errors.get(signature),
+                "memo": None,
+                "blockTime": self.block_time(self.history_slot(start + i)),
+                "confirmationStatus": "finalized",
+            }
+            for i, signature in enumerate(history[start:min(end, start + limit)])
+        ]
+
+    def _execute(self, message: MessageV0) -> Tuple[int, Optional[dict], List[str]]:
+        """Compute units a message uses, the error it fails with (if any) and its logs."""
+        keys = self._message_keys(message)
+        limit = None
+        costs = []
+        for instruction in message.instructions:
+            program = keys[instruction.program_id_index]
+            if program == COMPUTE_BUDGET_PROGRAM_ID:
+                data = bytes(instruction.data)
+                if data[:1] == b"\x02":
+                    limit = struct.unpack_from("<I", data, 1)[0]
+                units = COMPUTE_BUDGET_UNITS
+            elif program == ASSOCIATED_TOKEN_PROGRAM_ID:
+                exists = str(keys[instruction.accounts[1]]) in self.accounts
+                units = ATA_EXISTING_UNITS if exists else ATA_CREATE_UNITS
+            elif program == JUPITER_PROGRAM_ID:
+                # Accounts from lookup tables the mock doesn't hold can't be resolved; skip them
+                units = next(
+                    (self.route_compute_units[keys[index]] for index in instruction.accounts
+                     if index < len(keys) and keys[index] in self.route_compute_units),
+                    ROUTE_BASE_UNITS + ROUTE_UNITS_PER_ACCOUNT * len(instruction.accounts),
+                )
+            else:
+                units = OTHER_INSTRUCTION_UNITS
+            costs.append((program, units))
+        if limit is None:
+            budgeted = sum(program == COMPUTE_BUDGET_PROGRAM_ID for program, _ in costs)
+            limit = (len(costs) - budgeted) * DEFAULT_INSTRUCTION_COMPUTE_UNITS
+        limit = min(limit, MAX_COMPUTE_UNITS)
+
+        consumed = 0
+        logs = []
+        for index, (program, units) in enumerate(costs):
+            logs.append(f"Program {program} invoke [1]")
+            if consumed + units > limit:
+                logs.append(f"Program {program} failed: exceeded CUs meter at BPF instruction")
+                return limit, {"InstructionError": [index, "ComputationalBudgetExceeded"]}, logs
+            logs.append(f"Program {program} consumed {units} of {limit - consumed} compute units")
+            logs.append(f"Program {program} success")
+            consumed += units
+        return consumed, None, logs
+
+    def _message_keys(self, message: MessageV0) -> List[Pubkey]:
+        """Static account keys, then the writable and readonly keys loaded from lookup tables."""
+        lookups = [(self.lookup_tables.get(lookup.account_key), lookup) for lookup in message.address_table_lookups]
+        writable = [table.addresses[i] for table, lookup in lookups if table for i in lookup.writable_indexes]
+        readonly = [table.addresses[i] for table, lookup in lookups if table for i in lookup.readonly_indexes]
+        return list(message.account_keys) + writable + readonly
+
+    def _apply(self, tx: VersionedTransaction) -> None:
+        message = tx.message
+        keys = message.account_keys
+        for instruction in message.instructions:
+            if keys[instruction.program_id_index] == ASSOCIATED_TOKEN_PROGRAM_ID:
+                ata = keys[instruction.accounts[1]]
+                self.accounts[str(ata)] = self._token_account()
+
+    def _token_account(self) -> dict:
+        return {
+            "data": [base64.b64encode(bytes(165)).decode("utf-8"), "base64"],
+            "executable": False,
+            "lamports": 2_039_280,
+            "owner": str(TOKEN_PROGRAM_ID),
+            "rentEpoch": 18_446_744_073_709_551_615,
+            "space": 165,
+        }
+
+    def extend_lookup_table(self, key: Pubkey, addresses: List[Pubkey]) -> AddressLookupTableAccount:
+        """Create or extend a lookup table account, stamping it with the current slot."""
+        previous = self.lookup_tables.get(key)
+        start_index = len(previous.addresses) if previous else 0
+        table = AddressLookupTableAccount(key, (list(previous.addresses) if previous else []) + addresses)
+        self.lookup_tables[key] = table
+        # LookupTableMeta: type tag, deactivation slot (active), last extended slot, start index, no authority
+        meta = struct.pack("<IQQBB", 1, 2**64 - 1, self.slot, start_index, 0).ljust(LOOKUP_TABLE_META_SIZE, b"\0")
+        data = meta + b"".join(bytes(address) for address in table.addresses)
+        self.accounts[str(key)] = {
+            "data": [base64.b64encode(data).decode("utf-8"), "base64"],
+            "executable": False,
+            "lamports": 1_000_000 + 6_960 * len(table.addresses),
+            "owner": str(ADDRESS_LOOKUP_TABLE_PROGRAM_ID),
+            "rentEpoch": 18_446_744_073_709_551_615,
+            "space": len(data),
+        }
+        return table
+
+    def _route_lookup_table(self, input_mint: str, output_mint: str) -> AddressLookupTableAccount:
+        # Jupiter keeps each AMM's accounts in lookup tables; give every route one
+        key = fake_pubkey("alt", input_mint, output_mint)
+        table = self.lookup_tables.get(key)
+        if table is None:
+            table = self.extend_lookup_table(key, [fake_pubkey("amm", input_mint, output_mint, i)
+                                                   for i in range(AMM_ACCOUNTS_PER_ROUTE)])
+        return table
+
+    def _synthetic_tx(self, signature: str) -> bytes:
+        sender = fake_pubkey("sender", signature)
+        swap = self._swap_instructions(sender, "So11111111111111111111111111111111111111112",
+                                       "Dfh5DzRgSvvCFDoYc2ciTkMrbDfRKybA4SoFbPmApump", 10_000, 20_000, 50, None)
+        message = MessageV0.try_compile(sender, swap, [], self.blockhash_at(self.slot))
+        try:
+            tx_signature = Signature.from_string(signature)
+        except ValueError:
+            tx_signature = Signature.default()
+        return bytes(VersionedTransaction.populate(message, [tx_signature]))
+
+    def _meta(self, tx: VersionedTransaction, err: Optional[dict]) -> dict:
+        """Execution details shaped like a mainnet Jupiter swap's: logs, per-hop token transfers, balances."""
+        message = tx.message
+        keys = message.account_keys
+        units, _, logs = self._execute(message)
+        inner_instructions = []
+        if TOKEN_PROGRAM_ID in keys:
+            token_program = keys.index(TOKEN_PROGRAM_ID)
+            for index, instruction in enumerate(message.instructions):
+                if keys[instruction.program_id_index] != JUPITER_PROGRAM_ID:
+                    continue
+                # Every hop moves tokens in and out through the token program
+                amms = list(instruction.accounts)[4:]
+                transfers = [
+                    {
+                        "programIdIndex": token_program,
+                        "accounts": [amms[hop], amms[(hop + 1) % len(amms)], instruction.accounts[1]],
+                        "data": base58.b58encode(b"\x03" + struct.pack("<Q", 1_000 + hop)).decode("utf-8"),
+                        "stackHeight": 2,
+                    }
+                    for hop in range(len(amms))
+                ]
+                inner_instructions.append({"index": index, "instructions": transfers})
+                invoke = logs.index(f"Program {JUPITER_PROGRAM_ID} invoke [1]")
+                logs[invoke + 1:invoke + 1] = [
+                    line
+                    for hop in range(len(amms))
+                    for line in (
+                        "Program log: Instruction: Swap",
+                        f"Program {TOKEN_PROGRAM_ID} invoke [2]",
+                        "Program log: Instruction: Transfer",
+                        f"Program {TOKEN_PROGRAM_ID} consumed 4645 of {200_000 - hop * 4645} compute units",
+                        f"Program {TOKEN_PROGRAM_ID} success",
+                    )
+                ]
+        balances = [2_039_280 + 1_000 * i for i in range(len(keys))]
+        return {
+            "err": err,
+            "status": {"Ok": None} if err is None else {"Err": err},
+            "fee": 5_000,
+            "preBalances": balances,
+            "postBalances": [balance - (5_000 if i == 0 else 0) for i, balance in enumerate(balances)],
+            "innerInstructions": inner_instructions,
+            "logMessages": logs,
+            "preTokenBalances": [],
+            "postTokenBalances": [],
+            "rewards": [],
+            "loadedAddresses": {"writable": [], "readonly": []},
+            "computeUnitsConsumed": units,
+        }
+
+    def _encode_transaction(self, slot: int, tx_bytes: bytes, encoding: str, err: Optional[dict] = None) -> dict:
+        tx = VersionedTransaction.from_bytes(tx_bytes)
+        result = {"slot": slot, "blockTime": self.block_time(slot), "meta": self._meta(tx, err), "version": 0}
+        if encoding == "base64":
+            result["transaction"] = [base64.b64encode(tx_bytes).decode("utf-8"), "base64"]
+            return result
+
+        message = tx.message
+        header = message.header
+        result["transaction"] = {
+            "signatures": [str(signature) for signature in tx.signatures],
+            "message": {
+                "accountKeys": [str(key) for key in message.account_keys],
+                "header": {
+                    "numRequiredSignatures": header.num_required_signatures,
+                    "numReadonlySignedAccounts": header.num_readonly_signed_accounts,
+                    "numReadonlyUnsignedAccounts": header.num_readonly_unsigned_accounts,
+                },
+                "recentBlockhash": str(message.recent_blockhash),
+                "instructions": [
+                    {
+                        "programIdIndex": instruction.program_id_index,
+                        "accounts": list(instruction.accounts),
+                        "data": base58.b58encode(bytes(instruction.data)).decode("utf-8"),
+                        "stackHeight": None,
+                    }
+                    for instruction in message.instructions
+                ],
+                "addressTableLookups": [],
+            },
+        }
+        return result
+
+    # Jupiter
+
+    async def _handle_jupiter(self, method: str, endpoint: str, query: Dict[str, str], body: Any) -> Tuple[int, Any]:
+        routes = {
+            ("GET", "/quote"): self.jupiter_quote,
+            ("POST", "/swap"): self.jupiter_swap,
+            ("POST", "/swap-instructions"): self.jupiter_swap_instructions,
+        }
+        handler = routes.get((method, endpoint))
+        if handler is None:
+            return 404, {"error": "Not found"}
+        if await self._inject(f"jupiter:{endpoint.strip('/')}"):
+            return 429, {"error": "Rate limit exceeded"}
+        try:
+            return 200, handler(query if method == "GET" else body)
+        except (KeyError, ValueError) as e:
+            return 400, {"error": f"Invalid request: {str(e)}"}
+
+    def jupiter_quote(self, query: Dict[str, str]) -> dict:
+        input_mint = query["inputMint"]
+        output_mint = query["outputMint"]
+        in_amount = int(query["amount"])
+        slippage_bps = int(query.get("slippageBps", 50))
+        # A stable, mint-dependent price with a little per-slot drift
+        rate = 1 + int.from_bytes(hashlib.sha256(f"{input_mint}{output_mint}".encode()).digest()[:2], "little")
+        out_amount = in_amount * rate * (10_000 + self.slot % 7) // 10_000
+        platform_fee_bps = int(query.get("platformFeeBps", 0))
+        return {
+            "inputMint": input_mint,
+            "inAmount": str(in_amount),
+            "outputMint": output_mint,
+            "outAmount": str(out_amount),
+            "otherAmountThreshold": str(out_amount * (10_000 - slippage_bps) // 10_000),
+            "swapMode": "ExactIn",
+            "slippageBps": slippage_bps,
+            "platformFee": {"amount": str(out_amount * platform_fee_bps // 10_000),
+                            "feeBps": platform_fee_bps} if platform_fee_bps else None,
+            "priceImpactPct": "0",
+            "routePlan": [
+                {
+                    "swapInfo": {
+                        "ammKey": str(fake_pubkey("amm", input_mint, output_mint)),
+                        "label": "Mock AMM",
+                        "inputMint": input_mint,
+                        "outputMint": output_mint,
+                        "inAmount": str(in_amount),
+                        "outAmount": str(out_amount),
+                        "feeAmount": "0",
+                        "feeMint": input_mint,
+                    },
+                    "percent": 100,
+                }
+            ],
+            "contextSlot": self.slot,
+            "timeTaken": 0.001,
+        }
+
+    def _swap_instructions(
+        self,
+        user: Pubkey,
+        input_mint: str,
+        output_mint: str,
+        in_amount: int,
+        out_amount: int,
+        slippage_bps: int,
+        fee_account: Optional[str],
+        platform_fee_bps: int = 0,
+        wrap_sol: bool = False,
+    ) -> List[Instruction]:
+        input_pubkey = Pubkey.from_string(input_mint)
+        output_pubkey = Pubkey.from_string(output_mint)
+        setup = [create_idempotent_associated_token_account(user, user, output_pubkey)]
+        cleanup = []
+        if wrap_sol and input_pubkey == WRAPPED_SOL_MINT:
+            # Like Jupiter's wrapAndUnwrapSol: fund a wSOL account with the input and close it after
+            wsol_account = get_associated_token_address(user, WRAPPED_SOL_MINT)
+            setup += [
+                create_idempotent_associated_token_account(user, user, WRAPPED_SOL_MINT),
+                transfer(TransferParams(from_pubkey=user, to_pubkey=wsol_account, lamports=in_amount)),
+                sync_native(SyncNativeParams(TOKEN_PROGRAM_ID, wsol_account)),
+            ]
+            cleanup.append(close_account(CloseAccountParams(TOKEN_PROGRAM_ID, wsol_account, user, user)))
+
+        accounts = [
+            AccountMeta(TOKEN_PROGRAM_ID, False, False),
+            AccountMeta(user, True, True),
+            AccountMeta(get_associated_token_address(user, input_pubkey), False, True),
+            AccountMeta(get_associated_token_address(user, output_pubkey), False, True),
+        ]
+        if fee_account:
+            accounts.append(AccountMeta(Pubkey.from_string(fee_account), False, True))
+        accounts += [
+            AccountMeta(fake_pubkey("amm", input_mint, output_mint, i), False, i % 3 != 0)
+            for i in range(AMM_ACCOUNTS_PER_ROUTE)
+        ]
+        route_plan = struct.pack("<I", 1) + bytes([0, 100, 0, 1])
+        data = (
+            ROUTE_DISCRIMINATOR
+            + route_plan
+            + struct.pack("<QQHB", in_amount, out_amount, slippage_bps, platform_fee_bps)
+        )
+        swap = Instruction(JUPITER_PROGRAM_ID, data, accounts)
+        return [set_compute_unit_limit(200_000), set_compute_unit_price(50_000), *setup, swap, *cleanup]
+
+    def _instructions_for(self, body: dict) -> List[Instruction]:
+        quote = body["quoteResponse"]
+        return self._swap_instructions(
+            Pubkey.from_string(body["userPublicKey"]),
+            quote["inputMint"],
+            quote["outputMint"],
+            int(quote["inAmount"]),
+            int(quote["outAmount"]),
+            int(quote.get("slippageBps", 50)),
+            body.get("feeAccount"),
+            (quote.get("platformFee") or {}).get("feeBps", 0),
+            body.get("wrapAndUnwrapSol", True),
+        )
+
+    def jupiter_swap(self, body: dict) -> dict:
+        fee_payer = Pubkey.from_string(body.get("payer") or body["userPublicKey"])
+        quote = body["quoteResponse"]
+        table = self._route_lookup_table(quote["inputMint"], quote["outputMint"])
+        message = MessageV0.try_compile(fee_payer, self._instructions_for(body), [table], self.blockhash_at(self.slot))
+        signatures = [Signature.default()] * message.header.num_required_signatures
+        tx = VersionedTransaction.populate(message, signatures)
+        return {
+            "swapTransaction": base64.b64encode(bytes(tx)).decode("utf-8"),
+            "lastValidBlockHeight": self.block_height + BLOCKHASH_VALIDITY,
+            "prioritizationFeeLamports": 10_000,
+        }
+
+    def jupiter_swap_instructions(self, body: dict) -> dict:
+        instructions = self._instructions_for(body)
+        swap_index = next(i for i, ix in enumerate(instructions) if ix.program_id == JUPITER_PROGRAM_ID)
+        compute_budget, setup = instructions[:2], instructions[2:swap_index]
+        swap, cleanup = instructions[swap_index], instructions[swap_index + 1:]
+        quote = body["quoteResponse"]
+        table = self._route_lookup_table(quote["inputMint"], quote["outputMint"])
+        return {
+            "tokenLedgerInstruction": None,
+            "computeBudgetInstructions": [instruction_to_json(ix) for ix in compute_budget],
+            "setupInstructions": [instruction_to_json(ix) for ix in setup],
+            "swapInstruction": instruction_to_json(swap),
+            "cleanupInstruction": instruction_to_json(cleanup[0]) if cleanup else None,
+            "otherInstructions": [],
+            "addressLookupTableAddresses": [str(table.key)],
+            "prioritizationFeeLamports": 10_000,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Helius RPC + Jupiter stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8899)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Base latency per request")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Uniform +/- latency jitter")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests that fail")
+    args = parser.parse_args()
+
+    chain = MockChain(args.latency_ms, args.jitter_ms, args.error_rate)
+    server = JsonHttpServer(chain.handle, args.host, args.port)
+
+    async def serve():
+        await server.start()
+        print(f"✅ Mock RPC listening on {server.url}")
+        print(f"   HELIUS_RPC_ENDPOINT={server.url}")
+        print(f"   JUPITER_API_URL={server.url}{JUPITER_PREFIX}")
+        await asyncio.Event().wait()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
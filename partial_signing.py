@@ -0,0 +1,272 @@
+import asyncio
+import hashlib
+import heapq
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+from solders.keypair import Keypair
+from solders.pubkey import Pubkey
+from solders.signature import Signature
+
+from rpc_client import AsyncRpcClient, get_rpc_client
+from wire_transaction import PUBKEY_LENGTH, SIGNATURE_LENGTH, BytesLike, WireTransaction
+
+# A block is ~1 slot; checking a few times per blockhash lifetime is plenty
+DEFAULT_EXPIRY_INTERVAL = 2.0  # seconds
+
+_EMPTY_SIGNATURE = bytes(SIGNATURE_LENGTH)
+
+
+class TransactionExpired(Exception):
+    """Raised when a partially signed transaction's blockhash expires before it is complete."""
+
+
+class PendingTransaction:
+    """A transaction waiting for signatures, with its signer slots indexed once."""
+
+    __slots__ = ("key", "wire", "message", "slots", "missing", "last_valid_block_height", "completed")
+
+    def __init__(self, key: str, wire: WireTransaction, last_valid_block_height: int):
+        self.key = key
+        self.wire = wire
+        self.message = bytes(wire.message)
+        self.last_valid_block_height = last_valid_block_height
+        keys = wire.account_keys_offset
+        view = wire.wire
+        self.slots: Dict[bytes, int] = {
+            bytes(view[keys + index * PUBKEY_LENGTH:keys + (index + 1) * PUBKEY_LENGTH]): index
+            for index in range(wire.signature_count)
+        }
+        signatures = wire.signatures_offset
+        self.missing = {
+            index for index in range(wire.signature_count)
+            if view[signatures + index * SIGNATURE_LENGTH:signatures + (index + 1) * SIGNATURE_LENGTH] == _EMPTY_SIGNATURE
+        }
+        # Created on the first wait(), so the coordinator also works without a running loop
+        self.completed: Optional[asyncio.Future] = None
+
+
+class PartialSignCoordinator:
+    """
+    Collects signatures from several parties for many transactions at once.
+
+    Transactions are keyed by the SHA-256 of their message, so every party
+    can compute the key from what it signs. Each required signer's slot is
+    indexed when the transaction is added, making each incoming signature
+    an O(1) lookup and an in-place write into the wire bytes. Transactions
+    are dropped once the chain passes their lastValidBlockHeight.
+    """
+
+    def __init__(
+        self,
+        rpc: Optional[AsyncRpcClient] = None,
+        verify: bool = True,
+        expiry_interval: float = DEFAULT_EXPIRY_INTERVAL,
+    ):
+        """
+        Args:
+            rpc (AsyncRpcClient, optional): Client used to follow the block height
+            verify (bool): Check signatures from other parties before accepting them
+            expiry_interval (float): Seconds between block height checks
+        """
+        self._rpc = rpc
+        self.verify = verify
+        self.expiry_interval = expiry_interval
+        self._pending: Dict[str, PendingTransaction] = {}
+        self._expiries: List[Tuple[int, str]] = []
+        self._expirer: Optional[asyncio.Task] = None
+
+    @property
+    def rpc(self) -> AsyncRpcClient:
+        return self._rpc or get_rpc_client()
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def start(self) -> None:
+        """Start dropping expired transactions in the background."""
+        if self._expirer is None or self._expirer.done():
+            self._expirer = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._expirer is not None:
+            self._expirer.cancel()
+            try:
+                await self._expirer
+            except asyncio.CancelledError:
+                pass
+            self._expirer = None
+
+    @staticmethod
+    def message_key(message: BytesLike) -> str:
+        """The key a transaction is filed under: hex SHA-256 of its serialized message."""
+        return hashlib.sha256(message).hexdigest()
+
+    def add(
+        self, tx_bytes: BytesLike, last_valid_block_height: int, signers: Sequence[Keypair] = ()
+    ) -> str:
+        """
+        Register a transaction and apply any local signatures.
+
+        Slots that already hold a signature (e.g. one added before the
+        transaction was handed over) count as signed, and local signers for
+        them are skipped. Leave at least one signer for add_signature() or
+        sign(), which return the finished bytes.
+
+        Args:
+            tx_bytes (bytes-like): The serialized transaction
+            last_valid_block_height (int): Block height after which its blockhash expires
+            signers (Sequence[Keypair]): Signers held locally, applied right away
+
+        Returns:
+            str: The transaction's key
+
+        Raises:
+            ValueError: If a signer isn't required, or nothing would be left
+                to sign (send a complete transaction directly instead)
+        """
+        wire = WireTransaction(len(tx_bytes)).load(tx_bytes)
+        key = self.message_key(wire.message)
+        pending = self._pending.get(key) or PendingTransaction(key, wire, last_valid_block_height)
+        unsigned = {}
+        for signer in signers:
+            pubkey = bytes(signer.pubkey())
+            index = pending.slots.get(pubkey)
+            if index is None:
+                raise ValueError(f"{signer.pubkey()} is not a required signer")
+            if index in pending.missing:
+                unsigned[index] = signer
+        if pending.missing <= unsigned.keys():
+            raise ValueError(f"Transaction {key} would be fully signed on arrival")
+
+        if key not in self._pending:
+            self._pending[key] = pending
+            heapq.heappush(self._expiries, (last_valid_block_height, key))
+        for signer in unsigned.values():
+            self._apply(pending, bytes(signer.pubkey()), bytes(signer.sign_message(pending.message)))
+        return key
+
+    def message(self, key: str) -> bytes:
+        """The message bytes a party has to sign for `key`."""
+        return self._get(key).message
+
+    def missing_signers(self, key: str) -> List[Pubkey]:
+        pending = self._get(key)
+        return [Pubkey.from_bytes(pubkey) for pubkey, index in pending.slots.items() if index in pending.missing]
+
+    def add_signature(
+        self, key: str, pubkey: Union[Pubkey, bytes], signature: Union[Signature, bytes]
+    ) -> Optional[bytes]:
+        """
+        Accept one party's signature.
+
+        Args:
+            key (str): The transaction's key
+            pubkey (Pubkey | bytes): The signer
+            signature (Signature | bytes): Its signature over message(key)
+
+        Returns:
+            Optional[bytes]: The fully signed wire transaction if this was the
+            last missing signature, otherwise None
+
+        Raises:
+            KeyError: If the transaction is unknown, already complete or expired
+            ValueError: If `pubkey` isn't a required signer, has already signed,
+                or the signature doesn't verify
+        """
+        pending = self._get(key)
+        pubkey_bytes = bytes(pubkey)
+        signature_bytes = bytes(signature)
+        if pubkey_bytes not in pending.slots:
+            raise ValueError(f"{Pubkey.from_bytes(pubkey_bytes)} is not a required signer")
+        if self.verify and not Signature.from_bytes(signature_bytes).verify(
+            Pubkey.from_bytes(pubkey_bytes), pending.message
+        ):
+            raise ValueError(f"Invalid signature from {Pubkey.from_bytes(pubkey_bytes)}")
+        return self._apply(pending, pubkey_bytes, signature_bytes)
+
+    def sign(self, key: str, signer: Keypair) -> Optional[bytes]:
+        """Sign `key` with a local keypair; returns the wire bytes if that completed it."""
+        pending = self._get(key)
+        return self._apply(pending, bytes(signer.pubkey()), bytes(signer.sign_message(pending.message)))
+
+    async def wait(self, key: str, timeout: Optional[float] = None) -> bytes:
+        """
+        Wait for every signature to arrive.
+
+        Returns:
+            bytes: The fully signed wire transaction
+
+        Raises:
+            TransactionExpired: If the blockhash expires first
+            asyncio.TimeoutError: If `timeout` seconds pass first
+        """
+        pending = self._get(key)
+        if pending.completed is None:
+            pending.completed = asyncio.get_running_loop().create_future()
+        return await asyncio.wait_for(asyncio.shield(pending.completed), timeout)
+
+    def expire(self, block_height: int) -> List[str]:
+        """
+        Drop every transaction whose blockhash is no longer valid at `block_height`.
+
+        Returns:
+            List[str]: Keys of the dropped transactions
+        """
+        expired = []
+        while self._expiries and self._expiries[0][0] < block_height:
+            _, key = heapq.heappop(self._expiries)
+            pending = self._pending.pop(key, None)
+            # Completed transactions leave a stale heap entry behind
+            if pending is not None:
+                if pending.completed is not None and not pending.completed.done():
+                    pending.completed.set_exception(TransactionExpired(f"{key} expired before it was fully signed"))
+                    # Waiters may have timed out already; don't let asyncio warn about it
+                    pending.completed.exception()
+                expired.append(key)
+        return expired
+
+    def _get(self, key: str) -> PendingTransaction:
+        pending = self._pending.get(key)
+        if pending is None:
+            raise KeyError(f"No pending transaction {key}")
+        return pending
+
+    def _apply(self, pending: PendingTransaction, pubkey: bytes, signature: bytes) -> Optional[bytes]:
+        index = pending.slots.get(pubkey)
+        if index is None:
+            raise ValueError(f"{Pubkey.from_bytes(pubkey)} is not a required signer")
+        if index not in pending.missing:
+            raise ValueError(f"{Pubkey.from_bytes(pubkey)} has already signed")
+        pending.wire.set_signature(index, signature)
+        pending.missing.discard(index)
+        if pending.missing:
+            return None
+        del self._pending[pending.key]
+        signed = bytes(pending.wire.wire)
+        if pending.completed is not None and not pending.completed.done():
+            pending.completed.set_result(signed)
+        return signed
+
+    async def _run(self) -> None:
+        while True:
+            if self._pending:
+                try:
+                    self.expire(await self.rpc.call("getBlockHeight", [{"commitment": "confirmed"}]))
+                except Exception as e:
+                    print(f"❌ Block height check failed: {str(e)}")
+            await asyncio.sleep(self.expiry_interval)
+
+
+_shared_coordinator: Optional[PartialSignCoordinator] = None
+_shared_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_partial_sign_coordinator() -> PartialSignCoordinator:
+    """Get the process-wide coordinator for the running event loop, starting its expiry task."""
+    global _shared_coordinator, _shared_loop
+    loop = asyncio.get_running_loop()
+    if _shared_coordinator is None or _shared_loop is not loop:
+        _shared_coordinator = PartialSignCoordinator()
+        _shared_loop = loop
+        _shared_coordinator.start()
+    return _shared_coordinator
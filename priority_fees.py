@@ -0,0 +1,224 @@
+import asyncio
+import bisect
+import time
+from collections import deque
+from typing import Deque, Dict, Iterable, List, Optional, Tuple
+
+from solders.instruction import Instruction
+from solders.pubkey import Pubkey
+
+from latency_stats import nearest_rank
+from rpc_client import AsyncRpcClient, RpcError, get_rpc_client
+
+# getRecentPrioritizationFees reports this many recent slots
+RECENT_FEE_SLOTS = 150
+# Jupiter's "veryHigh" priority level
+DEFAULT_PERCENTILE = 75
+# Re-sample an account's fees once its window is this old
+DEFAULT_REFRESH_INTERVAL = 2.0  # seconds
+# Same ceiling the scripts used to pass Jupiter as maxLamports
+DEFAULT_MAX_LAMPORTS = 5_000
+DEFAULT_COMPUTE_UNIT_LIMIT = 200_000
+MICRO_LAMPORTS_PER_LAMPORT = 1_000_000
+# Priority fee to spend before any of a swap's accounts has been sampled,
+# spread over its compute unit limit
+DEFAULT_FALLBACK_LAMPORTS = DEFAULT_MAX_LAMPORTS
+
+
+def fee_accounts(instruction: Instruction) -> List[Pubkey]:
+    """The accounts an instruction write-locks, i.e. the ones whose fee markets it competes in."""
+    return [meta.pubkey for meta in instruction.accounts if meta.is_writable and not meta.is_signer]
+
+
+class FeeWindow:
+    """
+    Prioritization fees seen for one account over the last `window` slots.
+
+    Samples are kept both in slot order (to expire them) and sorted by fee
+    (so a percentile is a single index), making each update O(log n) to
+    locate plus a short memmove, and each percentile O(1).
+    """
+
+    __slots__ = ("window", "last_slot", "updated_at", "_by_slot", "_sorted")
+
+    def __init__(self, window: int = RECENT_FEE_SLOTS):
+        self.window = window
+        self.last_slot = -1
+        self.updated_at = 0.0
+        self._by_slot: Deque[Tuple[int, int]] = deque()
+        self._sorted: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self._sorted)
+
+    def add(self, slot: int, fee: int) -> None:
+        """Record one slot's fee; slots at or before the newest one seen are ignored."""
+        if slot <= self.last_slot:
+            return
+        self.last_slot = slot
+        self._by_slot.append((slot, fee))
+        bisect.insort(self._sorted, fee)
+        oldest = slot - self.window
+        while self._by_slot[0][0] <= oldest:
+            _, expired = self._by_slot.popleft()
+            del self._sorted[bisect.bisect_left(self._sorted, expired)]
+
+    def extend(self, samples: Iterable[Tuple[int, int]]) -> None:
+        for slot, fee in sorted(samples):
+            self.add(slot, fee)
+
+    def percentile(self, pct: float) -> int:
+        if not self._sorted:
+            return 0
+        return self._sorted[nearest_rank(len(self._sorted), pct)]
+
+
+class PriorityFeeEstimator:
+    """
+    Compute-unit prices from the recent fee markets of the accounts a swap locks.
+
+    Each account's getRecentPrioritizationFees samples feed a rolling
+    FeeWindow. The price for a swap is the highest `percentile` across its
+    accounts (the most contended one decides whether it lands), capped so
+    the whole priority fee stays under `max_lamports`.
+
+    Windows older than `refresh_interval` are re-sampled in the background
+    while the current estimate is served; only accounts never seen before
+    are waited for. The accounts one estimate needs sampled share a single
+    JSON-RPC batch (one call per account, since the RPC reports the fees of
+    transactions locking all the accounts given in one call).
+    """
+
+    def __init__(
+        self,
+        rpc: Optional[AsyncRpcClient] = None,
+        percentile: float = DEFAULT_PERCENTILE,
+        window: int = RECENT_FEE_SLOTS,
+        refresh_interval: float = DEFAULT_REFRESH_INTERVAL,
+        max_lamports: int = DEFAULT_MAX_LAMPORTS,
+        fallback_lamports: int = DEFAULT_FALLBACK_LAMPORTS,
+    ):
+        self._rpc = rpc
+        self.percentile = percentile
+        self.window = window
+        self.refresh_interval = refresh_interval
+        self.max_lamports = max_lamports
+        self.fallback_lamports = fallback_lamports
+        self._windows: Dict[Pubkey, FeeWindow] = {}
+        self._inflight: Dict[Pubkey, asyncio.Task] = {}
+        self.fetches = 0
+        self.failures = 0
+
+    @property
+    def rpc(self) -> AsyncRpcClient:
+        return self._rpc or get_rpc_client()
+
+    def _refresh(self, accounts: List[Pubkey]) -> Dict[Pubkey, asyncio.Task]:
+        """Start re-sampling `accounts` in one batch, joining refreshes already in flight."""
+        tasks = {}
+        batch = []
+        for account in accounts:
+            task = self._inflight.get(account)
+            if task is None or task.done():
+                batch.append(account)
+            else:
+                tasks[account] = task
+        if batch:
+            task = asyncio.create_task(self._fetch(batch))
+            for account in batch:
+                tasks[account] = self._inflight[account] = task
+        return tasks
+
+    async def _fetch(self, accounts: List[Pubkey]) -> None:
+        self.fetches += len(accounts)
+        try:
+            results = await self.rpc.batch(
+                [("getRecentPrioritizationFees", [[str(account)]]) for account in accounts]
+            )
+        except Exception as e:
+            # Keep the old windows; the next estimate retries
+            self.failures += len(accounts)
+            print(f"❌ Priority fee refresh failed for {len(accounts)} accounts: {str(e)}")
+            return
+        now = time.monotonic()
+        for account, samples in zip(accounts, results):
+            if isinstance(samples, RpcError):
+                self.failures += 1
+                print(f"❌ Priority fee refresh failed for {account}: {str(samples)}")
+                continue
+            window = self._windows.get(account)
+            if window is None:
+                window = self._windows[account] = FeeWindow(self.window)
+            window.extend((sample["slot"], sample["prioritizationFee"]) for sample in samples)
+            window.updated_at = now
+
+    def estimate(self, accounts: Iterable[Pubkey], compute_unit_limit: Optional[int] = None) -> int:
+        """
+        The price from the samples already held, without touching the network.
+
+        Args:
+            accounts (Iterable[Pubkey]): Accounts the transaction write-locks
+            compute_unit_limit (int, optional): The transaction's compute unit
+                limit, for the cap and the fallback; DEFAULT_COMPUTE_UNIT_LIMIT
+                if not known
+
+        Returns:
+            int: Compute unit price in micro-lamports
+        """
+        compute_unit_limit = max(compute_unit_limit or DEFAULT_COMPUTE_UNIT_LIMIT, 1)
+        windows = [self._windows.get(account) for account in accounts]
+        sampled = [window.percentile(self.percentile) for window in windows if window]
+        if sampled:
+            price = max(sampled)
+        else:
+            price = self.fallback_lamports * MICRO_LAMPORTS_PER_LAMPORT // compute_unit_limit
+        ceiling = self.max_lamports * MICRO_LAMPORTS_PER_LAMPORT // compute_unit_limit
+        return min(price, ceiling)
+
+    async def compute_unit_price(
+        self, accounts: Iterable[Pubkey], compute_unit_limit: Optional[int] = None
+    ) -> int:
+        """
+        Estimate a compute unit price, sampling accounts as needed.
+
+        Args:
+            accounts (Iterable[Pubkey]): Accounts the transaction write-locks
+            compute_unit_limit (int, optional): The transaction's compute unit
+                limit, for the cap; DEFAULT_COMPUTE_UNIT_LIMIT if not known
+
+        Returns:
+            int: Compute unit price in micro-lamports
+        """
+        accounts = list(dict.fromkeys(accounts))
+        now = time.monotonic()
+        unseen = [account for account in accounts if account not in self._windows]
+        stale = [account for account in accounts
+                 if account in self._windows and now - self._windows[account].updated_at > self.refresh_interval]
+        if unseen or stale:
+            tasks = self._refresh(unseen + stale)
+            waiting = {tasks[account] for account in unseen}
+            if waiting:
+                await asyncio.gather(*(asyncio.shield(task) for task in waiting))
+        return self.estimate(accounts, compute_unit_limit)
+
+    def stats(self) -> Dict[str, int]:
+        return {"accounts": len(self._windows), "fetches": self.fetches, "failures": self.failures}
+
+
+_shared_estimator: Optional[PriorityFeeEstimator] = None
+_shared_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_priority_fee_estimator() -> PriorityFeeEstimator:
+    """
+    Get the process-wide priority fee estimator.
+
+    Like get_blockhash_provider(), it's tied to the running event loop
+    because of its in-flight refresh tasks.
+    """
+    global _shared_estimator, _shared_loop
+    loop = asyncio.get_running_loop()
+    if _shared_estimator is None or _shared_loop is not loop:
+        _shared_estimator = PriorityFeeEstimator()
+        _shared_loop = loop
+    return _shared_estimator
@@ -0,0 +1,179 @@
+import asyncio
+import math
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from quote_engine import QuoteError, QuoteResult, get_quote_engine
+
+# Cache defaults
+DEFAULT_TTL = 2.0  # seconds a quote is served as fresh
+DEFAULT_STALE_TTL = 3.0  # extra seconds a quote is served while it is re-fetched
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_AMOUNT_BUCKET_BPS = 0  # 0 = exact amounts only
+
+CacheKey = Tuple[Any, ...]
+QuoteFetcher = Callable[[Dict[str, Any]], Awaitable[QuoteResult]]
+
+
+def amount_bucket(amount: int, bucket_bps: int) -> int:
+    """
+    Map an amount to its bucket: amounts within `bucket_bps` basis points of
+    each other (on a log scale) share a bucket. 0 disables bucketing.
+    """
+    if bucket_bps <= 0 or amount <= 0:
+        return amount
+    return math.floor(math.log(amount) / math.log1p(bucket_bps / 10_000))
+
+
+class QuoteCache:
+    """
+    TTL + LRU cache in front of the Jupiter quote endpoint.
+
+    Entries are keyed by mint pair, amount bucket, slippage and any other
+    query parameters. Fresh entries are served for `ttl` seconds; for a
+    further `stale_ttl` seconds the stale quote is still served while a
+    single background request revalidates it. With bucketing enabled the
+    served quote may be for any amount in the bucket, so check its inAmount.
+    """
+
+    def __init__(
+        self,
+        fetcher: Optional[QuoteFetcher] = None,
+        ttl: float = DEFAULT_TTL,
+        stale_ttl: float = DEFAULT_STALE_TTL,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        amount_bucket_bps: int = DEFAULT_AMOUNT_BUCKET_BPS,
+    ):
+        self._fetcher = fetcher
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self.amount_bucket_bps = amount_bucket_bps
+
+        self._entries: "OrderedDict[CacheKey, Tuple[dict, float]]" = OrderedDict()
+        self._revalidating: Dict[CacheKey, asyncio.Task] = {}
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.revalidations = 0
+        self.errors = 0
+
+    def _fetch(self, params: Dict[str, Any]) -> Awaitable[QuoteResult]:
+        if self._fetcher is not None:
+            return self._fetcher(params)
+        return get_quote_engine().get_quote(params)
+
+    def key(self, params: Dict[str, Any]) -> CacheKey:
+        rest = tuple(
+            sorted(
+                (name, str(value))
+                for name, value in params.items()
+                if name not in ("inputMint", "outputMint", "amount", "slippageBps")
+            )
+        )
+        return (
+            params["inputMint"],
+            params["outputMint"],
+            amount_bucket(int(params["amount"]), self.amount_bucket_bps),
+            str(params.get("slippageBps", "")),
+            rest,
+        )
+
+    def _store(self, key: CacheKey, quote: dict) -> None:
+        self._entries[key] = (quote, time.monotonic())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def _load(self, key: CacheKey, params: Dict[str, Any]) -> dict:
+        result = await self._fetch(params)
+        if result.error is not None:
+            self.errors += 1
+            raise QuoteError(result.error)
+        self._store(key, result.quote)
+        return result.quote
+
+    async def _revalidate(self, key: CacheKey, params: Dict[str, Any]) -> None:
+        try:
+            await self._load(key, params)
+        except QuoteError:
+            pass  # keep serving the stale quote until it ages out
+        finally:
+            self._revalidating.pop(key, None)
+
+    async def get(self, params: Dict[str, Any]) -> dict:
+        """
+        Get a quote, from cache when possible.
+
+        Args:
+            params (Dict[str, Any]): Query parameters for /quote
+
+        Returns:
+            dict: The quote response
+
+        Raises:
+            QuoteError: If there's no usable cached quote and fetching fails
+        """
+        key = self.key(params)
+        entry = self._entries.get(key)
+        if entry is not None:
+            quote, stored_at = entry
+            age = time.monotonic() - stored_at
+            if age <= self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return quote
+            if age <= self.ttl + self.stale_ttl:
+                self._entries.move_to_end(key)
+                self.stale_hits += 1
+                if key not in self._revalidating:
+                    self.revalidations += 1
+                    self._revalidating[key] = asyncio.create_task(self._revalidate(key, params))
+                return quote
+            del self._entries[key]
+
+        self.misses += 1
+        return await self._load(key, params)
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "revalidations": self.revalidations,
+            "errors": self.errors,
+            "hit_rate": (self.hits + self.stale_hits) / lookups if lookups else 0.0,
+        }
+
+
+_shared_cache: Optional[QuoteCache] = None
+
+
+def get_quote_cache() -> QuoteCache:
+    """Get the process-wide quote cache."""
+    global _shared_cache
+    if _shared_cache is None:
+        _shared_cache = QuoteCache()
+    return _shared_cache
+
+
+async def fetch_quote(params: Dict[str, Any]) -> dict:
+    """
+    Fetch a quote through the shared cache.
+
+    Args:
+        params (Dict[str, Any]): Query parameters for /quote
+
+    Returns:
+        dict: The quote response
+
+    Raises:
+        QuoteError: If there's no usable cached quote and fetching fails
+    """
+    return await get_quote_cache().get(params)
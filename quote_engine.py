@@ -0,0 +1,242 @@
+import asyncio
+import itertools
+import time
+from collections import Counter
+from typing import Any, AsyncIterator, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import httpx
+
+from config import JUPITER_API_URL
+
+# Default request budget against the quote endpoint
+DEFAULT_REQUESTS_PER_SECOND = 10.0
+DEFAULT_BURST = 10
+DEFAULT_MAX_CONCURRENCY = 8
+DEFAULT_QUOTE_TIMEOUT = 5.0  # seconds
+
+QuoteKey = Tuple[Tuple[str, str], ...]
+
+
+class QuoteError(Exception):
+    """Raised when Jupiter can't produce a quote for a parameter set."""
+
+
+class QuoteResult(NamedTuple):
+    params: Dict[str, str]
+    quote: Optional[dict]
+    error: Optional[str]
+    latency: float  # seconds spent on the underlying HTTP request
+
+
+class RateLimiter:
+    """Token bucket: `rate` requests per second with bursts of up to `burst`."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def try_acquire(self) -> bool:
+        """Take a token if one is available right now, without waiting."""
+        self._refill()
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return True
+        return False
+
+
+def quote_key(params: Dict[str, Any]) -> QuoteKey:
+    """Normalize quote parameters so equal requests map to the same key."""
+    return tuple(sorted((name, str(value)) for name, value in params.items()))
+
+
+def build_quote_grid(
+    input_mints: Iterable[str],
+    output_mints: Iterable[str],
+    amounts: Iterable[int],
+    slippages_bps: Iterable[int],
+    **extra_params: Any,
+) -> List[Dict[str, str]]:
+    """
+    Expand mint, amount and slippage choices into quote parameter sets.
+
+    Args:
+        input_mints (Iterable[str]): Input token mints
+        output_mints (Iterable[str]): Output token mints
+        amounts (Iterable[int]): Input amounts in the input token's base units
+        slippages_bps (Iterable[int]): Slippage tolerances in basis points
+        **extra_params: Extra query parameters added to every set
+            (e.g. restrictIntermediateTokens="false")
+
+    Returns:
+        List[Dict[str, str]]: One parameter dict per combination, skipping
+        pairs where the input and output mint are the same
+    """
+    extra = {name: str(value) for name, value in extra_params.items()}
+    return [
+        {
+            "inputMint": input_mint,
+            "outputMint": output_mint,
+            "amount": str(amount),
+            "slippageBps": str(slippage_bps),
+            **extra,
+        }
+        for input_mint, output_mint, amount, slippage_bps in itertools.product(
+            input_mints, output_mints, amounts, slippages_bps
+        )
+        if input_mint != output_mint
+    ]
+
+
+class QuoteEngine:
+    """
+    Fetches Jupiter quotes concurrently under a request-rate budget.
+
+    Identical requests already in flight are shared instead of sent twice,
+    so a grid with repeated parameter sets costs one request per distinct set.
+    """
+
+    def __init__(
+        self,
+        base_url: str = JUPITER_API_URL,
+        requests_per_second: float = DEFAULT_REQUESTS_PER_SECOND,
+        burst: int = DEFAULT_BURST,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        timeout: float = DEFAULT_QUOTE_TIMEOUT,
+    ):
+        self.quote_url = f"{base_url}/quote"
+        self._limiter = RateLimiter(requests_per_second, burst)
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._inflight: Dict[QuoteKey, asyncio.Task] = {}
+        self._http = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=max_concurrency, max_keepalive_connections=max_concurrency
+            ),
+            timeout=timeout,
+        )
+
+    async def __aenter__(self) -> "QuoteEngine":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        await self._http.aclose()
+
+    async def _request(self, params: Dict[str, str]) -> QuoteResult:
+        async with self._semaphore:
+            await self._limiter.acquire()
+            started = time.perf_counter()
+            try:
+                response = await self._http.get(self.quote_url, params=params)
+                quote = response.json()
+            except (httpx.HTTPError, ValueError) as e:
+                return QuoteResult(params, None, str(e), time.perf_counter() - started)
+            latency = time.perf_counter() - started
+
+        # Jupiter reports unroutable pairs etc. as {"error": ...} alongside a 4xx status
+        if isinstance(quote, dict) and "error" in quote:
+            return QuoteResult(params, None, str(quote["error"]), latency)
+        if response.is_error:
+            return QuoteResult(params, None, f"HTTP {response.status_code}", latency)
+        return QuoteResult(params, quote, None, latency)
+
+    def _fetch(self, params: Dict[str, Any]) -> asyncio.Task:
+        key = quote_key(params)
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._request(dict(key)))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return task
+
+    async def get_quote(self, params: Dict[str, Any]) -> QuoteResult:
+        """
+        Fetch one quote, joining an identical request if one is in flight.
+
+        Args:
+            params (Dict[str, Any]): Query parameters for /quote
+
+        Returns:
+            QuoteResult: The quote (or error) with its request latency
+        """
+        return await asyncio.shield(self._fetch(params))
+
+    async def stream(self, grid: Iterable[Dict[str, Any]]) -> AsyncIterator[QuoteResult]:
+        """
+        Fetch every parameter set in `grid` and yield results as they arrive.
+
+        Args:
+            grid (Iterable[Dict[str, Any]]): Quote parameter sets, e.g. from build_quote_grid
+
+        Yields:
+            QuoteResult: One result per parameter set, in completion order
+        """
+        tasks = [self._fetch(params) for params in grid]
+        # Duplicates share a task; yield its result once per parameter set that asked for it
+        counts = Counter(tasks)
+        pending = set(counts)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                for _ in range(counts[task]):
+                    yield task.result()
+
+
+_shared_engine: Optional[QuoteEngine] = None
+_shared_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_quote_engine() -> QuoteEngine:
+    """Get the process-wide quote engine for the running event loop."""
+    global _shared_engine, _shared_loop
+    loop = asyncio.get_running_loop()
+    if _shared_engine is None or _shared_loop is not loop:
+        _shared_engine = QuoteEngine()
+        _shared_loop = loop
+    return _shared_engine
+
+
+async def close_quote_engine() -> None:
+    """Close the shared engine's connections, if it was created on this loop."""
+    global _shared_engine, _shared_loop
+    if _shared_engine is not None and _shared_loop is asyncio.get_running_loop():
+        await _shared_engine.aclose()
+    _shared_engine = None
+    _shared_loop = None
+
+
+async def fetch_quote(params: Dict[str, Any]) -> dict:
+    """
+    Fetch a single quote through the shared engine.
+
+    Args:
+        params (Dict[str, Any]): Query parameters for /quote
+
+    Returns:
+        dict: The quote response
+
+    Raises:
+        QuoteError: If the request failed or Jupiter returned an error
+    """
+    result = await get_quote_engine().get_quote(params)
+    if result.error is not None:
+        raise QuoteError(result.error)
+    return result.quote
@@ -0,0 +1,280 @@
+import asyncio
+import base64
+import itertools
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import httpx
+from solders.hash import Hash
+from solders.pubkey import Pubkey
+
+from config import HELIUS_RPC_ENDPOINT
+from transaction_cache import TransactionCache, get_transaction_cache, split_params
+
+# Connection pool defaults
+DEFAULT_MAX_CONNECTIONS = 20
+DEFAULT_MAX_KEEPALIVE_CONNECTIONS = 10
+DEFAULT_KEEPALIVE_EXPIRY = 30.0  # seconds
+
+# Per-method timeouts (seconds); anything not listed uses DEFAULT_TIMEOUT
+DEFAULT_TIMEOUT = 10.0
+METHOD_TIMEOUTS = {
+    "sendTransaction": 5.0,
+    "getLatestBlockhash": 3.0,
+    "getAccountInfo": 5.0,
+    "getSignatureStatuses": 3.0,
+    "getMultipleAccounts": 8.0,
+    "getTransaction": 15.0,
+}
+
+# Same send configuration every script used for its one-off httpx.post
+DEFAULT_SEND_OPTIONS = {
+    "skipPreflight": True,
+    "preflightCommitment": "finalized",
+    "encoding": "base64",
+    "maxRetries": None,
+    "minContextSlot": None,
+}
+
+
+class RpcError(Exception):
+    """Error object returned by the RPC node for a JSON-RPC request."""
+
+    def __init__(self, code: int, message: str, data: Any = None):
+        super().__init__(f"RPC error {code}: {message}")
+        self.code = code
+        self.message = message
+        self.data = data
+
+
+class AsyncRpcClient:
+    """
+    Async JSON-RPC client over a bounded, keep-alive httpx connection pool.
+
+    HTTP/2 is enabled so concurrent calls are multiplexed over the same
+    connection instead of each paying for its own TLS handshake.
+
+    Finalized getTransaction results are read through `transaction_cache`
+    (by default the shared on-disk cache, if TRANSACTION_CACHE_PATH turns
+    it on), so a transaction is only downloaded once.
+    """
+
+    def __init__(
+        self,
+        endpoint: str = HELIUS_RPC_ENDPOINT,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        max_keepalive_connections: int = DEFAULT_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry: float = DEFAULT_KEEPALIVE_EXPIRY,
+        method_timeouts: Optional[Dict[str, float]] = None,
+        http2: bool = True,
+        transaction_cache: Optional[TransactionCache] = None,
+    ):
+        self.endpoint = endpoint
+        self._transaction_cache = transaction_cache
+        self.method_timeouts = {**METHOD_TIMEOUTS, **(method_timeouts or {})}
+        self._ids = itertools.count(1)
+        self._http = httpx.AsyncClient(
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry,
+            ),
+            headers={"Content-Type": "application/json"},
+            timeout=DEFAULT_TIMEOUT,
+        )
+
+    async def __aenter__(self) -> "AsyncRpcClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        await self._http.aclose()
+
+    @property
+    def transaction_cache(self) -> Optional[TransactionCache]:
+        return self._transaction_cache or get_transaction_cache()
+
+    def _timeout(self, method: str) -> float:
+        return self.method_timeouts.get(method, DEFAULT_TIMEOUT)
+
+    def _request(self, method: str, params: Optional[Sequence[Any]]) -> dict:
+        return {
+            "jsonrpc": "2.0",
+            "id": next(self._ids),
+            "method": method,
+            "params": list(params or []),
+        }
+
+    @staticmethod
+    def _unwrap(response: dict) -> Any:
+        if "error" in response:
+            error = response["error"]
+            if not isinstance(error, dict):
+                raise RpcError(-32603, str(error))
+            raise RpcError(error.get("code", -32603), error.get("message", ""), error.get("data"))
+        return response.get("result")
+
+    async def call(self, method: str, params: Optional[Sequence[Any]] = None) -> Any:
+        """
+        Send a single JSON-RPC request.
+
+        Args:
+            method (str): The RPC method name
+            params (Sequence, optional): Positional parameters for the method
+
+        Returns:
+            Any: The `result` field of the response
+
+        Raises:
+            RpcError: If the node answers with an error object
+            httpx.HTTPError: If the request itself fails
+        """
+        cache = self.transaction_cache if method == "getTransaction" else None
+        if cache is not None:
+            cached = cache.get(*split_params(params))
+            if cached is not None:
+                return cached
+        response = await self._http.post(
+            self.endpoint,
+            json=self._request(method, params),
+            timeout=self._timeout(method),
+        )
+        response.raise_for_status()
+        result = self._unwrap(response.json())
+        if cache is not None:
+            signature, config = split_params(params)
+            cache.put(signature, config, result)
+        return result
+
+    async def batch(self, calls: Sequence[Tuple[str, Optional[Sequence[Any]]]]) -> List[Any]:
+        """
+        Send several requests as one JSON-RPC batch.
+
+        Args:
+            calls (Sequence[Tuple[str, Sequence]]): (method, params) pairs
+
+        Returns:
+            List[Any]: Results in the order of `calls`; failed entries are
+            returned as RpcError instances instead of being raised
+        """
+        if not calls:
+            return []
+        cached: Dict[int, Any] = {}
+        if any(method == "getTransaction" for method, _ in calls) and self.transaction_cache is not None:
+            positions = [i for i, (method, _) in enumerate(calls) if method == "getTransaction"]
+            found = self.transaction_cache.get_many([calls[i][1] for i in positions])
+            cached = {positions[j]: result for j, result in found.items()}
+            if len(cached) == len(calls):
+                return [cached[i] for i in range(len(calls))]
+        results = await self._batch([call for i, call in enumerate(calls) if i not in cached])
+        if cached:
+            fetched = iter(results)
+            results = [cached[i] if i in cached else next(fetched) for i in range(len(calls))]
+        return results
+
+    async def _batch(self, calls: Sequence[Tuple[str, Optional[Sequence[Any]]]]) -> List[Any]:
+        payload = [self._request(method, params) for method, params in calls]
+        response = await self._http.post(
+            self.endpoint,
+            json=payload,
+            timeout=max(self._timeout(method) for method, _ in calls),
+        )
+        response.raise_for_status()
+        body = response.json()
+        if not isinstance(body, list):
+            # The node rejected the batch as a whole
+            if isinstance(body, dict):
+                self._unwrap(body)
+            raise RpcError(-32600, "Invalid batch response")
+
+        # Items that aren't response objects (e.g. a bare error string) can't be
+        # matched to a request, so the requests they answered get an RpcError
+        by_id = {item.get("id"): item for item in body if isinstance(item, dict)}
+        missing = "Missing from batch response"
+        if not all(isinstance(item, dict) for item in body):
+            missing = "Invalid batch response item"
+        results = []
+        fetched = []
+        for request in payload:
+            item = by_id.get(request["id"])
+            if item is None:
+                results.append(RpcError(-32603, missing))
+                continue
+            try:
+                results.append(self._unwrap(item))
+            except RpcError as e:
+                results.append(e)
+                continue
+            if request["method"] == "getTransaction":
+                fetched.append((*split_params(request["params"]), results[-1]))
+        if fetched and self.transaction_cache is not None:
+            self.transaction_cache.put_many(fetched)
+        return results
+
+    async def send_transaction(self, tx_bytes: Union[bytes, bytearray, memoryview], **options: Any) -> str:
+        """
+        Send a signed, serialized transaction.
+
+        The bytes are encoded before the first await, so the caller may reuse
+        the buffer as soon as this coroutine has started.
+
+        Args:
+            tx_bytes (bytes-like): The wire-format transaction
+            **options: Overrides for DEFAULT_SEND_OPTIONS (e.g. skipPreflight=False)
+
+        Returns:
+            str: The transaction signature
+        """
+        encoded_tx = base64.b64encode(tx_bytes).decode("utf-8")
+        return await self.call("sendTransaction", [encoded_tx, {**DEFAULT_SEND_OPTIONS, **options}])
+
+    async def get_latest_blockhash(self, commitment: str = "finalized") -> Tuple[Hash, int]:
+        """
+        Returns:
+            Tuple[Hash, int]: The blockhash and its lastValidBlockHeight
+        """
+        result = await self.call("getLatestBlockhash", [{"commitment": commitment}])
+        value = result["value"]
+        return Hash.from_string(value["blockhash"]), value["lastValidBlockHeight"]
+
+    async def get_account_info(
+        self, pubkey: Pubkey, commitment: str = "confirmed", encoding: str = "base64"
+    ) -> Optional[dict]:
+        """
+        Returns:
+            Optional[dict]: The account value, or None if the account doesn't exist
+        """
+        result = await self.call(
+            "getAccountInfo", [str(pubkey), {"commitment": commitment, "encoding": encoding}]
+        )
+        return result["value"]
+
+
+_shared_client: Optional[AsyncRpcClient] = None
+_shared_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_rpc_client() -> AsyncRpcClient:
+    """
+    Get the process-wide RPC client for HELIUS_RPC_ENDPOINT.
+
+    The pool is bound to the running event loop, so a new client is created
+    when called from a different loop (e.g. a second asyncio.run()).
+    """
+    global _shared_client, _shared_loop
+    loop = asyncio.get_running_loop()
+    if _shared_client is None or _shared_loop is not loop:
+        _shared_client = AsyncRpcClient()
+        _shared_loop = loop
+    return _shared_client
+
+
+async def close_rpc_client() -> None:
+    """Close the shared client's connections, if it was created on this loop."""
+    global _shared_client, _shared_loop
+    if _shared_client is not None and _shared_loop is asyncio.get_running_loop():
+        await _shared_client.aclose()
+    _shared_client = None
+    _shared_loop = None
@@ -0,0 +1,361 @@
+import argparse
+import asyncio
+import json
+import os
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, List, Optional, Set
+
+import httpx
+
+from broadcaster import run_and_close
+from rpc_client import AsyncRpcClient, RpcError, get_rpc_client
+from transaction_store import decode_transaction
+
+# getSignaturesForAddress returns at most 1000 signatures per page
+MAX_SIGNATURES_PER_PAGE = 1_000
+# getTransaction calls per JSON-RPC batch, and batches in flight at once
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_CONCURRENCY = 4
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_RETRY_BACKOFF = 0.5  # seconds, doubled per attempt
+# Bumped whenever the checkpoint or row format changes; older checkpoints are refused
+CHECKPOINT_VERSION = 2
+
+
+def _get_transaction_params(signature: str, commitment: str) -> list:
+    return [signature, {"encoding": "json", "maxSupportedTransactionVersion": 0, "commitment": commitment}]
+
+
+def decode_row(info: dict, transaction: Optional[dict]) -> Dict[str, Any]:
+    """
+    Flatten a getSignaturesForAddress entry and its getTransaction result into one row.
+
+    Args:
+        info (dict): The signature's entry from getSignaturesForAddress
+        transaction (dict, optional): Its getTransaction result (json encoding),
+            or None if the node no longer has it
+
+    Returns:
+        Dict[str, Any]: A TransactionStore row (see decode_transaction); when
+        the transaction is missing only signature, slot, block_time and err
+        are filled in
+    """
+    if transaction is not None:
+        return decode_transaction(transaction, info["signature"])
+    return {
+        "signature": info["signature"],
+        "slot": info["slot"],
+        "block_time": info.get("blockTime"),
+        "err": info.get("err"),
+        "fee": None,
+        "sender": None,
+        "account_keys": [],
+        "program_ids": [],
+        "token_deltas": [],
+    }
+
+
+class CrawlCheckpoint:
+    """
+    Where a crawl of one address stopped, saved next to its output file.
+
+    Signatures are crawled newest to oldest. `before` is the oldest
+    signature such that it and everything newer (down to `until`) has been
+    written; `written` holds the signatures past it that were written out of
+    order by concurrent batches. `offset` is the output file's size at the
+    time, so rows written after the last save can be cut off on resume.
+    """
+
+    def __init__(
+        self,
+        address: str,
+        until: Optional[str] = None,
+        before: Optional[str] = None,
+        newest: Optional[str] = None,
+        written: Iterable[str] = (),
+        offset: int = 0,
+        rows: int = 0,
+        complete: bool = False,
+    ):
+        self.address = address
+        self.until = until
+        self.before = before
+        self.newest = newest
+        self.written: Set[str] = set(written)
+        self.offset = offset
+        self.rows = rows
+        self.complete = complete
+
+    @classmethod
+    def load(cls, path: str, address: str) -> "CrawlCheckpoint":
+        """Load the checkpoint at `path`, or start a new one if there is none."""
+        try:
+            with open(path) as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return cls(address)
+        if state.get("version") != CHECKPOINT_VERSION:
+            raise ValueError(
+                f"{path} is a version {state.get('version')} checkpoint, this crawler writes "
+                f"version {CHECKPOINT_VERSION}; start a new output file to crawl again"
+            )
+        if state.get("address") != address:
+            raise ValueError(f"{path} is not a checkpoint for {address}")
+        return cls(
+            address,
+            until=state["until"],
+            before=state["before"],
+            newest=state["newest"],
+            written=state["written"],
+            offset=state["offset"],
+            rows=state["rows"],
+            complete=state["complete"],
+        )
+
+    def save(self, path: str) -> None:
+        """Write the checkpoint atomically, so a crash leaves the old one or the new one."""
+        state = {
+            "version": CHECKPOINT_VERSION,
+            "address": self.address,
+            "until": self.until,
+            "before": self.before,
+            "newest": self.newest,
+            "written": sorted(self.written),
+            "offset": self.offset,
+            "rows": self.rows,
+            "complete": self.complete,
+        }
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    def next_pass(self) -> None:
+        """After a finished crawl, set up one that only picks up signatures newer than it saw."""
+        self.until = self.newest or self.until
+        self.before = None
+        self.newest = None
+        self.written.clear()
+        self.complete = False
+
+
+class SignatureCrawler:
+    """
+    Backfills every transaction that touched an address into a JSON Lines file.
+
+    One task pages getSignaturesForAddress from newest to oldest with the
+    `before` cursor (stopping at `until`), splitting each page into batches
+    of `batch_size` signatures. Up to `concurrency` batches are resolved at
+    once with JSON-RPC batched getTransaction calls; each one's rows are
+    appended and flushed to `output_path` as soon as it completes, then the
+    checkpoint is saved.
+
+    Resuming with the same checkpoint truncates the output to the last
+    checkpointed offset and skips every signature already written, so each
+    signature ends up in the file exactly once. Once a crawl finishes,
+    running it again only fetches signatures newer than that crawl's newest.
+    """
+
+    def __init__(
+        self,
+        address: str,
+        output_path: str,
+        checkpoint_path: Optional[str] = None,
+        rpc: Optional[AsyncRpcClient] = None,
+        commitment: str = "finalized",
+        page_size: int = MAX_SIGNATURES_PER_PAGE,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        retry_backoff: float = DEFAULT_RETRY_BACKOFF,
+    ):
+        if not 1 <= page_size <= MAX_SIGNATURES_PER_PAGE:
+            raise ValueError(f"page_size must be between 1 and {MAX_SIGNATURES_PER_PAGE}")
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        self.address = address
+        self.output_path = output_path
+        self.checkpoint_path = checkpoint_path or f"{output_path}.checkpoint.json"
+        self._rpc = rpc
+        self.commitment = commitment
+        self.page_size = page_size
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+
+        self.checkpoint = CrawlCheckpoint.load(self.checkpoint_path, address)
+        # Signatures handed to the fetchers, in crawl order, until the cursor passes them
+        self._pending: Deque[str] = deque()
+        self._done: Set[str] = set()
+        self.pages = 0
+        self.fetched = 0
+
+    @property
+    def rpc(self) -> AsyncRpcClient:
+        return self._rpc or get_rpc_client()
+
+    async def _retrying(self, method: str, call):
+        for attempt in range(self.max_retries + 1):
+            try:
+                return await call()
+            except (RpcError, httpx.HTTPError, json.JSONDecodeError) as e:
+                if attempt == self.max_retries:
+                    raise
+                print(f"⚠️ {method} failed ({e}), retrying")
+                await asyncio.sleep(self.retry_backoff * 2 ** attempt)
+
+    async def _page(self, before: Optional[str]) -> List[dict]:
+        config = {"limit": self.page_size, "commitment": self.commitment}
+        if before is not None:
+            config["before"] = before
+        if self.checkpoint.until is not None:
+            config["until"] = self.checkpoint.until
+        return await self._retrying(
+            "getSignaturesForAddress", lambda: self.rpc.call("getSignaturesForAddress", [self.address, config])
+        )
+
+    async def _fetch(self, infos: List[dict]) -> List[Optional[dict]]:
+        """getTransaction for a batch; entries that fail are retried on their own."""
+        calls = [("getTransaction", _get_transaction_params(info["signature"], self.commitment)) for info in infos]
+        results = await self._retrying("getTransaction", lambda: self.rpc.batch(calls))
+        for i, result in enumerate(results):
+            if isinstance(result, RpcError):
+                method, params = calls[i]
+                results[i] = await self._retrying(method, lambda params=params: self.rpc.call(method, params))
+        return results
+
+    async def _produce(self, batches: asyncio.Queue) -> None:
+        cursor = self.checkpoint.before
+        while True:
+            page = await self._page(cursor)
+            self.pages += 1
+            if not page:
+                break
+            if self.checkpoint.newest is None:
+                self.checkpoint.newest = page[0]["signature"]
+            cursor = page[-1]["signature"]
+            self._pending.extend(info["signature"] for info in page)
+            # Written past the cursor before a restart: only the cursor needs to move over them
+            self._done.update(info["signature"] for info in page if info["signature"] in self.checkpoint.written)
+            infos = [info for info in page if info["signature"] not in self.checkpoint.written]
+            for start in range(0, len(infos), self.batch_size):
+                await batches.put(infos[start:start + self.batch_size])
+            if len(page) < self.page_size:
+                break
+        for _ in range(self.concurrency):
+            await batches.put(None)
+
+    def _advance(self, signatures: List[str]) -> None:
+        # Move the cursor past the longest run of written signatures
+        self._done.update(signatures)
+        self.checkpoint.written.update(signatures)
+        while self._pending and self._pending[0] in self._done:
+            signature = self._pending.popleft()
+            self._done.discard(signature)
+            self.checkpoint.written.discard(signature)
+            self.checkpoint.before = signature
+
+    async def _consume(self, batches: asyncio.Queue, output) -> None:
+        while True:
+            infos = await batches.get()
+            if infos is None:
+                return
+            transactions = await self._fetch(infos)
+            self.fetched += len(infos)
+            rows = [decode_row(info, transaction) for info, transaction in zip(infos, transactions)]
+            output.write("".join(json.dumps(row) + "\n" for row in rows).encode("utf-8"))
+            output.flush()
+            os.fsync(output.fileno())
+            self._advance([info["signature"] for info in infos])
+            self.checkpoint.offset = output.tell()
+            self.checkpoint.rows += len(rows)
+            self.checkpoint.save(self.checkpoint_path)
+
+    async def crawl(self) -> CrawlCheckpoint:
+        """
+        Crawl the address, resuming from the checkpoint if there is one.
+
+        Returns:
+            CrawlCheckpoint: The final checkpoint (rows written so far, the
+            newest signature seen, and `complete`)
+
+        Raises:
+            RpcError: If a call still fails after `max_retries` retries; the
+                checkpoint is left at the last completed batch
+            httpx.HTTPError: Likewise, for transport failures
+        """
+        if self.checkpoint.complete:
+            self.checkpoint.next_pass()
+        mode = "r+b" if os.path.exists(self.output_path) else "wb"
+        with open(self.output_path, mode) as output:
+            # Drop rows written after the last checkpoint; their signatures get fetched again
+            output.truncate(self.checkpoint.offset)
+            output.seek(self.checkpoint.offset)
+            batches: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency)
+            consumers = [asyncio.create_task(self._consume(batches, output)) for _ in range(self.concurrency)]
+            producer = asyncio.create_task(self._produce(batches))
+            try:
+                # The first failure on either side ends the crawl instead of leaving the queue stuck
+                await asyncio.gather(producer, *consumers)
+            finally:
+                for task in (producer, *consumers):
+                    task.cancel()
+        self.checkpoint.complete = True
+        self.checkpoint.save(self.checkpoint_path)
+        return self.checkpoint
+
+
+async def crawl_address(address: str, output_path: str, **options: Any) -> CrawlCheckpoint:
+    """
+    Crawl every transaction that touched `address` into `output_path`.
+
+    Args:
+        address (str): The account, mint or program to crawl
+        output_path (str): JSON Lines file the rows are appended to
+        **options: SignatureCrawler options (checkpoint_path, batch_size, concurrency, ...)
+
+    Returns:
+        CrawlCheckpoint: The final checkpoint
+    """
+    return await SignatureCrawler(address, output_path, **options).crawl()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill the transactions that touched an address")
+    parser.add_argument("address", help="Fee account, mint or any other address")
+    parser.add_argument("--output", required=True, help="JSON Lines file to append rows to")
+    parser.add_argument("--checkpoint", help="Checkpoint file (default: <output>.checkpoint.json)")
+    parser.add_argument("--page-size", type=int, default=MAX_SIGNATURES_PER_PAGE)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    args = parser.parse_args()
+
+    async def run():
+        crawler = SignatureCrawler(
+            args.address,
+            args.output,
+            checkpoint_path=args.checkpoint,
+            page_size=args.page_size,
+            batch_size=args.batch_size,
+            concurrency=args.concurrency,
+        )
+        resumed_rows = crawler.checkpoint.rows
+        checkpoint = await crawler.crawl()
+        return crawler, checkpoint.rows - resumed_rows, checkpoint.rows
+
+    try:
+        crawler, new_rows, total_rows = run_and_close(run())
+    except (RpcError, httpx.HTTPError) as e:
+        print(f"❌ Crawl stopped: {str(e)}; run again to resume")
+        return
+    print(f"✅ Wrote {new_rows} rows ({total_rows} total) to {args.output} "
+          f"from {crawler.pages} page(s) of signatures")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+import asyncio
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from solders.keypair import Keypair
+from solders.message import Message, MessageV0, to_bytes_versioned
+from solders.pubkey import Pubkey
+
+from wire_transaction import encode_length
+
+# Enough work per pool task that dispatch overhead stays small next to signing
+DEFAULT_CHUNK_SIZE = 64
+KEYPAIR_CACHE_SIZE = 1024
+
+AnyMessage = Union[Message, MessageV0]
+# (message bytes, secret keys of its signers in signature-slot order)
+PreparedMessage = Tuple[bytes, Tuple[bytes, ...]]
+
+
+@lru_cache(maxsize=KEYPAIR_CACHE_SIZE)
+def _keypair(secret: bytes) -> Keypair:
+    # Keypairs don't pickle, so process workers get the raw secret and rebuild them once
+    return Keypair.from_bytes(secret)
+
+
+def _sign_chunk(chunk: List[PreparedMessage]) -> List[bytes]:
+    signed = []
+    for message_bytes, secrets in chunk:
+        parts = [encode_length(len(secrets))]
+        parts.extend(bytes(_keypair(secret).sign_message(message_bytes)) for secret in secrets)
+        parts.append(message_bytes)
+        signed.append(b"".join(parts))
+    return signed
+
+
+def prepare(
+    message: AnyMessage, signers: Sequence[Keypair], identities: Optional[Dict[int, Tuple[Pubkey, bytes]]] = None
+) -> PreparedMessage:
+    """
+    Serialize a message once and line its signers up with its signature slots.
+
+    Args:
+        message (MessageV0 | Message): The message to sign
+        signers (Sequence[Keypair]): Every required signer, in any order
+        identities (dict, optional): Memo of (pubkey, secret) by id(signer),
+            shared across a batch; Keypair.pubkey() and hashing a Keypair
+            both re-derive the public key, which costs more than signing
+
+    Returns:
+        Tuple[bytes, Tuple[bytes, ...]]: The versioned message bytes and the
+        signers' secret keys in slot order
+
+    Raises:
+        ValueError: If a required signer is missing
+    """
+    if identities is None:
+        identities = {}
+    by_pubkey = {}
+    for signer in signers:
+        identity = identities.get(id(signer))
+        if identity is None:
+            identity = identities[id(signer)] = (signer.pubkey(), bytes(signer))
+        by_pubkey[identity[0]] = identity[1]
+    required = message.account_keys[:message.header.num_required_signatures]
+    try:
+        secrets = tuple(by_pubkey[pubkey] for pubkey in required)
+    except KeyError as e:
+        raise ValueError(f"Missing signer {e.args[0]}") from None
+    return to_bytes_versioned(message), secrets
+
+
+class SigningService:
+    """
+    Signs batches of transaction messages on a worker pool.
+
+    Each message is serialized once; workers sign those bytes and assemble
+    the wire transaction (signature count, signatures, message) directly,
+    so no VersionedTransaction is built or re-serialized along the way.
+
+    ed25519 signing in solders holds the GIL, so only a process pool signs
+    in parallel; a thread pool still keeps signing off the event loop.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        use_processes: bool = True,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ):
+        """
+        Args:
+            max_workers (int, optional): Pool size; defaults to the CPU count
+            use_processes (bool): Sign in worker processes rather than threads
+            chunk_size (int): Messages per pool task
+        """
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.use_processes = use_processes
+        self.chunk_size = chunk_size
+        self._executor: Optional[Executor] = None
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            pool = ProcessPoolExecutor if self.use_processes else ThreadPoolExecutor
+            self._executor = pool(max_workers=self.max_workers)
+        return self._executor
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    @staticmethod
+    def _prepare_all(batch: Iterable[Tuple[AnyMessage, Sequence[Keypair]]]) -> List[PreparedMessage]:
+        identities: Dict[int, Tuple[Pubkey, bytes]] = {}
+        return [prepare(message, signers, identities) for message, signers in batch]
+
+    def _chunks(self, prepared: List[PreparedMessage]) -> List[List[PreparedMessage]]:
+        # Spread small batches over every worker instead of one full-size chunk
+        size = max(1, min(self.chunk_size, -(-len(prepared) // self.max_workers)))
+        return [prepared[i:i + size] for i in range(0, len(prepared), size)]
+
+    async def sign_batch(self, batch: Iterable[Tuple[AnyMessage, Sequence[Keypair]]]) -> List[bytes]:
+        """
+        Sign many messages, each with its own signer set.
+
+        Args:
+            batch (Iterable[Tuple[MessageV0 | Message, Sequence[Keypair]]]):
+                (message, signers) pairs
+
+        Returns:
+            List[bytes]: Signed wire transactions, in input order, ready for sendTransaction
+
+        Raises:
+            ValueError: If a message is missing one of its required signers
+        """
+        prepared = self._prepare_all(batch)
+        if not prepared:
+            return []
+        loop = asyncio.get_running_loop()
+        results = await asyncio.gather(*(loop.run_in_executor(self.executor, _sign_chunk, chunk)
+                                         for chunk in self._chunks(prepared)))
+        return [transaction for chunk in results for transaction in chunk]
+
+    def sign_batch_sync(self, batch: Iterable[Tuple[AnyMessage, Sequence[Keypair]]]) -> List[bytes]:
+        """Blocking version of sign_batch for callers without an event loop."""
+        prepared = self._prepare_all(batch)
+        results = self.executor.map(_sign_chunk, self._chunks(prepared))
+        return [transaction for chunk in results for transaction in chunk]
+
+
+_shared_service: Optional[SigningService] = None
+
+
+def get_signing_service() -> SigningService:
+    """Get the process-wide signing service (its pool is started on first use)."""
+    global _shared_service
+    if _shared_service is None:
+        _shared_service = SigningService()
+    return _shared_service
@@ -0,0 +1,108 @@
+import binascii
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Sequence
+
+from solders.instruction import AccountMeta, Instruction
+from solders.pubkey import Pubkey
+
+# Routes keep reusing the same programs, mints, pools and token accounts
+PUBKEY_CACHE_SIZE = 65_536
+ACCOUNT_META_CACHE_SIZE = 65_536
+
+# Order the instructions go into the transaction; otherInstructions (e.g.
+# tips) are left for the caller to place
+INSTRUCTION_FIELDS = (
+    "computeBudgetInstructions",
+    "setupInstructions",
+    "tokenLedgerInstruction",
+    "swapInstruction",
+    "cleanupInstruction",
+)
+
+
+@lru_cache(maxsize=PUBKEY_CACHE_SIZE)
+def intern_pubkey(address: str) -> Pubkey:
+    """Pubkey.from_string, decoded once per address for the life of the process."""
+    return Pubkey.from_string(address)
+
+
+@lru_cache(maxsize=ACCOUNT_META_CACHE_SIZE)
+def _account_meta(address: str, is_signer: bool, is_writable: bool) -> AccountMeta:
+    # AccountMeta is immutable, so one instance can be shared by every instruction
+    return AccountMeta(intern_pubkey(address), is_signer, is_writable)
+
+
+def decode_base64_many(encoded: Sequence[str]) -> List[bytes]:
+    """
+    Decode many base64 strings with as few decoder calls as possible.
+
+    Unpadded strings decode independently of their neighbours, so they are
+    joined and decoded in one call and split back up; padded ones (which
+    can't be concatenated) are decoded one at a time.
+    """
+    decoded: List[bytes] = [b""] * len(encoded)
+    joined: List[str] = []
+    positions: List[int] = []
+    for position, text in enumerate(encoded):
+        if len(text) % 4 == 0 and not text.endswith("="):
+            joined.append(text)
+            positions.append(position)
+        else:
+            decoded[position] = binascii.a2b_base64(text)
+    if joined:
+        blob = binascii.a2b_base64("".join(joined))
+        offset = 0
+        for position, text in zip(positions, joined):
+            size = len(text) // 4 * 3
+            decoded[position] = blob[offset:offset + size]
+            offset += size
+    return decoded
+
+
+def parse_instructions(entries: Iterable[Dict[str, Any]]) -> List[Instruction]:
+    """
+    Build Instructions from Jupiter's JSON instruction objects.
+
+    Args:
+        entries (Iterable[dict]): Objects with programId, accounts and base64 data
+
+    Returns:
+        List[Instruction]: One Instruction per entry, in order
+    """
+    entries = list(entries)
+    data = decode_base64_many([entry["data"] for entry in entries])
+    return [
+        Instruction(
+            intern_pubkey(entry["programId"]),
+            payload,
+            [_account_meta(account["pubkey"], account["isSigner"], account["isWritable"])
+             for account in entry.get("accounts", ())],
+        )
+        for entry, payload in zip(entries, data)
+    ]
+
+
+def parse_swap_instructions(response: Dict[str, Any]) -> List[Instruction]:
+    """
+    Build the full instruction list from a /swap-instructions response in one pass.
+
+    Args:
+        response (dict): The /swap-instructions response
+
+    Returns:
+        List[Instruction]: Compute budget, setup, token ledger, swap and
+        cleanup instructions, in transaction order, skipping absent ones
+    """
+    entries = []
+    for field in INSTRUCTION_FIELDS:
+        value = response.get(field)
+        if isinstance(value, list):
+            entries.extend(value)
+        elif value:
+            entries.append(value)
+    return parse_instructions(entries)
+
+
+def lookup_table_addresses(response: Dict[str, Any]) -> List[Pubkey]:
+    """The response's addressLookupTableAddresses as (interned) Pubkeys."""
+    return [intern_pubkey(address) for address in response.get("addressLookupTableAddresses", ())]
@@ -0,0 +1,289 @@
+import asyncio
+import binascii
+import os
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional
+
+import httpx
+from dotenv import load_dotenv
+from solders.keypair import Keypair
+
+from broadcaster import BroadcastResult, get_broadcaster, run_and_close
+from config import JUPITER_API_URL
+from latency_stats import summarize_ms
+from quote_cache import fetch_quote
+from quote_engine import build_quote_grid
+from wire_transaction import WireTransaction
+
+DEFAULT_QUEUE_SIZE = 16
+DEFAULT_SWAP_TIMEOUT = 10.0  # seconds
+# Workers per stage; network-bound stages get more than the CPU-bound sign step,
+# and send the most, since each send worker is held until its swap confirms
+DEFAULT_STAGE_CONCURRENCY = {"quote": 4, "build": 4, "sign": 1, "send": 16}
+
+# Stages take a job, fill in their part of it and raise on failure
+StageHandler = Callable[["SwapJob"], Awaitable[None]]
+
+_DONE = object()
+
+
+class SwapJob:
+    """One swap moving through the pipeline, with what each stage produced."""
+
+    def __init__(self, params: Dict[str, Any]):
+        self.params = params
+        self.quote: Optional[dict] = None
+        self.swap_transaction: Optional[bytes] = None
+        self.last_valid_block_height: Optional[int] = None
+        self.signed_transaction: Optional[memoryview] = None
+        self.signature: Optional[str] = None
+        self.broadcast: Optional[BroadcastResult] = None
+        self.error: Optional[str] = None
+        self.failed_stage: Optional[str] = None
+        self.timings: Dict[str, float] = {}
+        self.enqueued_at = time.perf_counter()
+
+
+class StageMetrics:
+    """Per-stage counters plus service-time and queue-wait samples (seconds)."""
+
+    def __init__(self, name: str, concurrency: int):
+        self.name = name
+        self.concurrency = concurrency
+        self.processed = 0
+        self.errors = 0
+        self.service_times: List[float] = []
+        self.queue_waits: List[float] = []
+
+    def summary(self) -> Dict[str, float]:
+        waits = summarize_ms(self.queue_waits)
+        return {
+            "processed": self.processed,
+            "errors": self.errors,
+            **summarize_ms(self.service_times),
+            "wait_p50_ms": waits["p50_ms"],
+            "wait_p99_ms": waits["p99_ms"],
+        }
+
+
+class StagedPipeline:
+    """
+    Runs jobs through a fixed sequence of async stages connected by bounded
+    queues, each stage with its own pool of workers.
+
+    While one job is in a late stage, later jobs are already being worked on
+    by the earlier ones. A full queue blocks the stage feeding it, so a slow
+    stage throttles everything upstream instead of letting work pile up. A
+    job that fails skips its remaining stages and comes out with `error` set.
+    """
+
+    def __init__(self, stages: List[tuple], queue_size: int = DEFAULT_QUEUE_SIZE):
+        """
+        Args:
+            stages (List[Tuple[str, StageHandler, int]]): (name, handler, concurrency)
+                for each stage, in order
+            queue_size (int): Capacity of each queue between stages
+        """
+        self.stages = stages
+        self.queue_size = queue_size
+        self.metrics = {name: StageMetrics(name, concurrency) for name, _, concurrency in stages}
+
+    async def _worker(self, name: str, handler: StageHandler, inbox: asyncio.Queue, outbox: asyncio.Queue) -> None:
+        metrics = self.metrics[name]
+        while True:
+            job = await inbox.get()
+            if job is _DONE:
+                return
+            if job.error is None:
+                started = time.perf_counter()
+                metrics.queue_waits.append(started - job.enqueued_at)
+                try:
+                    await handler(job)
+                except Exception as e:
+                    job.error = str(e) or type(e).__name__
+                    job.failed_stage = name
+                    metrics.errors += 1
+                elapsed = time.perf_counter() - started
+                job.timings[name] = elapsed
+                metrics.service_times.append(elapsed)
+                metrics.processed += 1
+            job.enqueued_at = time.perf_counter()
+            await outbox.put(job)
+
+    async def _run_stage(self, name: str, handler: StageHandler, concurrency: int,
+                         inbox: asyncio.Queue, outbox: asyncio.Queue, downstream_workers: int) -> None:
+        await asyncio.gather(*(self._worker(name, handler, inbox, outbox) for _ in range(concurrency)))
+        # Every job of this stage is through; tell each downstream worker to finish
+        for _ in range(downstream_workers):
+            await outbox.put(_DONE)
+
+    async def _feed(self, jobs: Iterable[SwapJob], inbox: asyncio.Queue, workers: int) -> None:
+        for job in jobs:
+            job.enqueued_at = time.perf_counter()
+            await inbox.put(job)
+        for _ in range(workers):
+            await inbox.put(_DONE)
+
+    async def run(self, jobs: Iterable[SwapJob]) -> AsyncIterator[SwapJob]:
+        """
+        Push `jobs` through every stage.
+
+        Args:
+            jobs (Iterable[SwapJob]): Jobs to run; consumed lazily as the first queue drains
+
+        Yields:
+            SwapJob: Each job once it has passed the last stage or failed, in completion order
+        """
+        queues = [asyncio.Queue(self.queue_size) for _ in range(len(self.stages) + 1)]
+        downstream = [concurrency for _, _, concurrency in self.stages[1:]] + [1]
+        tasks = [asyncio.create_task(self._feed(jobs, queues[0], self.stages[0][2]))]
+        for index, (name, handler, concurrency) in enumerate(self.stages):
+            tasks.append(asyncio.create_task(self._run_stage(
+                name, handler, concurrency, queues[index], queues[index + 1], downstream[index])))
+
+        try:
+            while (job := await queues[-1].get()) is not _DONE:
+                yield job
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def report(self) -> Dict[str, Dict[str, float]]:
+        """Metrics summary per stage, in stage order."""
+        return {name: self.metrics[name].summary() for name, _, _ in self.stages}
+
+
+class SwapPipeline(StagedPipeline):
+    """
+    Quote → swap build → sign → send for many swaps at once, from one wallet.
+
+    Builds the same transactions as jupiter_swap.main, with the stages
+    overlapped across swaps instead of run back to back. Like it, the send
+    stage broadcasts each swap until it confirms or its blockhash expires.
+    """
+
+    def __init__(
+        self,
+        wallet: Keypair,
+        swap_options: Optional[Dict[str, Any]] = None,
+        concurrency: Optional[Dict[str, int]] = None,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        base_url: str = JUPITER_API_URL,
+        timeout: float = DEFAULT_SWAP_TIMEOUT,
+    ):
+        """
+        Args:
+            wallet (Keypair): Signs and pays for every swap
+            swap_options (dict, optional): Extra /swap payload fields
+                (e.g. prioritizationFeeLamports)
+            concurrency (Dict[str, int], optional): Workers per stage, overriding
+                DEFAULT_STAGE_CONCURRENCY for the stages given
+            queue_size (int): Capacity of each queue between stages
+            base_url (str): Jupiter swap API base URL
+            timeout (float): Timeout for /swap requests in seconds
+        """
+        self.wallet = wallet
+        self._signers, self._pubkeys = [wallet], [wallet.pubkey()]
+        self.swap_options = swap_options or {}
+        self.swap_url = f"{base_url}/swap"
+        workers = {**DEFAULT_STAGE_CONCURRENCY, **(concurrency or {})}
+        self._http = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=workers["build"], max_keepalive_connections=workers["build"]),
+            headers={"Content-Type": "application/json"},
+            timeout=timeout,
+        )
+        super().__init__([
+            ("quote", self._quote, workers["quote"]),
+            ("build", self._build, workers["build"]),
+            ("sign", self._sign, workers["sign"]),
+            ("send", self._send, workers["send"]),
+        ], queue_size)
+
+    async def __aenter__(self) -> "SwapPipeline":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        await self._http.aclose()
+
+    async def _quote(self, job: SwapJob) -> None:
+        job.quote = await fetch_quote(job.params)
+
+    async def _build(self, job: SwapJob) -> None:
+        payload = {
+            "quoteResponse": job.quote,
+            "userPublicKey": str(self.wallet.pubkey()),
+            **self.swap_options,
+        }
+        response = (await self._http.post(self.swap_url, json=payload)).json()
+        if "swapTransaction" not in response:
+            raise RuntimeError(f"Swap build failed: {response.get('error', response)}")
+        job.swap_transaction = binascii.a2b_base64(response["swapTransaction"])
+        job.last_valid_block_height = response["lastValidBlockHeight"]
+
+    async def _sign(self, job: SwapJob) -> None:
+        # Each job keeps its own buffer: it's sent later, while the next job is being signed
+        job.signed_transaction = WireTransaction().load(job.swap_transaction).sign(self._signers, self._pubkeys).wire
+
+    async def _send(self, job: SwapJob) -> None:
+        # Send to every broadcast endpoint, re-sending until it confirms or the blockhash expires
+        job.broadcast = await get_broadcaster().broadcast(job.signed_transaction, job.last_valid_block_height)
+        if not job.broadcast.landed:
+            if job.broadcast.expired:
+                raise RuntimeError(f"Transaction {job.broadcast.signature} expired before confirming")
+            raise RuntimeError(f"Transaction {job.broadcast.signature} failed: {job.broadcast.status['err']}")
+        job.signature = job.broadcast.signature
+
+    async def execute(self, quote_params: Iterable[Dict[str, Any]]) -> AsyncIterator[SwapJob]:
+        """
+        Run one swap per quote parameter set.
+
+        Args:
+            quote_params (Iterable[Dict[str, Any]]): Query parameters for /quote,
+                e.g. from build_quote_grid
+
+        Yields:
+            SwapJob: Each finished swap; `signature` is set on success, `error` otherwise
+        """
+        async for job in self.run(SwapJob(params) for params in quote_params):
+            yield job
+
+
+async def main():
+    # Load environment variables
+    load_dotenv()
+    wallet = Keypair.from_base58_string(os.getenv("PRIVATE_KEY"))
+
+    grid = build_quote_grid(
+        ["So11111111111111111111111111111111111111112"],  # SOL
+        ["EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v",  # USDC
+         "Dfh5DzRgSvvCFDoYc2ciTkMrbDfRKybA4SoFbPmApump"],  # Pipin
+        [10000, 20000, 50000],  # lamports
+        [50],
+        restrictIntermediateTokens="false",
+        platformFeeBps=20,
+    )
+    swap_options = {
+        "prioritizationFeeLamports": {
+            "priorityLevelWithMaxLamports": {"maxLamports": 5000, "global": False, "priorityLevel": "veryHigh"}
+        }
+    }
+
+    async with SwapPipeline(wallet, swap_options) as pipeline:
+        async for job in pipeline.execute(grid):
+            if job.signature:
+                print(f"✅ {job.params['outputMint']} x {job.params['amount']}: {job.signature}")
+            else:
+                print(f"❌ {job.params['outputMint']} x {job.params['amount']} failed at {job.failed_stage}: {job.error}")
+
+        print(f"\n{'stage':<8}{'workers':>8}{'done':>6}{'errors':>8}{'p50 ms':>9}{'p99 ms':>9}{'wait p50':>10}{'wait p99':>10}")
+        for name, stats in pipeline.report().items():
+            print(f"{name:<8}{pipeline.metrics[name].concurrency:>8}{stats['processed']:>6}{stats['errors']:>8}"
+                  f"{stats['p50_ms']:>9.1f}{stats['p99_ms']:>9.1f}{stats['wait_p50_ms']:>10.1f}{stats['wait_p99_ms']:>10.1f}")
+
+
+if __name__ == "__main__":
+    run_and_close(main())
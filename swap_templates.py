@@ -0,0 +1,331 @@
+import struct
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Sequence
+
+from solders.address_lookup_table_account import AddressLookupTableAccount
+from solders.compute_budget import ID as COMPUTE_BUDGET_PROGRAM_ID, set_compute_unit_limit, set_compute_unit_price
+from solders.hash import Hash
+from solders.instruction import Instruction
+from solders.message import MessageV0, to_bytes_versioned
+from solders.pubkey import Pubkey
+from solders.system_program import ID as SYSTEM_PROGRAM_ID
+
+from compute_units import MAX_COMPUTE_UNIT_LIMIT
+from priority_fees import fee_accounts
+from swap_instructions import parse_instructions, parse_swap_instructions
+from wire_transaction import (
+    MESSAGE_HEADER_LENGTH,
+    PUBKEY_LENGTH,
+    SIGNATURE_LENGTH,
+    decode_length,
+    encode_length,
+)
+
+DEFAULT_MAX_TEMPLATES = 256
+# Recompile now and then so priority fees and lookup tables don't go stale
+DEFAULT_MAX_AGE = 60.0  # seconds
+# Jupiter's route instructions end with in_amount, quoted_out_amount,
+# slippage_bps and platform_fee_bps; only the two amounts change per swap
+ROUTE_ARGS = struct.Struct("<QQHB")
+ROUTE_AMOUNTS = struct.Struct("<QQ")
+BLOCKHASH_LENGTH = 32
+# ComputeBudgetInstruction::SetComputeUnitLimit (u32 units) and
+# SetComputeUnitPrice (u64 micro-lamports)
+SET_COMPUTE_UNIT_LIMIT = 2
+SET_COMPUTE_UNIT_PRICE = 3
+COMPUTE_UNIT_LIMIT = struct.Struct("<I")
+COMPUTE_UNIT_PRICE = struct.Struct("<Q")
+# Without a SetComputeUnitLimit the runtime allows this much per instruction
+# (other than compute budget ones), up to MAX_COMPUTE_UNIT_LIMIT
+DEFAULT_INSTRUCTION_COMPUTE_UNIT_LIMIT = 200_000
+# SystemInstruction::Transfer (u32 discriminator, u64 lamports); wrapping SOL
+# funds the wSOL account with the swap's input amount this way
+SYSTEM_TRANSFER = 2
+SYSTEM_TRANSFER_ARGS = struct.Struct("<IQ")
+AMOUNT = struct.Struct("<Q")
+
+
+def requested_compute_unit_limit(instructions: Sequence[Instruction]) -> int:
+    """
+    The compute unit limit a transaction of `instructions` runs with.
+
+    Returns:
+        int: Its SetComputeUnitLimit, or the runtime default if it has none
+    """
+    budgeted = 0
+    for instruction in instructions:
+        if instruction.program_id == COMPUTE_BUDGET_PROGRAM_ID:
+            data = bytes(instruction.data)
+            if data[:1] == bytes([SET_COMPUTE_UNIT_LIMIT]) and len(data) == 1 + COMPUTE_UNIT_LIMIT.size:
+                return COMPUTE_UNIT_LIMIT.unpack_from(data, 1)[0]
+            budgeted += 1
+    return min((len(instructions) - budgeted) * DEFAULT_INSTRUCTION_COMPUTE_UNIT_LIMIT, MAX_COMPUTE_UNIT_LIMIT)
+
+
+def route_key(
+    quote: Dict[str, Any],
+    user: Pubkey,
+    payer: Optional[Pubkey] = None,
+    fee_account: Optional[str] = None,
+) -> Hashable:
+    """
+    Everything besides the amounts that shapes a swap's compiled message.
+
+    Two quotes with the same key produce the same accounts and instructions,
+    so one compiled message serves both once its amounts are patched.
+    """
+    steps = tuple(
+        (info["ammKey"], info["inputMint"], info["outputMint"], step.get("percent"))
+        for step in quote.get("routePlan", ())
+        for info in (step["swapInfo"],)
+    )
+    return (
+        quote["inputMint"],
+        quote["outputMint"],
+        quote.get("swapMode", "ExactIn"),
+        int(quote.get("slippageBps", 0)),
+        (quote.get("platformFee") or {}).get("feeBps", 0),
+        str(user),
+        str(payer or user),
+        fee_account,
+        steps,
+    )
+
+
+class SwapTemplate:
+    """
+    An unsigned swap transaction compiled once and patched for each swap.
+
+    Holds the wire bytes (with empty signature slots) plus the offsets of
+    the recent blockhash, the route instruction's amounts, the lamports of
+    any SOL wrap transfer and the compute unit price and limit, so a new
+    quote costs a few in-place writes instead of a /swap-instructions call
+    and a MessageV0.try_compile.
+
+    A template is only reusable if every byte that depends on the quote's
+    amounts is one of those: a setup or cleanup instruction carrying the
+    amounts in any other form keeps it tied to the compiled quote.
+    """
+
+    def __init__(
+        self,
+        message: MessageV0,
+        swap_index: int,
+        quote: Dict[str, Any],
+        writable_accounts: Sequence[Pubkey] = (),
+    ):
+        self.fee_accounts = list(writable_accounts)
+        signature_count = message.header.num_required_signatures
+        signatures = encode_length(signature_count) + bytes(signature_count * SIGNATURE_LENGTH)
+        self._wire = bytearray(signatures + to_bytes_versioned(message))
+        self.compiled_at = time.monotonic()
+        self.uses = 0
+
+        # Skip the version prefix and header to the account keys, then walk
+        # the compiled instructions for the swap's data and the price's
+        offset = len(signatures) + 1 + MESSAGE_HEADER_LENGTH
+        key_count, offset = decode_length(self._wire, offset)
+        self.blockhash_offset = offset + key_count * PUBKEY_LENGTH
+        instruction_count, offset = decode_length(self._wire, self.blockhash_offset + BLOCKHASH_LENGTH)
+        if not 0 <= swap_index < instruction_count:
+            raise ValueError(f"Swap instruction {swap_index} out of range ({instruction_count} instructions)")
+        keys = message.account_keys
+        self.price_offset: Optional[int] = None
+        self.limit_offset: Optional[int] = None
+        in_amount, out_amount = int(quote["inAmount"]), int(quote["outAmount"])
+        amount_patterns = (AMOUNT.pack(in_amount), AMOUNT.pack(out_amount))
+        # Offsets of setup transfers that move exactly in_amount (wrapping SOL)
+        self.wrap_offsets: List[int] = []
+        amount_dependent = False
+        budgeted = 0
+        for index in range(instruction_count):
+            program = keys[self._wire[offset]]
+            account_count, offset = decode_length(self._wire, offset + 1)
+            data_length, offset = decode_length(self._wire, offset + account_count)
+            data = self._wire[offset:offset + data_length]
+            budgeted += program == COMPUTE_BUDGET_PROGRAM_ID
+            if program == COMPUTE_BUDGET_PROGRAM_ID and data_length:
+                budget_ix = (data[0], data_length - 1)
+                if budget_ix == (SET_COMPUTE_UNIT_PRICE, COMPUTE_UNIT_PRICE.size):
+                    self.price_offset = offset + 1
+                elif budget_ix == (SET_COMPUTE_UNIT_LIMIT, COMPUTE_UNIT_LIMIT.size):
+                    self.limit_offset = offset + 1
+            elif index == swap_index:
+                swap_end, swap_length = offset + data_length, data_length
+            elif program == SYSTEM_PROGRAM_ID and data_length == SYSTEM_TRANSFER_ARGS.size \
+                    and SYSTEM_TRANSFER_ARGS.unpack(data)[0] == SYSTEM_TRANSFER:
+                # A transfer of anything but the input amount may still be derived from it
+                if SYSTEM_TRANSFER_ARGS.unpack(data)[1] == in_amount:
+                    self.wrap_offsets.append(offset + SYSTEM_TRANSFER_ARGS.size - AMOUNT.size)
+                else:
+                    amount_dependent = True
+            elif any(pattern in data for pattern in amount_patterns):
+                amount_dependent = True
+            offset += data_length
+        self._default_limit = min(
+            (instruction_count - budgeted) * DEFAULT_INSTRUCTION_COMPUTE_UNIT_LIMIT, MAX_COMPUTE_UNIT_LIMIT
+        )
+
+        # Only patch bytes we can prove are the quote's amounts; anything else
+        # (e.g. an ExactOut route) keeps its compiled amounts
+        self.amounts_offset: Optional[int] = None
+        if swap_length >= ROUTE_ARGS.size and not amount_dependent:
+            amounts_offset = swap_end - ROUTE_ARGS.size
+            amounts = ROUTE_AMOUNTS.unpack_from(self._wire, amounts_offset)
+            if amounts == (in_amount, out_amount):
+                self.amounts_offset = amounts_offset
+
+    @property
+    def reusable(self) -> bool:
+        """Whether other quotes on the route can be patched in."""
+        return self.amounts_offset is not None
+
+    @property
+    def compute_unit_limit(self) -> int:
+        """The limit the next render runs with: the last one set, or the runtime default if there is none."""
+        if self.limit_offset is not None:
+            return COMPUTE_UNIT_LIMIT.unpack_from(self._wire, self.limit_offset)[0]
+        return self._default_limit
+
+    def render(
+        self,
+        quote: Dict[str, Any],
+        recent_blockhash: Hash,
+        compute_unit_price: Optional[int] = None,
+        compute_unit_limit: Optional[int] = None,
+    ) -> bytes:
+        """
+        Unsigned wire bytes for a quote on this template's route.
+
+        Args:
+            quote (dict): A quote whose route_key matches the template's (the
+                compiled quote itself if the template isn't reusable)
+            recent_blockhash (Hash): Blockhash to sign against
+            compute_unit_price (int, optional): Micro-lamports per compute
+                unit; keeps the last price set if not given
+            compute_unit_limit (int, optional): Compute unit limit; keeps the
+                last limit set if not given
+
+        Returns:
+            bytes: The serialized transaction, ready for WireTransaction.load
+
+        Raises:
+            ValueError: If a price or limit is given but the template has no
+                instruction to set it in
+        """
+        if self.amounts_offset is not None:
+            ROUTE_AMOUNTS.pack_into(self._wire, self.amounts_offset,
+                                    int(quote["inAmount"]), int(quote["outAmount"]))
+            for wrap_offset in self.wrap_offsets:
+                AMOUNT.pack_into(self._wire, wrap_offset, int(quote["inAmount"]))
+        if compute_unit_price is not None:
+            if self.price_offset is None:
+                raise ValueError("Template has no compute unit price to set")
+            COMPUTE_UNIT_PRICE.pack_into(self._wire, self.price_offset, compute_unit_price)
+        if compute_unit_limit is not None:
+            if self.limit_offset is None:
+                raise ValueError("Template has no compute unit limit to set")
+            COMPUTE_UNIT_LIMIT.pack_into(self._wire, self.limit_offset, compute_unit_limit)
+        self._wire[self.blockhash_offset:self.blockhash_offset + BLOCKHASH_LENGTH] = bytes(recent_blockhash)
+        self.uses += 1
+        return bytes(self._wire)
+
+
+def _set_compute_budget(instructions: List[Instruction], budget_ix: Instruction) -> None:
+    # Replace the instruction of the same kind, or add it after the other budget instructions
+    budget = [i for i, ix in enumerate(instructions) if ix.program_id == COMPUTE_BUDGET_PROGRAM_ID]
+    same_kind = [i for i in budget if instructions[i].data[:1] == budget_ix.data[:1]]
+    if same_kind:
+        instructions[same_kind[0]] = budget_ix
+    else:
+        instructions.insert(budget[-1] + 1 if budget else 0, budget_ix)
+
+
+class SwapTemplateCache:
+    """
+    Compiled swap templates by route_key, least recently used evicted first.
+
+    A template is dropped after `max_age` seconds, so the next swap on its
+    route goes back to /swap-instructions for fresh fees and tables.
+    """
+
+    def __init__(self, max_templates: int = DEFAULT_MAX_TEMPLATES, max_age: float = DEFAULT_MAX_AGE):
+        self.max_templates = max_templates
+        self.max_age = max_age
+        self._templates: "OrderedDict[Hashable, SwapTemplate]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.rejected = 0
+
+    def get(self, key: Hashable) -> Optional[SwapTemplate]:
+        template = self._templates.get(key)
+        if template is not None and time.monotonic() - template.compiled_at > self.max_age:
+            del self._templates[key]
+            template = None
+        if template is None:
+            self.misses += 1
+            return None
+        self._templates.move_to_end(key)
+        self.hits += 1
+        return template
+
+    def compile(
+        self,
+        key: Hashable,
+        quote: Dict[str, Any],
+        instructions_response: Dict[str, Any],
+        payer: Pubkey,
+        lookup_tables: Sequence[AddressLookupTableAccount],
+        recent_blockhash: Hash,
+        compute_unit_price: Optional[int] = None,
+        compute_unit_limit: Optional[int] = None,
+    ) -> SwapTemplate:
+        """
+        Compile a /swap-instructions response and keep it for the route.
+
+        Args:
+            key: route_key of the quote
+            quote (dict): The quote the instructions were built from
+            instructions_response (dict): The /swap-instructions response
+            payer (Pubkey): Fee payer
+            lookup_tables (Sequence[AddressLookupTableAccount]): The response's tables
+            recent_blockhash (Hash): Blockhash to compile with
+            compute_unit_price (int, optional): Price to use in place of
+                Jupiter's (or in addition, if the response has none), so
+                render() can patch it later
+            compute_unit_limit (int, optional): Likewise for the limit
+
+        Returns:
+            SwapTemplate: The template; it's only kept if it's reusable
+        """
+        instructions = parse_swap_instructions(instructions_response)
+        if compute_unit_limit is not None:
+            _set_compute_budget(instructions, set_compute_unit_limit(compute_unit_limit))
+        if compute_unit_price is not None:
+            _set_compute_budget(instructions, set_compute_unit_price(compute_unit_price))
+        message = MessageV0.try_compile(payer, instructions, list(lookup_tables), recent_blockhash)
+        swap = parse_instructions([instructions_response["swapInstruction"]])[0]
+        template = SwapTemplate(message, instructions.index(swap), quote, fee_accounts(swap))
+        if not template.reusable:
+            self.rejected += 1
+            return template
+        self._templates[key] = template
+        self._templates.move_to_end(key)
+        while len(self._templates) > self.max_templates:
+            self._templates.popitem(last=False)
+        return template
+
+    def stats(self) -> Dict[str, int]:
+        return {"templates": len(self._templates), "hits": self.hits, "misses": self.misses, "rejected": self.rejected}
+
+
+_shared_cache: Optional[SwapTemplateCache] = None
+
+
+def get_swap_template_cache() -> SwapTemplateCache:
+    """Get the process-wide swap template cache."""
+    global _shared_cache
+    if _shared_cache is None:
+        _shared_cache = SwapTemplateCache()
+    return _shared_cache
@@ -0,0 +1,30 @@
+import asyncio
+
+import quote_engine
+from broadcaster import EndpointStats, TransactionBroadcaster, run_and_close
+
+
+class FakeClient:
+    def __init__(self, result):
+        self.result = result
+
+    async def call(self, method, params):
+        assert method == "getSignatureStatuses"
+        return self.result
+
+
+def test_malformed_status_counts_as_not_seen():
+    broadcaster = TransactionBroadcaster(endpoints=["http://rpc.test"])
+    broadcaster._clients["http://rpc.test"] = FakeClient({"value": []})
+    stats = EndpointStats("http://rpc.test")
+    assert asyncio.run(broadcaster._status(stats, "sig", 0.0)) is None
+    assert stats.last_error is not None and stats.seen_latency is None
+
+
+def test_run_and_close_closes_the_quote_engine():
+    async def main():
+        return quote_engine.get_quote_engine()
+
+    engine = run_and_close(main())
+    assert engine._http.is_closed
+    assert quote_engine._shared_engine is None
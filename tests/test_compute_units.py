@@ -0,0 +1,53 @@
+import asyncio
+
+from solders.hash import Hash
+from solders.keypair import Keypair
+
+from compute_units import MAX_COMPUTE_UNIT_LIMIT, ComputeUnitSizer
+from local_http import JsonHttpServer
+from mock_server import MockChain
+from priority_fees import MICRO_LAMPORTS_PER_LAMPORT, PriorityFeeEstimator
+from rpc_client import AsyncRpcClient
+from swap_instructions import parse_swap_instructions
+from swap_templates import SwapTemplateCache, requested_compute_unit_limit, route_key
+
+SOL = "So11111111111111111111111111111111111111112"
+PIPIN = "Dfh5DzRgSvvCFDoYc2ciTkMrbDfRKybA4SoFbPmApump"
+HEAVY_ROUTE_UNITS = 900_000
+
+
+def test_price_is_capped_for_the_sized_limit():
+    chain, user = MockChain(seed=0, route_compute_units={(SOL, PIPIN): HEAVY_ROUTE_UNITS}), Keypair().pubkey()
+    server = JsonHttpServer(chain.handle)
+    url = server.start_in_thread()
+    quote = chain.jupiter_quote({"inputMint": SOL, "outputMint": PIPIN, "amount": "10000"})
+    response = chain.jupiter_swap_instructions({"quoteResponse": quote, "userPublicKey": str(user)})
+    # Jupiter asks for less than the route needs, so the limit only becomes known by simulating
+    requested = requested_compute_unit_limit(parse_swap_instructions(response))
+    assert requested < HEAVY_ROUTE_UNITS
+
+    async def run():
+        rpc = AsyncRpcClient(url)
+        try:
+            sizer = ComputeUnitSizer(rpc=rpc, enabled=True)
+            fees = PriorityFeeEstimator(rpc=rpc)
+            template = SwapTemplateCache().compile(
+                route_key(quote, user), quote, response, user, [chain._route_lookup_table(SOL, PIPIN)],
+                Hash.default(), compute_unit_limit=MAX_COMPUTE_UNIT_LIMIT,
+            )
+            before = await fees.compute_unit_price(template.fee_accounts, requested)
+            limit = await sizer.size(route_key(quote, user), template.render(quote, Hash.default()))
+            return fees, before, limit, fees.estimate(template.fee_accounts, limit)
+        finally:
+            await rpc.aclose()
+
+    try:
+        fees, before, limit, after = asyncio.run(run())
+    finally:
+        server.stop_thread()
+
+    budget = fees.max_lamports * MICRO_LAMPORTS_PER_LAMPORT
+    assert limit > HEAVY_ROUTE_UNITS
+    # The price capped for Jupiter's limit would overspend at the sized one
+    assert before * limit > budget
+    assert after * limit <= budget
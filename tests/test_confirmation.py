@@ -0,0 +1,150 @@
+import asyncio
+import json
+
+from confirmation import SignatureTracker
+
+
+class FakeWebsocket:
+    def __init__(self):
+        self.sent = []
+
+    async def send(self, raw: str) -> None:
+        self.sent.append(json.loads(raw))
+
+
+class FakeRpc:
+    def __init__(self):
+        self.statuses = {}
+
+    async def call(self, method, params):
+        assert method == "getSignatureStatuses"
+        return {"value": [self.statuses.get(signature) for signature in params[0]]}
+
+
+def tracker_with_websocket():
+    rpc = FakeRpc()
+    tracker = SignatureTracker(rpc=rpc, ws_endpoint=None, poll_interval=0.01, ws_poll_interval=0.01)
+    tracker._ws = FakeWebsocket()
+    return tracker, rpc
+
+
+async def subscribed(tracker, signature):
+    """Track a signature and answer its signatureSubscribe request."""
+    future = tracker.track(signature)
+    await asyncio.sleep(0)
+    request = tracker._ws.sent[-1]
+    assert request["method"] == "signatureSubscribe" and request["params"][0] == signature
+    tracker._on_ws_message({"jsonrpc": "2.0", "id": request["id"], "result": 100 + request["id"]})
+    return future, 100 + request["id"]
+
+
+def test_polled_signature_is_unsubscribed():
+    async def run():
+        tracker, rpc = tracker_with_websocket()
+        future, subscription = await subscribed(tracker, "sig")
+        rpc.statuses["sig"] = {"slot": 1, "err": None, "confirmationStatus": "confirmed"}
+        status = await asyncio.wait_for(future, 1)
+        await asyncio.sleep(0)
+        await tracker.stop()
+        return tracker, status, subscription
+
+    tracker, status, subscription = asyncio.run(run())
+    assert status["confirmationStatus"] == "confirmed"
+    assert tracker._ws.sent[-1]["method"] == "signatureUnsubscribe"
+    assert tracker._ws.sent[-1]["params"] == [subscription]
+    assert not tracker._subscriptions and not tracker._subscription_ids and not tracker._tasks
+
+
+def test_notified_signature_is_not_unsubscribed():
+    async def run():
+        tracker, _ = tracker_with_websocket()
+        future, subscription = await subscribed(tracker, "sig")
+        tracker._on_ws_message({
+            "jsonrpc": "2.0",
+            "method": "signatureNotification",
+            "params": {"subscription": subscription, "result": {"context": {"slot": 5}, "value": {"err": None}}},
+        })
+        status = await asyncio.wait_for(future, 1)
+        await asyncio.sleep(0)
+        await tracker.stop()
+        return tracker, status
+
+    tracker, status = asyncio.run(run())
+    assert status == {"slot": 5, "err": None, "confirmationStatus": "confirmed"}
+    # The node drops a signature subscription itself after notifying
+    assert [request["method"] for request in tracker._ws.sent] == ["signatureSubscribe"]
+    assert not tracker._subscriptions and not tracker._subscription_ids
+
+
+def test_abandoned_signature_is_unsubscribed():
+    async def run():
+        tracker, _ = tracker_with_websocket()
+        await subscribed(tracker, "sig")
+        tracker._acquire(("sig", "confirmed"))
+        tracker._release(("sig", "confirmed"))
+        await asyncio.sleep(0)
+        await tracker.stop()
+        return tracker
+
+    tracker = asyncio.run(run())
+    assert tracker._ws.sent[-1]["method"] == "signatureUnsubscribe"
+    assert not tracker._pending and not tracker._subscription_ids
+
+
+class FakeConnection(FakeWebsocket):
+    """websockets.connect stand-in that delivers `messages`, then stays open."""
+
+    def __init__(self, messages):
+        super().__init__()
+        self.messages = messages
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def __aiter__(self):
+        for message in self.messages:
+            yield message
+        await asyncio.Event().wait()
+
+
+def test_bad_message_does_not_stop_the_websocket(monkeypatch):
+    async def run():
+        tracker = SignatureTracker(rpc=FakeRpc(), ws_endpoint="ws://test", poll_interval=10, ws_poll_interval=10)
+        future = tracker.track("sig")
+        connection = FakeConnection([
+            "not json",
+            json.dumps({"jsonrpc": "2.0", "method": "signatureNotification", "params": {}}),
+            json.dumps({"jsonrpc": "2.0", "id": 1, "result": 7}),
+            json.dumps({"jsonrpc": "2.0", "method": "signatureNotification",
+                        "params": {"subscription": 7, "result": {"context": {"slot": 5}, "value": {"err": None}}}}),
+        ])
+        monkeypatch.setattr("confirmation.websockets.connect", lambda endpoint: connection)
+        status = await asyncio.wait_for(future, 1)
+        running = not tracker._ws_task.done()
+        await tracker.stop()
+        return status, running
+
+    status, running = asyncio.run(run())
+    assert status == {"slot": 5, "err": None, "confirmationStatus": "confirmed"}
+    assert running
+
+
+def test_dead_poller_is_restarted():
+    async def run():
+        tracker, rpc = tracker_with_websocket()
+        tracker.track("first")
+        poller = tracker._poller
+        poller.cancel()
+        await asyncio.sleep(0)
+        future = tracker.track("second")
+        restarted = tracker._poller is not poller
+        rpc.statuses["second"] = {"slot": 1, "err": None, "confirmationStatus": "confirmed"}
+        status = await asyncio.wait_for(future, 1)
+        await tracker.stop()
+        return restarted, status
+
+    restarted, status = asyncio.run(run())
+    assert restarted and status["slot"] == 1
@@ -0,0 +1,101 @@
+import asyncio
+import base64
+import struct
+
+from solders.hash import Hash
+from solders.instruction import AccountMeta, Instruction
+from solders.keypair import Keypair
+from solders.message import MessageV0
+from solders.null_signer import NullSigner
+from solders.pubkey import Pubkey
+from solders.transaction import VersionedTransaction
+
+from fee_relay import COMPUTE_BUDGET_PROGRAM_ID, DEFAULT_MAX_SIGNATURES, PREFLIGHT_FAILURE, FeePayerRelay
+from rpc_client import RpcError
+
+
+class FakeRpc:
+    def __init__(self, preflight_error=None):
+        self.preflight_error = preflight_error
+        self.sent = []
+        self.options = []
+
+    async def send_transaction(self, tx_bytes, **options):
+        self.options.append(options)
+        if self.preflight_error and not options.get("skipPreflight", True):
+            raise self.preflight_error
+        self.sent.append(bytes(tx_bytes))
+        return str(VersionedTransaction.from_bytes(bytes(tx_bytes)).signatures[0])
+
+
+def relay_body(payer, user, budget_data=(), signer=None, cosigners=()) -> dict:
+    message = MessageV0.try_compile(
+        payer.pubkey(),
+        [Instruction(COMPUTE_BUDGET_PROGRAM_ID, data, []) for data in budget_data]
+        + [Instruction(Pubkey.new_unique(), b"\x01",
+                       [AccountMeta(key.pubkey(), is_signer=True, is_writable=True) for key in (user, *cosigners)])],
+        [],
+        Hash.new_unique(),
+    )
+    tx = VersionedTransaction(message, [NullSigner(payer.pubkey()), signer or user, *cosigners])
+    return {"transaction": base64.b64encode(bytes(tx)).decode()}
+
+
+def handle(relay, body):
+    return asyncio.run(relay.handle("POST", "/relay", {}, body))
+
+
+def test_relays_and_cosigns():
+    payer, user, rpc = Keypair(), Keypair(), FakeRpc()
+    relay = FeePayerRelay(payer, rpc=rpc)
+    status, body = handle(relay, relay_body(payer, user, [b"\x02" + struct.pack("<I", 100_000)]))
+    assert status == 200
+    assert VersionedTransaction.from_bytes(rpc.sent[0]).verify_with_results() == [True, True]
+
+
+def test_malformed_compute_budget_is_a_bad_request():
+    payer, user, rpc = Keypair(), Keypair(), FakeRpc()
+    relay = FeePayerRelay(payer, rpc=rpc)
+    for data in [b"\x03\x01", b"\x02\x01\x00", b"\x03" + struct.pack("<Q", 1) + b"\x00"]:
+        status, body = handle(relay, relay_body(payer, user, [data]))
+        assert status == 400, body
+        assert "Malformed" in body["error"]
+    assert not rpc.sent
+
+
+def test_forged_requests_dont_spend_the_users_budget():
+    payer, user, rpc = Keypair(), Keypair(), FakeRpc()
+    relay = FeePayerRelay(payer, rpc=rpc, user_rate=0.001, user_burst=1)
+    # Someone naming `user` without its key is refused without touching its bucket
+    for _ in range(3):
+        status, _ = handle(relay, relay_body(payer, user, signer=NullSigner(user.pubkey())))
+        assert status == 403
+    assert handle(relay, relay_body(payer, user))[0] == 200
+    assert handle(relay, relay_body(payer, user))[0] == 429
+
+
+def test_sends_with_preflight():
+    payer, user, rpc = Keypair(), Keypair(), FakeRpc()
+    relay = FeePayerRelay(payer, rpc=rpc)
+    assert handle(relay, relay_body(payer, user))[0] == 200
+    assert rpc.options[0]["skipPreflight"] is False
+
+
+def test_failing_transactions_are_not_paid_for():
+    payer, user = Keypair(), Keypair()
+    rpc = FakeRpc(RpcError(PREFLIGHT_FAILURE, "Transaction simulation failed: Error processing Instruction 0"))
+    relay = FeePayerRelay(payer, rpc=rpc)
+    status, body = handle(relay, relay_body(payer, user))
+    assert status == 422 and "simulation" in body["error"]
+    assert not rpc.sent
+    assert relay.stats["rejected"] == 1 and relay.stats["send_failed"] == 0
+
+
+def test_signature_count_is_capped():
+    payer, user, rpc = Keypair(), Keypair(), FakeRpc()
+    relay = FeePayerRelay(payer, rpc=rpc)
+    allowed = [Keypair() for _ in range(DEFAULT_MAX_SIGNATURES - 2)]
+    assert handle(relay, relay_body(payer, user, cosigners=allowed))[0] == 200
+    status, body = handle(relay, relay_body(payer, user, cosigners=[*allowed, Keypair()]))
+    assert status == 403 and "signatures" in body["error"]
+    assert len(rpc.sent) == 1
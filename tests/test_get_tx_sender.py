@@ -0,0 +1,171 @@
+import hashlib
+import json
+
+import pytest
+from solders.signature import Signature
+
+import get_tx_sender
+from get_tx_sender import GET_TRANSACTION_BASE64_CONFIG, result_bytes, scan_sender
+from local_http import JsonHttpServer
+from mock_server import MockChain
+from transaction_cache import TransactionCache
+
+SIGNATURES = [str(Signature.from_bytes(hashlib.sha512(f"sender:{i}".encode()).digest())) for i in range(20)]
+
+
+@pytest.fixture
+def chain(monkeypatch):
+    chain = MockChain(seed=0)
+    server = JsonHttpServer(chain.handle)
+    monkeypatch.setattr(get_tx_sender, "HELIUS_RPC_ENDPOINT", server.start_in_thread())
+    monkeypatch.setattr(get_tx_sender, "get_transaction_cache", lambda: None)
+    yield chain
+    server.stop_thread()
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = TransactionCache(str(tmp_path / "cache.sqlite"))
+    monkeypatch.setattr(get_tx_sender, "get_transaction_cache", lambda: cache)
+    yield cache
+    cache.close()
+
+
+def test_byte_scan_matches_the_json_path(chain):
+    expected = get_tx_sender.get_transaction_senders(SIGNATURES)
+    assert all(not isinstance(sender, dict) for sender in expected.values())
+    assert {signature: get_tx_sender.get_transaction_sender(signature) for signature in SIGNATURES} == expected
+
+
+def test_scan_sender_without_a_transaction():
+    assert scan_sender(b'{"jsonrpc":"2.0","result":null,"id":1}') is None
+    assert scan_sender(b'{"jsonrpc":"2.0","error":{"code":-32602,"message":"bad"},"id":1}') is None
+
+
+@pytest.mark.parametrize("response", [
+    {"jsonrpc": "2.0", "result": {"slot": 5, "transaction": ["AA==", "base64"]}, "id": 1},
+    {"jsonrpc": "2.0", "id": 17, "result": {"slot": 5, "transaction": ["AA==", "base64"]}},
+    {"result": {"slot": 5, "transaction": ["AA==", "base64"]}, "id": 3, "jsonrpc": "2.0"},
+    {"result": {"slot": 5, "meta": {"logMessages": ['"result": {}, "id": 1}']}}, "id": 3},
+])
+@pytest.mark.parametrize("indent", [None, 2])
+def test_result_bytes_slices_the_result(response, indent):
+    body = json.dumps(response, indent=indent).encode("utf-8")
+    assert json.loads(bytes(result_bytes(body))) == response["result"]
+
+
+def test_fetched_result_is_cached_without_parsing(chain, cache, monkeypatch):
+    signature = SIGNATURES[0]
+
+    def not_allowed(*args, **kwargs):
+        raise AssertionError("not expected on this path")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(get_tx_sender.requests.Response, "json", not_allowed)
+        sender = get_tx_sender.get_transaction_sender(signature)
+    assert not sender.startswith("Error")
+    assert cache.get(signature, GET_TRANSACTION_BASE64_CONFIG) == chain.rpc_getTransaction(
+        signature, GET_TRANSACTION_BASE64_CONFIG
+    )
+
+    # Answered from the cache the second time
+    monkeypatch.setattr(get_tx_sender.requests, "post", not_allowed)
+    assert get_tx_sender.get_transaction_sender(signature) == sender
+
+
+class FakeResponse:
+    def __init__(self, body):
+        self.body = body
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.body
+
+
+class FakeSession:
+    """Answers each batch with answer(payload); records every payload it was sent."""
+
+    def __init__(self, answer):
+        self.answer = answer
+        self.payloads = []
+
+    def post(self, url, json):
+        self.payloads.append(json)
+        return FakeResponse(self.answer(json))
+
+
+def transaction(sender):
+    return {"transaction": {"message": {"accountKeys": [sender, "Other"]}}}
+
+
+def found(payload):
+    return [{"jsonrpc": "2.0", "id": request["id"], "result": transaction(f"sender-{request['params'][0]}")}
+            for request in payload]
+
+
+def senders(answer, signatures, **options):
+    session = FakeSession(answer)
+    results = get_tx_sender.get_transaction_senders(signatures, max_workers=1, session=session, **options)
+    return results, session.payloads
+
+
+@pytest.fixture(autouse=True)
+def no_cache(monkeypatch):
+    monkeypatch.setattr(get_tx_sender, "get_transaction_cache", lambda: None)
+
+
+def test_signatures_are_packed_into_batches():
+    signatures = ["a", "b", "c", "d", "e", "a"]
+    results, payloads = senders(found, signatures, batch_size=2)
+    assert results == {signature: f"sender-{signature}" for signature in "abcde"}
+    assert [[request["params"][0] for request in payload] for payload in payloads] == [["a", "b"], ["c", "d"], ["e"]]
+    assert all(request["method"] == "getTransaction" for payload in payloads for request in payload)
+
+
+def test_only_failed_entries_are_retried():
+    def answer(payload):
+        if len(payload) > 1:
+            body = found(payload)
+            body[1] = {"jsonrpc": "2.0", "id": payload[1]["id"], "error": {"code": -32005, "message": "Node is behind"}}
+            return body
+        return found(payload)
+
+    results, payloads = senders(answer, ["a", "b", "c"])
+    assert results == {"a": "sender-a", "b": "sender-b", "c": "sender-c"}
+    assert [[request["params"][0] for request in payload] for payload in payloads] == [["a", "b", "c"], ["b"]]
+
+
+def test_errors_and_not_found_results_are_mapped():
+    def answer(payload):
+        by_signature = {request["params"][0]: request["id"] for request in payload}
+        body = []
+        if "found" in by_signature:
+            body.append({"jsonrpc": "2.0", "id": by_signature["found"], "result": transaction("Sender")})
+        if "missing" in by_signature:
+            body.append({"jsonrpc": "2.0", "id": by_signature["missing"], "result": None})
+        if "failing" in by_signature:
+            body.append({"jsonrpc": "2.0", "id": by_signature["failing"],
+                         "error": {"code": -32602, "message": "Invalid param"}})
+        # "garbled" is answered by an item that isn't an object
+        if "garbled" in by_signature:
+            body.append("oops")
+        return body
+
+    results, payloads = senders(answer, ["found", "missing", "failing", "garbled"], max_retries=1)
+    assert results == {
+        "found": "Sender",
+        "missing": {"code": None, "message": "Transaction not found"},
+        "failing": {"code": -32602, "message": "Invalid param"},
+        "garbled": {"code": -32603, "message": "Missing from batch response"},
+    }
+    # Not found is a final answer; errors and unmatched entries are retried
+    assert sorted(payload[0]["params"][0] for payload in payloads[1:]) == ["failing", "garbled"]
+
+
+def test_a_rejected_batch_fails_every_signature():
+    results, _ = senders(lambda payload: {"jsonrpc": "2.0", "id": None,
+                                          "error": {"code": -32600, "message": "Batch too large"}},
+                         ["a", "b"], max_retries=0)
+    assert results == {signature: {"code": -32600, "message": "Batch too large"} for signature in "ab"}
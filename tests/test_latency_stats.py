@@ -0,0 +1,34 @@
+import pytest
+
+from latency_stats import nearest_rank, percentile, summarize_ms
+
+
+@pytest.mark.parametrize(
+    "count, pct, index",
+    [
+        (6, 50, 2),
+        (10, 50, 4),
+        (100, 99, 98),
+        (100, 7, 6),
+        (100, 100, 99),
+        (1, 50, 0),
+        (10, 0, 0),
+        (3, 50, 1),
+    ],
+)
+def test_nearest_rank(count, pct, index):
+    assert nearest_rank(count, pct) == index
+
+
+def test_percentile_of_unsorted_samples():
+    samples = [6, 1, 5, 2, 4, 3]
+    assert percentile(samples, 50) == 3
+    assert percentile(samples, 99) == 6
+    assert percentile([], 50) == 0.0
+
+
+def test_summarize_ms():
+    summary = summarize_ms([0.001 * i for i in range(1, 101)])
+    assert summary["p50_ms"] == pytest.approx(50)
+    assert summary["p99_ms"] == pytest.approx(99)
+    assert summary["mean_ms"] == pytest.approx(50.5)
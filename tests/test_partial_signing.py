@@ -0,0 +1,103 @@
+import asyncio
+
+import pytest
+from solders.hash import Hash
+from solders.instruction import AccountMeta, Instruction
+from solders.keypair import Keypair
+from solders.message import MessageV0
+from solders.null_signer import NullSigner
+from solders.pubkey import Pubkey
+from solders.transaction import VersionedTransaction
+
+from partial_signing import PartialSignCoordinator, TransactionExpired
+
+
+def unsigned_transaction(fee_payer: Keypair, wallet: Keypair) -> bytes:
+    instruction = Instruction(
+        Pubkey.new_unique(), b"\x01", [AccountMeta(wallet.pubkey(), is_signer=True, is_writable=True)]
+    )
+    message = MessageV0.try_compile(fee_payer.pubkey(), [instruction], [], Hash.new_unique())
+    return bytes(VersionedTransaction(message, [NullSigner(fee_payer.pubkey()), NullSigner(wallet.pubkey())]))
+
+
+def assert_fully_signed(tx_bytes: bytes) -> None:
+    assert VersionedTransaction.from_bytes(tx_bytes).verify_with_results() == [True, True]
+
+
+def test_fee_payer_then_wallet():
+    payer, wallet = Keypair(), Keypair()
+    coordinator = PartialSignCoordinator()
+    key = coordinator.add(unsigned_transaction(payer, wallet), 100, [payer])
+    assert coordinator.missing_signers(key) == [wallet.pubkey()]
+
+    signed = coordinator.add_signature(key, wallet.pubkey(), wallet.sign_message(coordinator.message(key)))
+    assert_fully_signed(signed)
+    assert len(coordinator) == 0
+    with pytest.raises(KeyError):
+        coordinator.sign(key, wallet)
+
+
+def test_rejects_bad_signatures_and_strangers():
+    payer, wallet = Keypair(), Keypair()
+    coordinator = PartialSignCoordinator()
+    key = coordinator.add(unsigned_transaction(payer, wallet), 100, [payer])
+    with pytest.raises(ValueError):
+        coordinator.add_signature(key, wallet.pubkey(), wallet.sign_message(b"something else"))
+    stranger = Keypair()
+    with pytest.raises(ValueError):
+        coordinator.add_signature(key, stranger.pubkey(), stranger.sign_message(coordinator.message(key)))
+    assert coordinator.missing_signers(key) == [wallet.pubkey()]
+
+
+def test_signer_cannot_sign_twice():
+    payer, wallet = Keypair(), Keypair()
+    coordinator = PartialSignCoordinator()
+    key = coordinator.add(unsigned_transaction(payer, wallet), 100, [payer])
+    with pytest.raises(ValueError, match="already signed"):
+        coordinator.sign(key, payer)
+    assert_fully_signed(coordinator.sign(key, wallet))
+
+
+def test_rejects_transactions_complete_on_arrival():
+    payer, wallet = Keypair(), Keypair()
+    coordinator = PartialSignCoordinator()
+    with pytest.raises(ValueError, match="fully signed"):
+        coordinator.add(unsigned_transaction(payer, wallet), 100, [payer, wallet])
+    assert len(coordinator) == 0
+
+    signed = VersionedTransaction(VersionedTransaction.from_bytes(unsigned_transaction(payer, wallet)).message,
+                                  [payer, wallet])
+    with pytest.raises(ValueError, match="fully signed"):
+        coordinator.add(bytes(signed), 100)
+
+
+def test_presigned_slots_count_as_signed():
+    payer, wallet = Keypair(), Keypair()
+    first = PartialSignCoordinator()
+    key = first.add(unsigned_transaction(payer, wallet), 100, [payer])
+    presigned = bytes(first._pending[key].wire.wire)
+
+    coordinator = PartialSignCoordinator()
+    # The payer's slot is already filled, so applying it again is skipped
+    assert coordinator.add(presigned, 100, [payer]) == key
+    assert coordinator.missing_signers(key) == [wallet.pubkey()]
+    assert_fully_signed(coordinator.sign(key, wallet))
+
+
+def test_wait_and_expire():
+    async def run():
+        payer, wallet = Keypair(), Keypair()
+        coordinator = PartialSignCoordinator()
+        done = coordinator.add(unsigned_transaction(payer, wallet), 100, [payer])
+        expiring = coordinator.add(unsigned_transaction(payer, wallet), 50, [payer])
+        waiter = asyncio.ensure_future(coordinator.wait(done, timeout=1))
+        expired_waiter = asyncio.ensure_future(coordinator.wait(expiring, timeout=1))
+        await asyncio.sleep(0)
+        coordinator.sign(done, wallet)
+        assert coordinator.expire(60) == [expiring]
+        assert_fully_signed(await waiter)
+        with pytest.raises(TransactionExpired):
+            await expired_waiter
+        assert len(coordinator) == 0
+
+    asyncio.run(run())
@@ -0,0 +1,75 @@
+import asyncio
+
+from solders.pubkey import Pubkey
+
+from priority_fees import (
+    DEFAULT_COMPUTE_UNIT_LIMIT,
+    MICRO_LAMPORTS_PER_LAMPORT,
+    FeeWindow,
+    PriorityFeeEstimator,
+)
+from rpc_client import RpcError
+
+
+class FakeRpc:
+    def __init__(self, fees):
+        self.fees = fees
+        self.batches = []
+
+    async def batch(self, calls):
+        self.batches.append(calls)
+        results = []
+        for method, params in calls:
+            assert method == "getRecentPrioritizationFees"
+            account = params[0][0]
+            if account not in self.fees:
+                results.append(RpcError(-32602, "Invalid param"))
+            else:
+                results.append([{"slot": slot, "prioritizationFee": fee}
+                                for slot, fee in enumerate(self.fees[account], 1)])
+        return results
+
+
+def test_percentile_uses_nearest_rank():
+    window = FeeWindow()
+    window.extend((slot, fee) for slot, fee in enumerate(range(10, 110, 10), 1))
+    assert window.percentile(50) == 50
+    assert window.percentile(100) == 100
+    assert window.percentile(1) == 10
+
+
+def test_window_expires_old_slots():
+    window = FeeWindow(window=3)
+    window.extend([(1, 1_000), (2, 5), (3, 6), (4, 7)])
+    assert len(window) == 3
+    assert window.percentile(100) == 7
+
+
+def test_accounts_are_refreshed_in_one_batch():
+    accounts = [Pubkey.new_unique() for _ in range(4)]
+    rpc = FakeRpc({str(account): [100 * (i + 1)] * 10 for i, account in enumerate(accounts)})
+    estimator = PriorityFeeEstimator(rpc=rpc)
+
+    async def run():
+        return await estimator.compute_unit_price(accounts)
+
+    assert asyncio.run(run()) == 400
+    assert len(rpc.batches) == 1
+    assert [params[0][0] for _, params in rpc.batches[0]] == [str(account) for account in accounts]
+    assert estimator.stats() == {"accounts": 4, "fetches": 4, "failures": 0}
+
+
+def test_failed_accounts_do_not_block_the_rest():
+    sampled, unknown = Pubkey.new_unique(), Pubkey.new_unique()
+    rpc = FakeRpc({str(sampled): [300] * 5})
+    estimator = PriorityFeeEstimator(rpc=rpc)
+    assert asyncio.run(estimator.compute_unit_price([sampled, unknown])) == 300
+    assert estimator.failures == 1
+
+
+def test_fallback_scales_with_compute_unit_limit():
+    estimator = PriorityFeeEstimator(rpc=FakeRpc({}), fallback_lamports=5_000)
+    account = Pubkey.new_unique()
+    default = estimator.estimate([account])
+    assert default == 5_000 * MICRO_LAMPORTS_PER_LAMPORT // DEFAULT_COMPUTE_UNIT_LIMIT
+    assert estimator.estimate([account], 4 * DEFAULT_COMPUTE_UNIT_LIMIT) == default // 4
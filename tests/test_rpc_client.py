@@ -0,0 +1,80 @@
+import asyncio
+
+import httpx
+import pytest
+
+from rpc_client import AsyncRpcClient, RpcError
+from transaction_cache import TransactionCache
+
+
+def client_answering(body) -> AsyncRpcClient:
+    """A client whose endpoint answers every request with `body`."""
+    client = AsyncRpcClient("http://rpc.test", http2=False)
+    client._http = httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(200, json=body)))
+    return client
+
+
+def run_batch(body, calls):
+    async def run():
+        async with client_answering(body) as client:
+            return await client.batch(calls)
+    return asyncio.run(run())
+
+
+def test_batch_pairs_results_by_id():
+    results = run_batch(
+        [{"jsonrpc": "2.0", "id": 2, "result": 7}, {"jsonrpc": "2.0", "id": 1, "result": 5}],
+        [("getBalance", ["a"]), ("getBalance", ["b"])],
+    )
+    assert results == [5, 7]
+
+
+def test_batch_maps_error_items_to_rpc_errors():
+    results = run_batch(
+        [{"jsonrpc": "2.0", "id": 1, "error": {"code": -32602, "message": "bad params"}},
+         {"jsonrpc": "2.0", "id": 2, "result": 7}],
+        [("getBalance", ["a"]), ("getBalance", ["b"])],
+    )
+    assert isinstance(results[0], RpcError) and results[0].code == -32602
+    assert results[1] == 7
+
+
+def test_batch_maps_non_object_items_to_rpc_errors():
+    results = run_batch(
+        ["rate limited", {"jsonrpc": "2.0", "id": 2, "result": 7}],
+        [("getBalance", ["a"]), ("getBalance", ["b"])],
+    )
+    assert isinstance(results[0], RpcError)
+    assert results[0].message == "Invalid batch response item"
+    assert results[1] == 7
+
+
+def test_batch_rejects_non_list_bodies():
+    with pytest.raises(RpcError):
+        run_batch("rate limited", [("getBalance", ["a"])])
+    with pytest.raises(RpcError) as error:
+        run_batch({"jsonrpc": "2.0", "id": None, "error": {"code": -32600, "message": "too many"}},
+                  [("getBalance", ["a"])])
+    assert error.value.code == -32600
+
+
+def test_batched_transactions_are_cached_and_served_from_the_cache(tmp_path):
+    cache = TransactionCache(str(tmp_path / "cache.sqlite"))
+    config = {"encoding": "json", "maxSupportedTransactionVersion": 0}
+    calls = [("getTransaction", ["a", config]), ("getTransaction", ["b", config])]
+    body = [{"jsonrpc": "2.0", "id": 1, "result": {"slot": 1}}, {"jsonrpc": "2.0", "id": 2, "result": None}]
+
+    async def run():
+        async with client_answering(body) as client:
+            client._transaction_cache = cache
+            first = await client.batch(calls)
+            # Only the not-found entry goes back to the node
+            client._http = httpx.AsyncClient(transport=httpx.MockTransport(
+                lambda request: httpx.Response(200, json=[{"jsonrpc": "2.0", "id": 3, "result": None}])
+            ))
+            return first, await client.batch(calls)
+
+    first, second = asyncio.run(run())
+    assert first == second == [{"slot": 1}, None]
+    assert cache.stats()["entries"] == 1 and cache.stats()["hits"] == 1
+    cache.close()
@@ -0,0 +1,85 @@
+import asyncio
+import json
+
+import pytest
+
+from rpc_client import RpcError
+from signature_crawler import CHECKPOINT_VERSION, CrawlCheckpoint, SignatureCrawler
+
+
+class FakeRpc:
+    """getSignaturesForAddress over a fixed history (newest first); every transaction is missing."""
+
+    def __init__(self, signatures, fail_after_batches=None):
+        self.signatures = signatures
+        self.fail_after_batches = fail_after_batches
+        self.batches = 0
+
+    async def call(self, method, params):
+        assert method == "getSignaturesForAddress"
+        config = params[1]
+        start = self.signatures.index(config["before"]) + 1 if "before" in config else 0
+        end = self.signatures.index(config["until"]) if "until" in config else len(self.signatures)
+        return [{"signature": signature, "slot": 1_000 - i, "blockTime": None, "err": None}
+                for i, signature in enumerate(self.signatures[start:end][:config["limit"]], start)]
+
+    async def batch(self, calls):
+        if self.fail_after_batches is not None and self.batches >= self.fail_after_batches:
+            raise RpcError(-32005, "Node is behind")
+        self.batches += 1
+        await asyncio.sleep(0)
+        return [None for _ in calls]
+
+
+def crawler(tmp_path, rpc, **options):
+    return SignatureCrawler(
+        "Address", str(tmp_path / "rows.jsonl"), rpc=rpc, page_size=7, batch_size=3,
+        concurrency=2, max_retries=0, **options,
+    )
+
+
+def written(tmp_path):
+    with open(tmp_path / "rows.jsonl") as f:
+        return [json.loads(line)["signature"] for line in f]
+
+
+def test_resume_writes_every_signature_once(tmp_path):
+    history = [f"sig{i}" for i in range(40)]
+    with pytest.raises(RpcError):
+        asyncio.run(crawler(tmp_path, FakeRpc(history, fail_after_batches=5)).crawl())
+    # A batch written after the last checkpoint save must not survive the resume
+    with open(tmp_path / "rows.jsonl", "a") as f:
+        f.write(json.dumps({"signature": "torn"}) + "\n")
+    stopped = CrawlCheckpoint.load(str(tmp_path / "rows.jsonl.checkpoint.json"), "Address")
+    assert not stopped.complete and 0 < stopped.rows < len(history)
+
+    checkpoint = asyncio.run(crawler(tmp_path, FakeRpc(history)).crawl())
+    assert checkpoint.complete and checkpoint.rows == len(history)
+    assert sorted(written(tmp_path)) == sorted(history)
+
+
+def test_next_pass_only_fetches_newer_signatures(tmp_path):
+    history = [f"sig{i}" for i in range(10)]
+    asyncio.run(crawler(tmp_path, FakeRpc(history)).crawl())
+
+    rpc = FakeRpc(["new1", "new0", *history])
+    checkpoint = asyncio.run(crawler(tmp_path, rpc).crawl())
+    assert checkpoint.rows == 12 and checkpoint.newest == "new1"
+    assert written(tmp_path)[10:] == ["new1", "new0"]
+
+
+def test_checkpoint_for_another_address_is_rejected(tmp_path):
+    path = str(tmp_path / "checkpoint.json")
+    CrawlCheckpoint("Address").save(path)
+    with pytest.raises(ValueError):
+        CrawlCheckpoint.load(path, "OtherAddress")
+
+
+def test_checkpoint_from_another_version_is_rejected(tmp_path):
+    path = tmp_path / "checkpoint.json"
+    CrawlCheckpoint("Address").save(str(path))
+    state = json.loads(path.read_text())
+    state["version"] = CHECKPOINT_VERSION - 1
+    path.write_text(json.dumps(state))
+    with pytest.raises(ValueError, match="version"):
+        CrawlCheckpoint.load(str(path), "Address")
@@ -0,0 +1,109 @@
+import struct
+
+from solders.hash import Hash
+from solders.instruction import AccountMeta, Instruction
+from solders.keypair import Keypair
+from solders.pubkey import Pubkey
+from solders.system_program import ID as SYSTEM_PROGRAM_ID
+from solders.transaction import VersionedTransaction
+
+from mock_server import MockChain, instruction_to_json
+from swap_instructions import parse_swap_instructions
+from swap_templates import SwapTemplateCache, requested_compute_unit_limit, route_key
+
+SOL = "So11111111111111111111111111111111111111112"
+PIPIN = "Dfh5DzRgSvvCFDoYc2ciTkMrbDfRKybA4SoFbPmApump"
+
+
+def quote_and_instructions(chain: MockChain, user: Pubkey, amount: int, input_mint: str = SOL, output_mint: str = PIPIN):
+    quote = chain.jupiter_quote({"inputMint": input_mint, "outputMint": output_mint, "amount": str(amount)})
+    response = chain.jupiter_swap_instructions({"quoteResponse": quote, "userPublicKey": str(user)})
+    return quote, response
+
+
+def compiled(chain, quote, response, user, blockhash, price, limit):
+    """What a fresh /swap-instructions + compile gives for `quote`."""
+    cache = SwapTemplateCache()
+    template = cache.compile(route_key(quote, user), quote, response, user,
+                             [chain._route_lookup_table(quote["inputMint"], quote["outputMint"])], blockhash,
+                             compute_unit_price=price, compute_unit_limit=limit)
+    return template.render(quote, blockhash)
+
+
+def system_transfers(tx: VersionedTransaction):
+    keys = tx.message.account_keys
+    return [struct.unpack("<IQ", bytes(ix.data))[1] for ix in tx.message.instructions
+            if keys[ix.program_id_index] == SYSTEM_PROGRAM_ID]
+
+
+def test_render_other_amounts_patches_route_and_wrap():
+    chain, user = MockChain(), Keypair().pubkey()
+    cache = SwapTemplateCache()
+    first, first_response = quote_and_instructions(chain, user, 10_000)
+    table = chain._route_lookup_table(SOL, PIPIN)
+    template = cache.compile(route_key(first, user), first, first_response, user, [table], Hash.new_unique(),
+                             compute_unit_price=1_000, compute_unit_limit=150_000)
+    assert template.reusable and len(template.wrap_offsets) == 1
+
+    for amount in (10_000, 2_500_000):
+        quote, response = quote_and_instructions(chain, user, amount)
+        assert cache.get(route_key(quote, user)) is template
+        blockhash = Hash.new_unique()
+        rendered = template.render(quote, blockhash, 2_000, 180_000)
+        tx = VersionedTransaction.from_bytes(rendered)
+        assert system_transfers(tx) == [amount]
+        assert tx.message.recent_blockhash == blockhash
+        # Identical to compiling this quote's own instructions from scratch
+        assert rendered == compiled(chain, quote, response, user, blockhash, 2_000, 180_000)
+
+
+def test_unwrapped_route_has_no_wrap_to_patch():
+    chain, user = MockChain(), Keypair().pubkey()
+    quote, response = quote_and_instructions(chain, user, 10_000, PIPIN, SOL)
+    template = SwapTemplateCache().compile(route_key(quote, user), quote, response, user,
+                                           [chain._route_lookup_table(PIPIN, SOL)], Hash.new_unique())
+    assert template.reusable and template.wrap_offsets == []
+
+
+def with_setup(response: dict, instruction: Instruction) -> dict:
+    return {**response, "setupInstructions": response["setupInstructions"] + [instruction_to_json(instruction)]}
+
+
+def test_amount_dependent_setup_is_not_reusable():
+    chain, user = MockChain(), Keypair().pubkey()
+    quote, response = quote_and_instructions(chain, user, 10_000)
+    table = chain._route_lookup_table(SOL, PIPIN)
+    writable = [AccountMeta(user, True, True), AccountMeta(Pubkey.new_unique(), False, True)]
+    cases = [
+        # A transfer of some other amount (e.g. input plus rent) can't be patched
+        Instruction(SYSTEM_PROGRAM_ID, struct.pack("<IQ", 2, 10_000 + 2_039_280), writable),
+        # Any other instruction carrying the input or output amount
+        Instruction(Pubkey.new_unique(), b"\x03" + struct.pack("<Q", int(quote["outAmount"])), writable),
+    ]
+    for instruction in cases:
+        cache = SwapTemplateCache()
+        template = cache.compile(route_key(quote, user), quote, with_setup(response, instruction), user, [table],
+                                 Hash.new_unique())
+        assert not template.reusable
+        assert cache.get(route_key(quote, user)) is None
+        assert cache.stats()["rejected"] == 1
+
+
+def test_compute_unit_limit_follows_the_message():
+    chain, user = MockChain(), Keypair().pubkey()
+    quote, response = quote_and_instructions(chain, user, 10_000)
+    table = chain._route_lookup_table(SOL, PIPIN)
+    assert requested_compute_unit_limit(parse_swap_instructions(response)) == 200_000
+
+    template = SwapTemplateCache().compile(route_key(quote, user), quote, response, user, [table], Hash.new_unique(),
+                                           compute_unit_limit=1_400_000)
+    assert template.compute_unit_limit == 1_400_000
+    template.render(quote, Hash.new_unique(), compute_unit_limit=350_000)
+    assert template.compute_unit_limit == 350_000
+
+    # Without a SetComputeUnitLimit the runtime default applies: 200k per other instruction, at most 1.4M
+    unlimited = {**response, "computeBudgetInstructions": []}
+    instructions = parse_swap_instructions(unlimited)
+    assert requested_compute_unit_limit(instructions) == min(len(instructions) * 200_000, 1_400_000)
+    template = SwapTemplateCache().compile(route_key(quote, user), quote, unlimited, user, [table], Hash.new_unique())
+    assert template.compute_unit_limit == requested_compute_unit_limit(instructions)
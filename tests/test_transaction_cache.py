@@ -0,0 +1,79 @@
+import pytest
+
+from transaction_cache import TransactionCache, cache_variant
+
+FINALIZED = {"encoding": "json", "maxSupportedTransactionVersion": 0}
+
+
+def result(slot, size=2_000):
+    # Unique per slot, and varied enough not to compress to nothing
+    logs = [f"{slot}:{i * 7919 % 104729}" for i in range(size // 10)]
+    return {"slot": slot, "blockTime": None, "meta": {"logMessages": logs}}
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = TransactionCache(str(tmp_path / "cache.sqlite"))
+    yield cache
+    cache.close()
+
+
+def test_round_trip_per_variant(cache):
+    assert cache.put("sig", FINALIZED, result(1))
+    assert cache.get("sig", FINALIZED) == result(1)
+    assert cache.get("sig", {**FINALIZED, "encoding": "base64"}) is None
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+@pytest.mark.parametrize("config", [
+    {**FINALIZED, "commitment": "confirmed"},
+    {**FINALIZED, "commitment": "processed"},
+])
+def test_only_finalized_results_are_stored(cache, config):
+    assert cache_variant(config) is None
+    assert not cache.put("sig", config, result(1))
+    assert cache.get("sig", config) is None
+    assert cache.get("sig", FINALIZED) is None
+    assert cache.stats()["uncacheable"] == 1
+
+
+def test_not_found_is_not_stored(cache):
+    assert not cache.put("sig", FINALIZED, None)
+    assert cache.stats()["entries"] == 0
+
+
+def test_put_many_skips_uncacheable_entries(cache):
+    stored = cache.put_many([
+        ("a", FINALIZED, result(1)),
+        ("b", {**FINALIZED, "commitment": "confirmed"}, result(2)),
+        ("c", FINALIZED, None),
+        ("d", None, result(4)),
+    ])
+    assert stored == 2
+    assert cache.get("a", FINALIZED) == result(1)
+    assert cache.get("d") == result(4)
+    assert cache.stats()["entries"] == 2
+
+
+def test_eviction_keeps_the_cache_bounded_and_drops_least_recent(tmp_path):
+    probe = TransactionCache(str(tmp_path / "probe.sqlite"))
+    probe.put("probe", FINALIZED, result(0))
+    entry_bytes = probe.stats()["bytes"]
+    probe.close()
+
+    cache = TransactionCache(str(tmp_path / "cache.sqlite"), max_bytes=entry_bytes * 10)
+    cache.put_many((f"sig{slot}", FINALIZED, result(slot)) for slot in range(10))
+    assert cache.stats()["evictions"] == 0
+    for slot in range(10, 20):
+        cache.put(f"sig{slot}", FINALIZED, result(slot))
+    stats = cache.stats()
+    assert stats["evictions"] > 0
+    assert stats["bytes"] <= cache.max_bytes
+    assert cache.get("sig0", FINALIZED) is None
+    assert cache.get("sig19", FINALIZED) == result(19)
+    cache.close()
+
+    # The size it tracks survives a reopen
+    reopened = TransactionCache(str(tmp_path / "cache.sqlite"), max_bytes=entry_bytes * 10)
+    assert reopened.stats()["bytes"] == stats["bytes"]
+    reopened.close()
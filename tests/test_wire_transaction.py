@@ -0,0 +1,78 @@
+import pytest
+from solders.hash import Hash
+from solders.instruction import AccountMeta, Instruction
+from solders.keypair import Keypair
+from solders.message import MessageV0, to_bytes_versioned
+from solders.null_signer import NullSigner
+from solders.pubkey import Pubkey
+from solders.transaction import VersionedTransaction
+
+from wire_transaction import WireTransaction, decode_length, encode_length
+
+
+def unsigned_transaction(fee_payer: Keypair, *signers: Keypair) -> VersionedTransaction:
+    """A v0 transfer-like transaction that needs `fee_payer` and `signers` to sign."""
+    instruction = Instruction(
+        Pubkey.new_unique(),
+        bytes([1, 2, 3]),
+        [AccountMeta(signer.pubkey(), is_signer=True, is_writable=True) for signer in signers]
+        + [AccountMeta(Pubkey.new_unique(), is_signer=False, is_writable=True)],
+    )
+    message = MessageV0.try_compile(fee_payer.pubkey(), [instruction], [], Hash.new_unique())
+    keys = [fee_payer, *signers]
+    return VersionedTransaction(message, [NullSigner(key.pubkey()) for key in keys])
+
+
+@pytest.mark.parametrize("length", [0, 1, 127, 128, 300, 16383, 16384, 65535])
+def test_shortvec_round_trip(length):
+    encoded = encode_length(length)
+    assert decode_length(b"\xff" + encoded, 1) == (length, 1 + len(encoded))
+
+
+def test_sign_matches_solders():
+    fee_payer, user = Keypair(), Keypair()
+    tx = unsigned_transaction(fee_payer, user)
+    wire = WireTransaction().load(bytes(tx)).sign([fee_payer, user])
+    assert bytes(wire.wire) == bytes(VersionedTransaction(tx.message, [fee_payer, user]))
+    assert VersionedTransaction.from_bytes(bytes(wire.wire)).verify_with_results() == [True, True]
+
+
+def test_sign_patches_only_the_signers_slots():
+    fee_payer, user = Keypair(), Keypair()
+    tx = unsigned_transaction(fee_payer, user)
+    wire = WireTransaction().load(bytes(tx)).sign([user])
+    signed = VersionedTransaction.from_bytes(bytes(wire.wire))
+    # The fee payer's slot keeps its placeholder until the relay co-signs
+    assert signed.signatures[0] == tx.signatures[0]
+    assert signed.signatures[1] == user.sign_message(to_bytes_versioned(tx.message))
+    assert bytes(wire.message) == to_bytes_versioned(tx.message)
+
+    wire.sign([fee_payer], [fee_payer.pubkey()])
+    assert VersionedTransaction.from_bytes(bytes(wire.wire)).verify_with_results() == [True, True]
+
+
+def test_signer_index_and_rejects_non_signers():
+    fee_payer, user = Keypair(), Keypair()
+    wire = WireTransaction().load(bytes(unsigned_transaction(fee_payer, user)))
+    assert wire.signer_index(fee_payer.pubkey()) == 0
+    assert wire.signer_index(bytes(user.pubkey())) == 1
+    with pytest.raises(ValueError):
+        wire.sign([Keypair()])
+
+
+def test_buffer_is_reused_and_grown():
+    fee_payer = Keypair()
+    small = bytes(unsigned_transaction(fee_payer))
+    large = bytes(unsigned_transaction(fee_payer, Keypair(), Keypair()))
+    wire = WireTransaction(capacity=len(small))
+    assert bytes(wire.load(small).wire) == small
+    assert bytes(wire.load(large).wire) == large
+    assert wire.signature_count == 3
+    assert WireTransaction().load_base64(wire.to_base64()).wire == large
+
+
+def test_rejects_signature_count_mismatch():
+    data = bytearray(bytes(unsigned_transaction(Keypair(), Keypair())))
+    # Claim a single signature slot for a message that needs two
+    with pytest.raises(ValueError):
+        WireTransaction().load(b"\x01" + data[1 + 64:])
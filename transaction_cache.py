@@ -0,0 +1,311 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, Dict, Iterable, Optional, Sequence, Tuple
+
+from config import TRANSACTION_CACHE_MAX_MB, TRANSACTION_CACHE_PATH
+
+DEFAULT_COMPRESSION_LEVEL = 6
+# Evict down to this share of max_bytes, so a full cache doesn't evict on every put
+EVICTION_TARGET = 0.9
+EVICTION_BATCH = 256
+# Recency only needs to be coarse: a hit refreshes last_used if it is older
+# than this, and refreshes are written in batches
+TOUCH_INTERVAL = 600.0  # seconds
+TOUCH_BATCH = 256
+
+CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS transactions (
+    signature TEXT NOT NULL,
+    variant TEXT NOT NULL,
+    payload BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    raw_size INTEGER NOT NULL,
+    last_used REAL NOT NULL,
+    PRIMARY KEY (signature, variant)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS transactions_by_last_used ON transactions (last_used);
+"""
+
+
+def cache_variant(config: Optional[dict]) -> Optional[str]:
+    """
+    The part of a getTransaction cache key that depends on the request config.
+
+    Args:
+        config (dict, optional): getTransaction's config object
+
+    Returns:
+        Optional[str]: "<encoding>:<maxSupportedTransactionVersion>", or None
+        if the request isn't at finalized commitment (the RPC default), whose
+        results can still change
+    """
+    config = config or {}
+    if config.get("commitment", "finalized") != "finalized":
+        return None
+    return f"{config.get('encoding', 'json')}:{config.get('maxSupportedTransactionVersion')}"
+
+
+def split_params(params: Sequence[Any]) -> Tuple[str, Optional[dict]]:
+    """getTransaction's positional params as (signature, config)."""
+    return params[0], params[1] if len(params) > 1 else None
+
+
+class TransactionCache:
+    """
+    Disk-backed read-through cache of finalized getTransaction results.
+
+    A finalized transaction never changes, so its result is kept for good,
+    keyed by signature plus encoding and max supported version. Payloads are
+    stored as zlib-compressed JSON in SQLite. Once they take up more than
+    `max_bytes`, the least recently used entries are evicted. Not-found
+    results and requests below finalized commitment are never stored.
+
+    Recency is kept to within TOUCH_INTERVAL, and refreshes are written back
+    in batches (and before evicting), so a hit is normally a single indexed
+    read. Safe to share
+    between threads; each call holds a lock for its SQLite statements.
+    """
+
+    def __init__(
+        self,
+        path: str = TRANSACTION_CACHE_PATH,
+        max_bytes: int = TRANSACTION_CACHE_MAX_MB * 1024 * 1024,
+        compression_level: int = DEFAULT_COMPRESSION_LEVEL,
+    ):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.compression_level = compression_level
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(CACHE_SCHEMA)
+        self._lock = threading.Lock()
+        self._bytes = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM transactions").fetchone()[0]
+        self._touched: Dict[Tuple[str, str], float] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.uncacheable = 0
+        self.stores = 0
+        self.evictions = 0
+
+    def close(self) -> None:
+        with self._lock:
+            self._write_touched()
+            self._db.close()
+
+    def _write_touched(self) -> None:
+        if self._touched:
+            self._db.executemany(
+                "UPDATE transactions SET last_used = ? WHERE signature = ? AND variant = ?",
+                [(last_used, signature, variant) for (signature, variant), last_used in self._touched.items()],
+            )
+            self._db.commit()
+            self._touched.clear()
+
+    def get(self, signature: str, config: Optional[dict] = None) -> Optional[Any]:
+        """
+        Look up a cached getTransaction result.
+
+        Args:
+            signature (str): The transaction signature
+            config (dict, optional): The request's config object
+
+        Returns:
+            Optional[Any]: The cached result, or None on a miss
+        """
+        raw = self.get_raw(signature, config)
+        return json.loads(raw) if raw is not None else None
+
+    def get_raw(self, signature: str, config: Optional[dict] = None) -> Optional[bytes]:
+        """
+        Look up a cached getTransaction result without parsing it.
+
+        Args:
+            signature (str): The transaction signature
+            config (dict, optional): The request's config object
+
+        Returns:
+            Optional[bytes]: The result as JSON, or None on a miss
+        """
+        variant = cache_variant(config)
+        if variant is None:
+            self.uncacheable += 1
+            return None
+        with self._lock:
+            found = self._db.execute(
+                "SELECT payload, last_used FROM transactions WHERE signature = ? AND variant = ?",
+                (signature, variant),
+            ).fetchone()
+            if found is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            payload, last_used = found
+            now = time.time()
+            if now - last_used >= TOUCH_INTERVAL:
+                self._touched[(signature, variant)] = now
+                if len(self._touched) >= TOUCH_BATCH:
+                    self._write_touched()
+        return zlib.decompress(payload)
+
+    def get_many(self, params: Sequence[Sequence[Any]]) -> Dict[int, Any]:
+        """
+        Look up several getTransaction requests at once.
+
+        Args:
+            params (Sequence): Each request's params, [signature, config]
+
+        Returns:
+            Dict[int, Any]: Cached results by position in `params`
+        """
+        found = {}
+        for i, request_params in enumerate(params):
+            result = self.get(*split_params(request_params))
+            if result is not None:
+                found[i] = result
+        return found
+
+    def put(self, signature: str, config: Optional[dict], result: Any) -> bool:
+        """
+        Store a getTransaction result if it is final.
+
+        Args:
+            signature (str): The transaction signature
+            config (dict, optional): The request's config object
+            result (Any): The RPC result
+
+        Returns:
+            bool: Whether it was stored
+        """
+        return self.put_many([(signature, config, result)]) == 1
+
+    def put_many(self, entries: Iterable[Tuple[str, Optional[dict], Any]]) -> int:
+        """
+        Store several getTransaction results in one SQLite transaction.
+
+        Args:
+            entries (Iterable[Tuple[str, dict, Any]]): (signature, config, result)
+                for each request; entries put() would skip are skipped
+
+        Returns:
+            int: How many were stored
+        """
+        rows = []
+        for signature, config, result in entries:
+            variant = cache_variant(config)
+            if variant is not None and result is not None:
+                rows.append((signature, variant, json.dumps(result, separators=(",", ":")).encode("utf-8")))
+        return self._store(rows)
+
+    def put_raw(self, signature: str, config: Optional[dict], raw: bytes) -> bool:
+        """
+        Store a getTransaction result given as its JSON bytes, without parsing it.
+
+        For callers that only scanned the response (see get_tx_sender.scan_sender);
+        the bytes are stored as they came, whitespace included.
+
+        Args:
+            signature (str): The transaction signature
+            config (dict, optional): The request's config object
+            raw (bytes-like): The result's JSON, e.g. sliced out of the response body
+
+        Returns:
+            bool: Whether it was stored
+        """
+        variant = cache_variant(config)
+        raw = bytes(raw).strip()
+        if variant is None or raw in (b"", b"null"):
+            return False
+        return self._store([(signature, variant, raw)]) == 1
+
+    def _store(self, rows: Sequence[Tuple[str, str, bytes]]) -> int:
+        # (signature, variant, JSON) rows; compressed before the lock is taken
+        if not rows:
+            return 0
+        compressed = [
+            (signature, variant, zlib.compress(raw, self.compression_level), len(raw))
+            for signature, variant, raw in rows
+        ]
+        now = time.time()
+        with self._lock:
+            for signature, variant, payload, raw_size in compressed:
+                previous = self._db.execute(
+                    "SELECT size FROM transactions WHERE signature = ? AND variant = ?", (signature, variant)
+                ).fetchone()
+                self._db.execute(
+                    "INSERT OR REPLACE INTO transactions (signature, variant, payload, size, raw_size, last_used) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (signature, variant, payload, len(payload), raw_size, now),
+                )
+                self._bytes += len(payload) - (previous[0] if previous else 0)
+            self.stores += len(compressed)
+            if self._bytes > self.max_bytes:
+                self._write_touched()
+                self._evict()
+            self._db.commit()
+        return len(compressed)
+
+    def _evict(self) -> None:
+        target = self.max_bytes * EVICTION_TARGET
+        while self._bytes > target:
+            oldest = self._db.execute(
+                "SELECT signature, variant, size FROM transactions ORDER BY last_used LIMIT ?", (EVICTION_BATCH,)
+            ).fetchall()
+            if not oldest:
+                self._bytes = 0
+                return
+            evicted = []
+            for signature, variant, size in oldest:
+                evicted.append((signature, variant))
+                self._bytes -= size
+                if self._bytes <= target:
+                    break
+            self._db.executemany("DELETE FROM transactions WHERE signature = ? AND variant = ?", evicted)
+            self.evictions += len(evicted)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries, raw_bytes = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(raw_size), 0) FROM transactions"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "entries": entries,
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "uncacheable": self.uncacheable,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "compression_ratio": raw_bytes / self._bytes if self._bytes else 0.0,
+        }
+
+
+_shared_cache: Optional[TransactionCache] = None
+_shared_lock = threading.Lock()
+
+
+def get_transaction_cache() -> Optional[TransactionCache]:
+    """
+    Get the process-wide cache at TRANSACTION_CACHE_PATH, opened on first use.
+
+    Returns:
+        Optional[TransactionCache]: The cache, or None if it is turned off
+        (TRANSACTION_CACHE_PATH not set, the default, or TRANSACTION_CACHE_MAX_MB 0)
+    """
+    global _shared_cache
+    if not TRANSACTION_CACHE_PATH or TRANSACTION_CACHE_MAX_MB <= 0:
+        return None
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = TransactionCache()
+    return _shared_cache
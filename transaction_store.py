@@ -0,0 +1,502 @@
+import argparse
+import json
+import os
+import sqlite3
+import time
+from collections import OrderedDict, defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:  # optional: the "store" extra
+    pa = ds = pq = None
+
+from config import TRANSACTION_STORE_DIR
+
+# One epoch of slots per partition directory
+DEFAULT_PARTITION_SLOTS = 432_000
+# Small row groups keep a point lookup from decoding more than a few hundred rows
+DEFAULT_ROW_GROUP_SIZE = 256
+# Rows buffered in memory before they are written out as new part files
+DEFAULT_FLUSH_ROWS = 10_000
+DEFAULT_COMPRESSION = "zstd"
+# Parquet footers kept open for point lookups
+MAX_OPEN_FILES = 64
+# Keeps IN (...) lists under SQLite's bound-parameter limit
+SQLITE_CHUNK = 500
+
+INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    first_slot INTEGER NOT NULL,
+    last_slot INTEGER NOT NULL,
+    row_group_size INTEGER NOT NULL,
+    rows INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS keys (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS transactions (
+    id INTEGER PRIMARY KEY,
+    signature TEXT NOT NULL UNIQUE,
+    slot INTEGER NOT NULL,
+    block_time INTEGER,
+    sender_id INTEGER,
+    file_id INTEGER NOT NULL,
+    row INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS transactions_by_sender ON transactions (sender_id, slot);
+-- Every account key of every transaction, by integer id: a few bytes an entry instead of two base58 strings
+CREATE TABLE IF NOT EXISTS accounts (
+    account_id INTEGER NOT NULL,
+    slot INTEGER NOT NULL,
+    transaction_id INTEGER NOT NULL,
+    PRIMARY KEY (account_id, slot, transaction_id)
+) WITHOUT ROWID;
+"""
+MAX_SLOT = 2 ** 63 - 1
+
+
+def _schema():
+    return pa.schema([
+        ("signature", pa.string()),
+        ("slot", pa.int64()),
+        ("block_time", pa.int64()),
+        ("err", pa.string()),  # JSON, null if the transaction succeeded
+        ("fee", pa.int64()),
+        ("sender", pa.string()),
+        ("account_keys", pa.list_(pa.string())),
+        ("program_ids", pa.list_(pa.string())),
+        # Raw token amounts are u64, so deltas are kept as strings like the RPC's uiTokenAmount.amount
+        ("token_deltas", pa.list_(pa.struct([
+            ("account", pa.string()),
+            ("mint", pa.string()),
+            ("owner", pa.string()),
+            ("delta", pa.string()),
+        ]))),
+    ])
+
+
+def token_deltas(meta: dict, account_keys: Sequence[str]) -> List[Dict[str, Optional[str]]]:
+    """
+    Net change per token account from a transaction's pre/postTokenBalances.
+
+    Args:
+        meta (dict): The getTransaction result's meta
+        account_keys (Sequence[str]): All account keys, including loaded addresses
+
+    Returns:
+        List[Dict]: {"account", "mint", "owner", "delta"} for every token
+        account whose raw balance changed; delta is a signed integer string
+    """
+    balances: Dict[Tuple[int, str], List[Any]] = {}
+    for sign, field in ((-1, "preTokenBalances"), (1, "postTokenBalances")):
+        for balance in meta.get(field) or []:
+            entry = balances.setdefault((balance["accountIndex"], balance["mint"]), [None, 0])
+            entry[0] = balance.get("owner") or entry[0]
+            entry[1] += sign * int(balance["uiTokenAmount"]["amount"])
+    return [
+        {"account": account_keys[index], "mint": mint, "owner": owner, "delta": str(delta)}
+        for (index, mint), (owner, delta) in balances.items()
+        if delta
+    ]
+
+
+def decode_transaction(result: dict, signature: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Flatten a getTransaction result (json encoding) into a store row.
+
+    Args:
+        result (dict): The getTransaction result
+        signature (str, optional): The signature it was fetched by; defaults
+            to the transaction's first signature
+
+    Returns:
+        Dict[str, Any]: signature, slot, block_time, err, fee, sender (the fee
+        payer), account_keys (static keys, then loaded writable and readonly
+        addresses), program_ids (top-level and inner, in first-use order)
+        and token_deltas
+    """
+    transaction = result["transaction"]
+    message = transaction["message"]
+    meta = result.get("meta") or {}
+    loaded = meta.get("loadedAddresses") or {}
+    account_keys = message["accountKeys"] + loaded.get("writable", []) + loaded.get("readonly", [])
+    program_ids = dict.fromkeys(account_keys[ix["programIdIndex"]] for ix in message["instructions"])
+    for inner in meta.get("innerInstructions") or []:
+        program_ids.update(dict.fromkeys(account_keys[ix["programIdIndex"]] for ix in inner["instructions"]))
+    return {
+        "signature": signature or transaction["signatures"][0],
+        "slot": result["slot"],
+        "block_time": result.get("blockTime"),
+        "err": meta.get("err"),
+        "fee": meta.get("fee"),
+        "sender": account_keys[0],
+        "account_keys": account_keys,
+        "program_ids": list(program_ids),
+        "token_deltas": token_deltas(meta, account_keys),
+    }
+
+
+def _chunks(items: Sequence[Any], size: int = SQLITE_CHUNK) -> Iterable[Sequence[Any]]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class TransactionStore:
+    """
+    Decoded transactions on disk, as zstd-compressed Parquet partitioned by slot range.
+
+    Rows are buffered and written as new, immutable part files under
+    `slots=<first>-<last>/`, sorted by slot and cut into small row groups.
+    A SQLite index next to them maps each signature to its file and row,
+    and each sender and account key to the signatures that touched it, so
+    point lookups read a single row group and address lookups read no
+    Parquet at all. Whole slot ranges are read column by column with scan().
+
+    A signature is stored once; adding it again is a no-op. Part files are
+    written before their index rows are committed, so a crash can leave an
+    unreferenced file behind but never an index entry without its data.
+    """
+
+    def __init__(
+        self,
+        root: str = TRANSACTION_STORE_DIR,
+        partition_slots: int = DEFAULT_PARTITION_SLOTS,
+        row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+        flush_rows: int = DEFAULT_FLUSH_ROWS,
+        compression: str = DEFAULT_COMPRESSION,
+    ):
+        if pa is None:
+            raise ImportError(
+                "TransactionStore needs pyarrow, which isn't installed; "
+                "install the store extra (poetry install --extras store) or run pip install 'pyarrow>=18'"
+            )
+        self.root = root
+        self.partition_slots = partition_slots
+        self.row_group_size = row_group_size
+        self.flush_rows = flush_rows
+        self.compression = compression
+        self.schema = _schema()
+
+        os.makedirs(root, exist_ok=True)
+        self._db = sqlite3.connect(os.path.join(root, "index.sqlite"))
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(INDEX_SCHEMA)
+        self._buffer: Dict[str, Dict[str, Any]] = {}
+        self._files: "OrderedDict[int, Any]" = OrderedDict()
+
+    def __enter__(self) -> "TransactionStore":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Write out buffered rows and close the index."""
+        self.flush()
+        self._files.clear()
+        self._db.close()
+
+    # Writing
+
+    def _indexed(self, signatures: Sequence[str]) -> set:
+        found = set()
+        for chunk in _chunks(signatures):
+            placeholders = ",".join("?" * len(chunk))
+            found.update(signature for (signature,) in self._db.execute(
+                f"SELECT signature FROM transactions WHERE signature IN ({placeholders})", chunk
+            ))
+        return found
+
+    def add_many(self, rows: Iterable[Dict[str, Any]]) -> int:
+        """
+        Buffer rows shaped like decode_transaction's, flushing every `flush_rows`.
+
+        Returns:
+            int: How many were new (not already stored or buffered)
+        """
+        rows = [row for row in rows if row["signature"] not in self._buffer]
+        known = self._indexed([row["signature"] for row in rows])
+        added = 0
+        for row in rows:
+            if row["signature"] not in known and row["signature"] not in self._buffer:
+                self._buffer[row["signature"]] = row
+                added += 1
+        if len(self._buffer) >= self.flush_rows:
+            self.flush()
+        return added
+
+    def add(self, row: Dict[str, Any]) -> bool:
+        return self.add_many([row]) == 1
+
+    def _key_ids(self, keys: Iterable[str]) -> Dict[str, int]:
+        keys = list(set(keys))
+        self._db.executemany("INSERT OR IGNORE INTO keys (key) VALUES (?)", ((key,) for key in keys))
+        ids = {}
+        for chunk in _chunks(keys):
+            placeholders = ",".join("?" * len(chunk))
+            ids.update(self._db.execute(f"SELECT key, id FROM keys WHERE key IN ({placeholders})", chunk))
+        return ids
+
+    def _partition_dir(self, slot: int) -> str:
+        first = slot // self.partition_slots * self.partition_slots
+        return f"slots={first:012d}-{first + self.partition_slots - 1:012d}"
+
+    def flush(self) -> int:
+        """
+        Write buffered rows as one new part file per slot partition.
+
+        Returns:
+            int: Rows written
+        """
+        if not self._buffer:
+            return 0
+        partitions: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        for row in self._buffer.values():
+            partitions[self._partition_dir(row["slot"])].append(row)
+
+        with self._db:
+            key_ids = self._key_ids(key for row in self._buffer.values() for key in row["account_keys"])
+            next_id = self._db.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM transactions").fetchone()[0]
+            for directory, rows in sorted(partitions.items()):
+                # Slot order lets row-group statistics prune slot-range scans
+                rows.sort(key=lambda row: (row["slot"], row["signature"]))
+                file_id = self._db.execute(
+                    "INSERT INTO files (path, first_slot, last_slot, row_group_size, rows) VALUES (?, ?, ?, ?, ?)",
+                    ("", rows[0]["slot"], rows[-1]["slot"], self.row_group_size, len(rows)),
+                ).lastrowid
+                path = os.path.join(directory, f"part-{file_id:08d}.parquet")
+                self._write(path, rows)
+                self._db.execute("UPDATE files SET path = ? WHERE id = ?", (path, file_id))
+                self._db.executemany(
+                    "INSERT INTO transactions (id, signature, slot, block_time, sender_id, file_id, row) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [(next_id + i, row["signature"], row["slot"], row["block_time"], key_ids.get(row["sender"]),
+                      file_id, i) for i, row in enumerate(rows)],
+                )
+                self._db.executemany(
+                    "INSERT OR IGNORE INTO accounts (account_id, slot, transaction_id) VALUES (?, ?, ?)",
+                    [(key_ids[account], row["slot"], next_id + i)
+                     for i, row in enumerate(rows) for account in row["account_keys"]],
+                )
+                next_id += len(rows)
+        # Fold the write-ahead log back into the index so it doesn't grow with every flush
+        self._db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        written = len(self._buffer)
+        self._buffer.clear()
+        return written
+
+    def _write(self, path: str, rows: List[Dict[str, Any]]) -> None:
+        table = pa.Table.from_pylist(
+            [{**row, "err": None if row["err"] is None else json.dumps(row["err"])} for row in rows],
+            schema=self.schema,
+        )
+        full_path = os.path.join(self.root, path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        tmp_path = f"{full_path}.tmp"
+        pq.write_table(table, tmp_path, compression=self.compression, row_group_size=self.row_group_size)
+        os.replace(tmp_path, full_path)
+
+    # Index lookups (no Parquet reads)
+
+    def __contains__(self, signature: str) -> bool:
+        return signature in self._buffer or bool(self._indexed([signature]))
+
+    def sender(self, signature: str) -> Optional[str]:
+        """The fee payer of a stored transaction, straight from the index."""
+        if signature in self._buffer:
+            return self._buffer[signature]["sender"]
+        found = self._db.execute(
+            "SELECT k.key FROM transactions t JOIN keys k ON k.id = t.sender_id WHERE t.signature = ?", (signature,)
+        ).fetchone()
+        return None if found is None else found[0]
+
+    def signatures_for_address(
+        self, address: str, limit: int = 1000, before_slot: Optional[int] = None
+    ) -> List[Tuple[str, int]]:
+        """
+        Stored transactions that included `address` in their account keys.
+
+        Args:
+            address (str): Any account key, program or mint account
+            limit (int): Maximum number of results
+            before_slot (int, optional): Only return transactions older than this slot
+
+        Returns:
+            List[Tuple[str, int]]: (signature, slot), newest first; rows still
+            in the write buffer are not included until flush()
+        """
+        return self._db.execute(
+            "SELECT t.signature, a.slot FROM accounts a JOIN transactions t ON t.id = a.transaction_id "
+            "WHERE a.account_id = (SELECT id FROM keys WHERE key = ?) AND a.slot < ? ORDER BY a.slot DESC LIMIT ?",
+            (address, before_slot if before_slot is not None else MAX_SLOT, limit),
+        ).fetchall()
+
+    def signatures_for_sender(
+        self, sender: str, limit: int = 1000, before_slot: Optional[int] = None
+    ) -> List[Tuple[str, int]]:
+        """Like signatures_for_address, for transactions `sender` paid for."""
+        return self._db.execute(
+            "SELECT signature, slot FROM transactions "
+            "WHERE sender_id = (SELECT id FROM keys WHERE key = ?) AND slot < ? ORDER BY slot DESC LIMIT ?",
+            (sender, before_slot if before_slot is not None else MAX_SLOT, limit),
+        ).fetchall()
+
+    # Row reads
+
+    def _parquet_file(self, file_id: int, path: str):
+        parquet_file = self._files.get(file_id)
+        if parquet_file is None:
+            parquet_file = self._files[file_id] = pq.ParquetFile(os.path.join(self.root, path))
+            if len(self._files) > MAX_OPEN_FILES:
+                self._files.popitem(last=False)
+        else:
+            self._files.move_to_end(file_id)
+        return parquet_file
+
+    def get_many(self, signatures: Sequence[str], columns: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Load stored rows, reading each row group they fall in once.
+
+        Args:
+            signatures (Sequence[str]): Signatures to look up; unknown ones are skipped
+            columns (List[str], optional): Only these columns (plus signature)
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Rows by signature, with err decoded from JSON
+        """
+        if columns is not None and "signature" not in columns:
+            columns = ["signature", *columns]
+        found = {sig: self._buffer[sig] for sig in signatures if sig in self._buffer}
+        wanted: Dict[Tuple[int, str, int], List[int]] = defaultdict(list)
+        for chunk in _chunks([sig for sig in signatures if sig not in found]):
+            placeholders = ",".join("?" * len(chunk))
+            for file_id, path, group_size, row in self._db.execute(
+                "SELECT t.file_id, f.path, f.row_group_size, t.row FROM transactions t "
+                f"JOIN files f ON f.id = t.file_id WHERE t.signature IN ({placeholders})",
+                chunk,
+            ):
+                wanted[(file_id, path, row // group_size)].append(row % group_size)
+
+        for (file_id, path, group), offsets in wanted.items():
+            table = self._parquet_file(file_id, path).read_row_group(group, columns=columns)
+            for row in table.take(offsets).to_pylist():
+                if row.get("err") is not None:
+                    row["err"] = json.loads(row["err"])
+                found[row["signature"]] = row
+        if columns is not None:
+            found = {sig: {column: row[column] for column in columns} for sig, row in found.items()}
+        return found
+
+    def get(self, signature: str) -> Optional[Dict[str, Any]]:
+        return self.get_many([signature]).get(signature)
+
+    def scan(
+        self, min_slot: Optional[int] = None, max_slot: Optional[int] = None, columns: Optional[List[str]] = None
+    ):
+        """
+        Read a slot range as one Arrow table, touching only the files that overlap it.
+
+        Args:
+            min_slot (int, optional): First slot, inclusive
+            max_slot (int, optional): Last slot, inclusive
+            columns (List[str], optional): Columns to read (default: all)
+
+        Returns:
+            pyarrow.Table: Matching rows; err stays a JSON string
+        """
+        low = min_slot if min_slot is not None else 0
+        high = max_slot if max_slot is not None else MAX_SLOT
+        paths = [os.path.join(self.root, path) for (path,) in self._db.execute(
+            "SELECT path FROM files WHERE last_slot >= ? AND first_slot <= ? ORDER BY first_slot", (low, high)
+        )]
+        if not paths:
+            return self.schema.empty_table().select(columns) if columns else self.schema.empty_table()
+        dataset = ds.dataset(paths, schema=self.schema, format="parquet")
+        return dataset.to_table(columns=columns, filter=(ds.field("slot") >= low) & (ds.field("slot") <= high))
+
+    def stats(self) -> Dict[str, int]:
+        transactions, accounts, files = self._db.execute(
+            "SELECT (SELECT COUNT(*) FROM transactions), (SELECT COUNT(*) FROM accounts), (SELECT COUNT(*) FROM files)"
+        ).fetchone()
+        data_bytes = sum(
+            os.path.getsize(os.path.join(self.root, path)) for (path,) in self._db.execute("SELECT path FROM files")
+        )
+        index_bytes = sum(
+            os.path.getsize(os.path.join(self.root, name)) for name in os.listdir(self.root)
+            if name.startswith("index.sqlite")
+        )
+        return {
+            "transactions": transactions,
+            "account_entries": accounts,
+            "files": files,
+            "buffered": len(self._buffer),
+            "data_bytes": data_bytes,
+            "index_bytes": index_bytes,
+        }
+
+
+def load_jsonl(store: TransactionStore, path: str) -> int:
+    """
+    Add rows from a JSON Lines file (e.g. signature_crawler output) to the store.
+
+    Rows without a decoded transaction (sender is null) are skipped.
+
+    Returns:
+        int: How many were new
+    """
+    added = 0
+    batch = []
+    with open(path, "rb") as f:
+        for line in f:
+            row = json.loads(line)
+            if row.get("sender") is not None:
+                batch.append(row)
+            if len(batch) >= SQLITE_CHUNK:
+                added += store.add_many(batch)
+                batch = []
+    return added + store.add_many(batch)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local columnar store of decoded transactions")
+    parser.add_argument("--root", default=TRANSACTION_STORE_DIR)
+    commands = parser.add_subparsers(dest="command", required=True)
+    load = commands.add_parser("load", help="Add a JSON Lines file of decoded transactions")
+    load.add_argument("path")
+    get = commands.add_parser("get", help="Show a stored transaction")
+    get.add_argument("signature")
+    address = commands.add_parser("address", help="List stored transactions that touched an address")
+    address.add_argument("address")
+    address.add_argument("--limit", type=int, default=20)
+    commands.add_parser("stats", help="Show row counts and sizes")
+    args = parser.parse_args()
+
+    with TransactionStore(args.root) as store:
+        if args.command == "load":
+            started = time.perf_counter()
+            added = load_jsonl(store, args.path)
+            store.flush()
+            print(f"✅ Stored {added} new transactions in {time.perf_counter() - started:.1f}s")
+        elif args.command == "get":
+            row = store.get(args.signature)
+            if row is None:
+                print(f"❌ {args.signature} is not stored")
+            else:
+                print(json.dumps(row, indent=2))
+        elif args.command == "address":
+            for signature, slot in store.signatures_for_address(args.address, args.limit):
+                print(f"{slot}  {signature}")
+        else:
+            for name, value in store.stats().items():
+                print(f"{name}: {value}")
+
+
+if __name__ == "__main__":
+    main()
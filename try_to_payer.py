@@ -1,4 +1,5 @@
-from typing import List
+from typing import List, Optional
+import asyncio
 import base64
 import os
 import requests
@@ -9,101 +10,47 @@ from solders.message import MessageV0, to_bytes_versioned
 from solders.null_signer import NullSigner
 from solders.pubkey import Pubkey
 from solders.transaction import VersionedTransaction
+from config import JUPITER_API_URL
+from message_decompiler import LookupTables, decompile_message
+from lookup_table_cache import get_lookup_table_cache
 
 payer = Keypair.from_base58_string(os.getenv("PRIVATE_KEY_TrueNorthTest_2"))
 tx_sender = Keypair.from_base58_string(os.getenv("PRIVATE_KEY"))
 
-def convert_message_v0_to_instructions(message_v0: MessageV0) -> List[Instruction]:
+def convert_message_v0_to_instructions(
+    message_v0: MessageV0, lookup_tables: Optional[LookupTables] = None
+) -> List[Instruction]:
     """
     将 MessageV0 中的所有 CompiledInstruction 转换为 Instruction 列表
-    
+
+    签名者/可写角色按 header 每个消息只计算一次，地址查找表中的账户从 lookup_tables 解析
+
     Args:
         message_v0: 包含指令的 MessageV0 对象
-        
+        lookup_tables: 已加载的地址查找表（消息有 address_table_lookups 时需要）
+
     Returns:
         List[Instruction]: 转换后的 Instruction 列表
     """
-    instructions = []
-    
-    # 遍历所有编译过的指令
-    for compiled_instruction in message_v0.instructions:
-        # 获取程序 ID
-        program_id = message_v0.account_keys[compiled_instruction.program_id_index]
-        
-        # 获取账户 MetaData 列表
-        accounts = []
-        for account_idx in compiled_instruction.accounts:
-            # 将字节转换为整数索引（如果需要）
-            if isinstance(account_idx, bytes) or isinstance(compiled_instruction.accounts, bytes):
-                # 如果 accounts 是字节串，我们需要逐个处理每个字节
-                idx = account_idx if isinstance(account_idx, int) else int(account_idx)
-            else:
-                idx = account_idx
-            
-            # 获取公钥
-            pubkey = message_v0.account_keys[idx]
-            
-            # 判断是否是签名者
-            is_signer = message_v0.is_signer(idx)
-            
-            # 判断是否可写
-            is_writable = message_v0.is_maybe_writable(idx)
-            
-            # 创建账户元数据
-            account_meta = AccountMeta(pubkey, is_signer, is_writable)
-            accounts.append(account_meta)
-        
-        # 创建 Instruction 并添加到列表
-        instruction = Instruction(program_id, compiled_instruction.data, accounts)
-        instructions.append(instruction)
-    
-    return instructions
-
-def versioned_tx_to_instructions(tx: VersionedTransaction) -> List[Instruction]:
+    return decompile_message(message_v0, lookup_tables)
+
+def versioned_tx_to_instructions(
+    tx: VersionedTransaction, lookup_tables: Optional[LookupTables] = None
+) -> List[Instruction]:
     """
     Extract Instructions from a VersionedTransaction
-    
+
     Args:
         tx: The VersionedTransaction
-        
+        lookup_tables: Loaded address lookup tables, if the message uses any
+
     Returns:
         list: List of Instructions
     """
-    message = tx.message
-    account_keys = message.account_keys
-    
-    instructions = []
-    for compiled_ix in message.instructions:
-        # Determine which accounts are signers and writable based on message header
-        signers_set = set()
-        for i in range(message.header.num_required_signatures):
-            signers_set.add(i)
-        
-        writables_set = set()
-        for i in range(message.header.num_required_signatures - message.header.num_readonly_signed_accounts):
-            writables_set.add(i)
-        
-        for i in range(message.header.num_required_signatures, 
-                       message.header.num_required_signatures + message.header.num_readonly_unsigned_accounts):
-            writables_set.add(i)
-        
-        # Reconstruct account metas
-        accounts = []
-        for idx in compiled_ix.accounts:
-            pubkey = account_keys[idx]
-            is_signer = idx in signers_set
-            is_writable = idx in writables_set
-            accounts.append(AccountMeta(pubkey, is_signer, is_writable))
-        
-        # Create the instruction
-        program_id = account_keys[compiled_ix.program_id_index]
-        instruction = Instruction(program_id, compiled_ix.data, accounts)
-        instructions.append(instruction)
-    
-    return instructions
-
-
-quote_url = "https://api.jup.ag/swap/v1/quote"
+    return decompile_message(tx.message, lookup_tables)
+
+
+quote_url = f"{JUPITER_API_URL}/quote"
 params = {
     "inputMint": "So11111111111111111111111111111111111111112",  # SOL
     "outputMint": "Dfh5DzRgSvvCFDoYc2ciTkMrbDfRKybA4SoFbPmApump",  # Pipin
@@ -115,7 +62,7 @@ params = {
 quote_response = requests.get(quote_url, params=params).json()
 print("✅ Quote received")
 # 2. Create swap transaction with priority fee estimation
-swap_url = "https://api.jup.ag/swap/v1/swap"
+swap_url = f"{JUPITER_API_URL}/swap"
 swap_payload = {
     "quoteResponse": quote_response,
     "userPublicKey": str(tx_sender.pubkey()),
@@ -140,7 +87,9 @@ versioned_tx = VersionedTransaction.from_bytes(
 )
 
 message: MessageV0 = versioned_tx.message
-instructions = convert_message_v0_to_instructions(message)
+# 加载消息引用的地址查找表（跨交易缓存）
+lookup_tables = asyncio.run(get_lookup_table_cache().for_message(message))
+instructions = convert_message_v0_to_instructions(message, lookup_tables)
 # instructions: List[CompiledInstruction] = versioned_tx.message.instructions
 # instructions = versioned_tx_to_instructions(versioned_tx)
 
@@ -157,7 +106,7 @@ instructions = convert_message_v0_to_instructions(message)
 new_message = MessageV0.try_compile(
     payer=payer.pubkey(),
     instructions=instructions,
-    address_lookup_table_accounts=message.address_table_lookups,
+    address_lookup_table_accounts=list(lookup_tables.values()),
     recent_blockhash=Hash.default()
 )
 # sign with a real signer and a null signer
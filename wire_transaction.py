@@ -0,0 +1,190 @@
+import binascii
+from typing import Optional, Sequence, Tuple, Union
+
+from solders.keypair import Keypair
+from solders.pubkey import Pubkey
+
+PACKET_DATA_SIZE = 1232  # bytes
+SIGNATURE_LENGTH = 64
+PUBKEY_LENGTH = 32
+MESSAGE_HEADER_LENGTH = 3
+# Versioned messages start with 0x80 | version; legacy ones with the header
+VERSION_PREFIX_MASK = 0x80
+
+BytesLike = Union[bytes, bytearray, memoryview]
+
+
+def encode_length(length: int) -> bytes:
+    """Solana compact-u16 ("shortvec") length prefix."""
+    encoded = bytearray()
+    while True:
+        byte = length & 0x7F
+        length >>= 7
+        if length:
+            encoded.append(byte | 0x80)
+        else:
+            encoded.append(byte)
+            return bytes(encoded)
+
+
+def decode_length(data: BytesLike, offset: int = 0) -> Tuple[int, int]:
+    """
+    Read a compact-u16 length.
+
+    Returns:
+        Tuple[int, int]: The length and the offset just past it
+    """
+    length = 0
+    shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        length |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return length, offset
+        shift += 7
+
+
+def fee_payer_from_base64(encoded: Union[str, bytes]) -> Pubkey:
+    """
+    Read the fee payer (first account key) from a base64 transaction.
+
+    Only the base64 prefix covering the signatures, header and first key is
+    decoded, so the cost doesn't grow with the number of accounts and
+    instructions.
+
+    Args:
+        encoded (str | bytes): A base64 legacy or versioned transaction, as in
+            getTransaction's ["<data>", "base64"]
+
+    Returns:
+        Pubkey: The fee payer
+
+    Raises:
+        ValueError: If the bytes end before the first account key
+    """
+    try:
+        # A compact-u16 takes at most 3 bytes, exactly one base64 quantum
+        signature_count, offset = decode_length(binascii.a2b_base64(encoded[:4]))
+        # Signatures, version prefix, header, key count (at most 3 bytes) and the first key
+        needed = offset + signature_count * SIGNATURE_LENGTH + 1 + MESSAGE_HEADER_LENGTH + 3 + PUBKEY_LENGTH
+        data = binascii.a2b_base64(encoded[:-(-needed // 3) * 4])
+        offset += signature_count * SIGNATURE_LENGTH
+        if data[offset] & VERSION_PREFIX_MASK:
+            offset += 1
+        key_count, offset = decode_length(data, offset + MESSAGE_HEADER_LENGTH)
+    except IndexError:
+        raise ValueError("Transaction ends before its account keys") from None
+    if key_count < 1 or len(data) < offset + PUBKEY_LENGTH:
+        raise ValueError("Transaction has no account keys")
+    return Pubkey.from_bytes(data[offset:offset + PUBKEY_LENGTH])
+
+
+class WireTransaction:
+    """
+    A serialized transaction held in a reusable buffer and signed in place.
+
+    Signatures are written straight into their slots in the wire bytes, so
+    signing a transaction from Jupiter takes no from_bytes / populate /
+    bytes() round trip. solders only signs `bytes`, which costs one copy of
+    the message region per signing; nothing else is copied.
+
+    `wire` is a view into the buffer, so it's only valid until the next
+    load(). AsyncRpcClient.send_transaction encodes its argument before it
+    first yields, so a buffer can be reloaded as soon as that call starts.
+    """
+
+    def __init__(self, capacity: int = PACKET_DATA_SIZE):
+        self._buffer = bytearray(capacity)
+        self._view = memoryview(self._buffer)
+        self.length = 0
+        self.signature_count = 0
+        self.signatures_offset = 0
+        self.message_offset = 0
+        self.account_keys_offset = 0
+
+    def load(self, data: BytesLike) -> "WireTransaction":
+        """
+        Copy wire bytes into the buffer and locate the signature slots.
+
+        Args:
+            data (bytes-like): A serialized legacy or versioned transaction
+
+        Returns:
+            WireTransaction: self, for chaining
+        """
+        length = len(data)
+        if length > len(self._buffer):
+            self._view.release()
+            self._buffer = bytearray(length)
+            self._view = memoryview(self._buffer)
+        self._view[:length] = data
+        self.length = length
+        self._parse()
+        return self
+
+    def load_base64(self, encoded: Union[str, bytes]) -> "WireTransaction":
+        """Decode a base64 transaction (e.g. Jupiter's swapTransaction) into the buffer."""
+        return self.load(binascii.a2b_base64(encoded))
+
+    def _parse(self) -> None:
+        view = self._view
+        self.signature_count, self.signatures_offset = decode_length(view)
+        self.message_offset = self.signatures_offset + self.signature_count * SIGNATURE_LENGTH
+        header_offset = self.message_offset
+        if view[header_offset] & VERSION_PREFIX_MASK:
+            header_offset += 1
+        if view[header_offset] != self.signature_count:
+            raise ValueError(f"Transaction has {self.signature_count} signature slots "
+                             f"but its message requires {view[header_offset]}")
+        _, self.account_keys_offset = decode_length(view, header_offset + MESSAGE_HEADER_LENGTH)
+
+    @property
+    def wire(self) -> memoryview:
+        """The serialized transaction, ready for sendTransaction."""
+        return self._view[:self.length]
+
+    @property
+    def message(self) -> memoryview:
+        """The serialized message, i.e. the bytes every signer signs."""
+        return self._view[self.message_offset:self.length]
+
+    def signer_index(self, pubkey: Union[Pubkey, bytes]) -> int:
+        """
+        Returns:
+            int: The signature slot of a required signer
+
+        Raises:
+            ValueError: If `pubkey` isn't one of the message's required signers
+        """
+        key = bytes(pubkey)
+        offset = self.account_keys_offset
+        for index in range(self.signature_count):
+            if self._view[offset:offset + PUBKEY_LENGTH] == key:
+                return index
+            offset += PUBKEY_LENGTH
+        raise ValueError(f"{Pubkey.from_bytes(key)} is not a required signer")
+
+    def set_signature(self, index: int, signature: BytesLike) -> None:
+        offset = self.signatures_offset + index * SIGNATURE_LENGTH
+        self._view[offset:offset + SIGNATURE_LENGTH] = bytes(signature)
+
+    def sign(self, signers: Sequence[Keypair], pubkeys: Optional[Sequence[Pubkey]] = None) -> "WireTransaction":
+        """
+        Sign the message with each signer and write the signatures into their slots.
+
+        Args:
+            signers (Sequence[Keypair]): Signers to apply; other slots are left as they are
+            pubkeys (Sequence[Pubkey], optional): The signers' public keys, if the
+                caller has them; Keypair.pubkey() re-derives the key on every call
+
+        Returns:
+            WireTransaction: self, for chaining
+        """
+        message = bytes(self.message)
+        for signer, pubkey in zip(signers, pubkeys or [signer.pubkey() for signer in signers]):
+            self.set_signature(self.signer_index(pubkey), signer.sign_message(message))
+        return self
+
+    def to_base64(self) -> str:
+        return binascii.b2a_base64(self.wire, newline=False).decode("ascii")